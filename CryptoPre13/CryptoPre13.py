@@ -1,244 +1,587 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-import requests
-import plotly.graph_objects as go
-import plotly.subplots as sp
-
-from src.predict import predict_signal, normalize_symbol
-
-
-# ======================================
-# FETCH BINANCE HISTORICAL DATA (CHART)
-# ======================================
-def get_binance_klines(symbol, interval="1h", limit=500):
-    url = "https://api.binance.com/api/v3/klines"
-    params = {"symbol": symbol, "interval": interval, "limit": limit}
-
-    r = requests.get(url, params=params)
-    data = r.json()
-
-    df = pd.DataFrame(data, columns=[
-        "time","open","high","low","close","volume",
-        "_1","_2","_3","_4","_5","_6"
-    ])
-
-    df["time"] = pd.to_datetime(df["time"], unit="ms")
-    df[["open","high","low","close","volume"]] = df[["open","high","low","close","volume"]].astype(float)
-    return df
-
-
-# ======================================
-# INDICATORS
-# ======================================
-def ema(series, period):
-    return series.ewm(span=period, adjust=False).mean()
-
-def rsi(series, period=14):
-    delta = series.diff()
-    gain = delta.clip(lower=0)
-    loss = (-delta.clip(upper=0))
-    avg_gain = gain.rolling(period).mean()
-    avg_loss = loss.rolling(period).mean()
-    rs = avg_gain / (avg_loss + 1e-9)
-    return 100 - (100 / (1 + rs))
-
-def macd(series):
-    e12 = ema(series, 12)
-    e26 = ema(series, 26)
-    macd_line = e12 - e26
-    signal = ema(macd_line, 9)
-    hist = macd_line - signal
-    return macd_line, signal, hist
-
-
-# ======================================
-# MULTI-TIMEFRAME TREND HEATMAP
-# ======================================
-def get_trend(df):
-    return "BUY" if df["ema9"].iloc[-1] > df["ema21"].iloc[-1] else "SELL"
-
-def multi_tf_heatmap(symbol, intervals=["1m","5m","15m","1h","4h","1d"]):
-    results = []
-    for tf in intervals:
-        try:
-            df = get_binance_klines(symbol, interval=tf, limit=200)
-            df["ema9"] = ema(df["close"], 9)
-            df["ema21"] = ema(df["close"], 21)
-            trend = get_trend(df)
-        except:
-            trend = "ERR"
-
-        results.append((tf, trend))
-
-    return pd.DataFrame(results, columns=["Timeframe", "Trend"])
-
-
-# ======================================
-# CRYPTOPANIC NEWS FETCH (FREE)
-# ======================================
-def get_crypto_news(symbol, limit=7):
-    base = "https://cryptopanic.com/api/v1/posts/?auth_token=&kind=news"
-    coin = symbol.replace("USDT", "")
-    url = f"{base}&currencies={coin}&filter=hot"
-
-    try:
-        r = requests.get(url, timeout=5)
-        posts = r.json().get("results", [])
-    except:
-        return []
-
-    news_list = []
-    for p in posts[:limit]:
-        title = p.get("title", "No title")
-        src = p.get("source", {}).get("title", "Unknown")
-        link = p.get("url", "")
-        published = p.get("published_at", "")[:10]
-
-        votes = p.get("votes", {})
-        bull = votes.get("positive", 0)
-        bear = votes.get("negative", 0)
-
-        if bull > bear:
-            sentiment = "🟢 Bullish"
-        elif bear > bull:
-            sentiment = "🔴 Bearish"
-        else:
-            sentiment = "🟡 Neutral"
-
-        news_list.append({
-            "title": title,
-            "source": src,
-            "url": link,
-            "published": published,
-            "sentiment": sentiment
-        })
-
-    return news_list
-
-
-# ======================================
-# PRO CANDLE CHART (EMA + RSI + MACD)
-# ======================================
-def build_full_chart(df, entry, sl, tp):
-
-    df["ema9"] = ema(df["close"], 9)
-    df["ema21"] = ema(df["close"], 21)
-    df["ema50"] = ema(df["close"], 50)
-    df["ema100"] = ema(df["close"], 100)
-
-    df["rsi"] = rsi(df["close"])
-    macd_line, macd_signal, macd_hist = macd(df["close"])
-
-    fig = sp.make_subplots(
-        rows=3, cols=1,
-        shared_xaxes=True,
-        row_heights=[0.55, 0.25, 0.20],
-        vertical_spacing=0.03
-    )
-
-    # Candlesticks
-    fig.add_trace(go.Candlestick(
-        x=df["time"],
-        open=df["open"], high=df["high"],
-        low=df["low"], close=df["close"],
-        name="Candles"
-    ), row=1, col=1)
-
-    # EMAs
-    fig.add_trace(go.Scatter(x=df["time"], y=df["ema9"], name="EMA9"), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df["time"], y=df["ema21"], name="EMA21"), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df["time"], y=df["ema50"], name="EMA50"), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df["time"], y=df["ema100"], name="EMA100"), row=1, col=1)
-
-    # TP / SL / Entry lines
-    if entry:
-        fig.add_hline(y=entry, line_color="blue", annotation_text="Entry")
-    if sl != "-":
-        fig.add_hline(y=sl, line_color="red", annotation_text="SL")
-    if tp != "-":
-        fig.add_hline(y=tp, line_color="green", annotation_text="TP")
-
-    # MACD
-    fig.add_trace(go.Bar(x=df["time"], y=macd_hist, name="MACD Hist"), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df["time"], y=macd_line, name="MACD"), row=2, col=1)
-    fig.add_trace(go.Scatter(x=df["time"], y=macd_signal, name="Signal"), row=2, col=1)
-
-    # RSI
-    fig.add_trace(go.Scatter(x=df["time"], y=df["rsi"], name="RSI"), row=3, col=1)
-    fig.add_hline(y=70, line_color="red", row=3, col=1)
-    fig.add_hline(y=30, line_color="green", row=3, col=1)
-
-    fig.update_layout(
-        template="plotly_dark",
-        height=900,
-        margin=dict(l=0, r=0, t=30, b=0)
-    )
-
-    return fig
-
-
-# ======================================
-# STREAMLIT UI — PRO DASHBOARD
-# ======================================
-st.title("⚡ TradeAI — Pro Trading Dashboard")
-
-symbol_input = st.text_input("Enter Symbol (BTCUSDT, ETHUSD, etc.):", "BTCUSDT")
-interval = st.selectbox("Chart Interval", ["1m","5m","15m","1h","4h","1d"], index=3)
-
-if st.button("Generate Signal"):
-
-    # Normalize symbol
-    fixed_symbol, note = normalize_symbol(symbol_input)
-    if note:
-        st.warning(note)
-
-    if fixed_symbol is None:
-        st.error("Invalid symbol.")
-        st.stop()
-
-    # Run model prediction
-    signal, conf, price, entry, sl, tp, rr, desc = predict_signal(fixed_symbol)
-
-    st.subheader(f"{fixed_symbol} — {signal} ({conf:.2f}%)")
-    st.write(desc)
-
-    # Multi-TF Heatmap
-    st.markdown("### 🔥 Multi-Timeframe Trend Heatmap")
-    heatmap = multi_tf_heatmap(fixed_symbol)
-    st.dataframe(heatmap.set_index("Timeframe"))
-
-    # Get chart data
-    df = get_binance_klines(fixed_symbol, interval=interval, limit=500)
-
-    # Build chart
-    fig = build_full_chart(df, entry, sl, tp)
-    st.plotly_chart(fig, use_container_width=True)
-
-    # Trade Levels
-    st.markdown("### 🧾 Trade Levels")
-    c1, c2, c3 = st.columns(3)
-    c1.info(f"Entry: {entry}")
-    c2.success(f"TP: {tp}")
-    c3.error(f"SL: {sl}")
-
-    st.markdown(f"### 🎯 Risk/Reward Ratio: **{rr}**")
-
-    # ======================================
-    # NEWS SECTION
-    # ======================================
-    st.markdown("### 📰 Latest Crypto News")
-
-    news = get_crypto_news(fixed_symbol)
-
-    if not news:
-        st.info("No news found for this asset.")
-    else:
-        for item in news:
-            st.markdown(f"""
-            <div style="padding:12px; border-radius:10px; background-color:#111827; margin-bottom:10px;">
-                <h4>{item['sentiment']} — {item['title']}</h4>
-                <p style="color:#9ca3af;">{item['source']} — {item['published']}</p>
-                <a href="{item['url']}" target="_blank">Read More</a>
-            </div>
-            """, unsafe_allow_html=True)
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+import plotly.subplots as sp
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from src.predict import predict_signal, normalize_symbol, load_assets, INTERVAL as PREDICT_INTERVAL, API_URL
+from src.scanner import start_background_scanner, SHARED_TABLE
+from src.resample import MultiTimeframeStore
+from src.downsample import lttb_series, candle_buckets, aggregate_candles, aggregate_extreme
+from src.live import LiveFeed
+from src.news import get_crypto_news, SHARED_NEWS
+from src import transport
+
+
+# ======================================
+# FETCH BINANCE HISTORICAL DATA (CHART)
+# ======================================
+def get_binance_klines(symbol, interval="1h", limit=500):
+    url = API_URL
+
+    # Binance caps a page at 1000 candles; page backwards for longer history
+    data = []
+    end_time = None
+    while len(data) < limit:
+        params = {"symbol": symbol, "interval": interval, "limit": min(1000, limit - len(data))}
+        if end_time is not None:
+            params["endTime"] = end_time
+        page = transport.get_json(url, params=params)
+        if not page:
+            break
+        data = page + data
+        end_time = page[0][0] - 1
+        if len(page) < params["limit"]:
+            break
+
+    df = pd.DataFrame(data, columns=[
+        "time","open","high","low","close","volume",
+        "_1","_2","_3","_4","_5","_6"
+    ])
+
+    df["time"] = pd.to_datetime(df["time"], unit="ms")
+    df[["open","high","low","close","volume"]] = df[["open","high","low","close","volume"]].astype(float)
+    return df
+
+
+# ======================================
+# CACHING LAYER
+# ======================================
+INTERVAL_SECONDS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600, "4h": 14400, "1d": 86400}
+
+
+def candle_bucket(interval):
+    # Changes when a new candle opens, so cached entries expire with the candle
+    return int(time.time() // INTERVAL_SECONDS[interval])
+
+
+@st.cache_resource(show_spinner=False)
+def get_model_assets():
+    return load_assets()
+
+
+@st.cache_data(ttl=86400, max_entries=512, show_spinner=False)
+def cached_klines(symbol, interval, limit, bucket):
+    return get_binance_klines(symbol, interval=interval, limit=limit)
+
+
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def cached_signal(symbol, bucket):
+    return predict_signal(symbol, get_model_assets())
+
+
+@st.cache_data(ttl=3600, max_entries=1024, show_spinner=False)
+def cached_normalize(symbol):
+    return normalize_symbol(symbol)
+
+
+def klines(symbol, interval, limit=500):
+    return cached_klines(symbol, interval, limit, candle_bucket(interval))
+
+
+def signal_for(symbol):
+    return cached_signal(symbol, candle_bucket(PREDICT_INTERVAL))
+
+
+# ======================================
+# INDICATORS
+# ======================================
+def ema(series, period):
+    return series.ewm(span=period, adjust=False).mean()
+
+def rsi(series, period=14):
+    delta = series.diff()
+    gain = delta.clip(lower=0)
+    loss = (-delta.clip(upper=0))
+    avg_gain = gain.rolling(period).mean()
+    avg_loss = loss.rolling(period).mean()
+    rs = avg_gain / (avg_loss + 1e-9)
+    return 100 - (100 / (1 + rs))
+
+def macd(series):
+    e12 = ema(series, 12)
+    e26 = ema(series, 26)
+    macd_line = e12 - e26
+    signal = ema(macd_line, 9)
+    hist = macd_line - signal
+    return macd_line, signal, hist
+
+
+# ======================================
+# MULTI-TIMEFRAME TREND HEATMAP
+# ======================================
+def get_trend(df):
+    return "BUY" if df["ema9"].iloc[-1] > df["ema21"].iloc[-1] else "SELL"
+
+HEATMAP_INTERVALS = ["1m","5m","15m","1h","4h","1d"]
+
+# Seconds each source may take before its panel shows a timeout
+SOURCE_TIMEOUTS = {"signal": 15, "heatmap": 8, "chart": 10, "news": 6}
+
+# One 1m series per symbol, shared across sessions; every heatmap timeframe
+# is resampled from it, so a refresh costs one incremental fetch.
+@st.cache_resource(show_spinner=False)
+def get_mtf_store(symbol):
+    return MultiTimeframeStore(symbol)
+
+def tf_trend(symbol, tf):
+    try:
+        store = get_mtf_store(symbol)
+        store.refresh()
+        df = store.bars(tf, 200)
+        df["ema9"] = ema(df["close"], 9)
+        df["ema21"] = ema(df["close"], 21)
+        return get_trend(df)
+    except:
+        return "ERR"
+
+def multi_tf_heatmap(symbol, intervals=HEATMAP_INTERVALS):
+    results = [(tf, tf_trend(symbol, tf)) for tf in intervals]
+    return pd.DataFrame(results, columns=["Timeframe", "Trend"])
+
+
+# ======================================
+# PRO CANDLE CHART (EMA + RSI + MACD)
+# ======================================
+# Candles need ~2px each to stay readable; lines get one point per pixel
+CHART_WIDTH_PX = 1400
+CHART_HISTORY = [500, 2000, 10000, 50000]
+
+def build_full_chart(df, entry, sl, tp, max_points=None, window=None):
+    """
+    Candles + EMAs, MACD and RSI. With `max_points`, indicators are still
+    computed on every candle, but candles are merged into at most
+    max_points // 2 OHLC buckets, line series are LTTB-downsampled to
+    max_points and lines render as WebGL (Scattergl) traces. `window` is a
+    (start %, end %) zoom; once it holds few enough candles they are drawn
+    at full resolution.
+    """
+    df["ema9"] = ema(df["close"], 9)
+    df["ema21"] = ema(df["close"], 21)
+    df["ema50"] = ema(df["close"], 50)
+    df["ema100"] = ema(df["close"], 100)
+
+    df["rsi"] = rsi(df["close"])
+    macd_line, macd_signal, macd_hist = macd(df["close"])
+
+    if window is not None:
+        rows = zoom_rows(len(df), window)
+        df = df.iloc[rows].reset_index(drop=True)
+        macd_line, macd_signal, macd_hist = (series.iloc[rows].reset_index(drop=True)
+                                             for series in (macd_line, macd_signal, macd_hist))
+
+    if max_points and len(df) > max_points // 2:
+        return _build_fast_chart(df, macd_line, macd_signal, macd_hist, entry, sl, tp, max_points)
+
+    fig = sp.make_subplots(
+        rows=3, cols=1,
+        shared_xaxes=True,
+        row_heights=[0.55, 0.25, 0.20],
+        vertical_spacing=0.03
+    )
+
+    # Candlesticks
+    fig.add_trace(go.Candlestick(
+        x=df["time"],
+        open=df["open"], high=df["high"],
+        low=df["low"], close=df["close"],
+        name="Candles"
+    ), row=1, col=1)
+
+    # EMAs
+    fig.add_trace(go.Scatter(x=df["time"], y=df["ema9"], name="EMA9"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df["time"], y=df["ema21"], name="EMA21"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df["time"], y=df["ema50"], name="EMA50"), row=1, col=1)
+    fig.add_trace(go.Scatter(x=df["time"], y=df["ema100"], name="EMA100"), row=1, col=1)
+
+    # TP / SL / Entry lines
+    if entry:
+        fig.add_hline(y=entry, line_color="blue", annotation_text="Entry")
+    if sl != "-":
+        fig.add_hline(y=sl, line_color="red", annotation_text="SL")
+    if tp != "-":
+        fig.add_hline(y=tp, line_color="green", annotation_text="TP")
+
+    # MACD
+    fig.add_trace(go.Bar(x=df["time"], y=macd_hist, name="MACD Hist"), row=2, col=1)
+    fig.add_trace(go.Scatter(x=df["time"], y=macd_line, name="MACD"), row=2, col=1)
+    fig.add_trace(go.Scatter(x=df["time"], y=macd_signal, name="Signal"), row=2, col=1)
+
+    # RSI
+    fig.add_trace(go.Scatter(x=df["time"], y=df["rsi"], name="RSI"), row=3, col=1)
+    fig.add_hline(y=70, line_color="red", row=3, col=1)
+    fig.add_hline(y=30, line_color="green", row=3, col=1)
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=900,
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+
+    return fig
+
+
+def _build_fast_chart(df, macd_line, macd_signal, macd_hist, entry, sl, tp, max_points):
+    x = df["time"].to_numpy()
+    x_num = x.astype("datetime64[ns]").astype(np.int64)
+
+    def line(y, name, row):
+        y = np.asarray(y, dtype=float)
+        keep = lttb_series(x_num, y, max_points)
+        fig.add_trace(go.Scattergl(x=x[keep], y=y[keep], name=name, mode="lines"), row=row, col=1)
+
+    fig = sp.make_subplots(
+        rows=3, cols=1,
+        shared_xaxes=True,
+        row_heights=[0.55, 0.25, 0.20],
+        vertical_spacing=0.03
+    )
+
+    # Candlesticks (no WebGL variant, so merge to screen resolution instead)
+    starts = candle_buckets(len(df), max_points // 2)
+    candles = aggregate_candles(df, max_points // 2)
+    fig.add_trace(go.Candlestick(
+        x=candles["time"],
+        open=candles["open"], high=candles["high"],
+        low=candles["low"], close=candles["close"],
+        name="Candles"
+    ), row=1, col=1)
+
+    for col, name in [("ema9", "EMA9"), ("ema21", "EMA21"), ("ema50", "EMA50"), ("ema100", "EMA100")]:
+        line(df[col], name, 1)
+
+    if entry:
+        fig.add_hline(y=entry, line_color="blue", annotation_text="Entry")
+    if sl != "-":
+        fig.add_hline(y=sl, line_color="red", annotation_text="SL")
+    if tp != "-":
+        fig.add_hline(y=tp, line_color="green", annotation_text="TP")
+
+    fig.add_trace(go.Bar(x=candles["time"], y=aggregate_extreme(macd_hist, starts), name="MACD Hist"), row=2, col=1)
+    line(macd_line, "MACD", 2)
+    line(macd_signal, "Signal", 2)
+
+    line(df["rsi"], "RSI", 3)
+    fig.add_hline(y=70, line_color="red", row=3, col=1)
+    fig.add_hline(y=30, line_color="green", row=3, col=1)
+
+    fig.update_layout(
+        template="plotly_dark",
+        height=900,
+        margin=dict(l=0, r=0, t=30, b=0),
+        xaxis_rangeslider_visible=False
+    )
+
+    return fig
+
+
+def zoom_rows(n, window):
+    # A percentage range stays valid as new candles arrive
+    lo, hi = window
+    start = min(int(n * lo / 100), n - 1)
+    end = max(start + 1, int(np.ceil(n * hi / 100)))
+    return slice(start, end)
+
+
+# ======================================
+# LIVE MODE (patch the held figure, don't rebuild it)
+# ======================================
+LIVE_REFRESH = 5  # seconds between live ticks
+
+# Chart trace name -> LiveFeed row field
+TRACE_FIELDS = {
+    "EMA9": "ema9", "EMA21": "ema21", "EMA50": "ema50", "EMA100": "ema100",
+    "MACD Hist": "macd_hist", "MACD": "macd", "Signal": "macd_signal", "RSI": "rsi",
+}
+
+# One feed per symbol/interval for every open dashboard, so viewers don't
+# multiply API calls or indicator work.
+@st.cache_resource(show_spinner=False)
+def get_live_feed(symbol, interval):
+    return LiveFeed(symbol, interval)
+
+def _set_point(trace, field, value, append):
+    arr = np.asarray(getattr(trace, field))
+    if append:
+        arr = np.append(arr, value)
+    else:
+        arr = arr.copy()
+        arr[-1] = value
+    setattr(trace, field, arr)
+
+def patch_figure(fig, changes, last_time):
+    """
+    Apply LiveFeed changes to a chart from build_full_chart: a candle at
+    `last_time` is updated in place, a newer one is appended. With merged
+    candles the last bucket absorbs updates of its newest candle.
+    """
+    for _, _, row in changes:
+        t = row["time"]
+        if t < last_time:
+            continue
+        append = t > last_time
+        for trace in fig.data:
+            if trace.name == "Candles":
+                if append:
+                    for field in ("open", "high", "low", "close"):
+                        _set_point(trace, field, row[field], True)
+                else:
+                    _set_point(trace, "high", max(trace.high[-1], row["high"]), False)
+                    _set_point(trace, "low", min(trace.low[-1], row["low"]), False)
+                    _set_point(trace, "close", row["close"], False)
+            elif trace.name in TRACE_FIELDS:
+                _set_point(trace, "y", row[TRACE_FIELDS[trace.name]], append)
+            else:
+                continue
+            if append:
+                _set_point(trace, "x", np.datetime64(t), True)
+        last_time = t
+    return last_time
+
+def _live_chart(symbol, interval, seed_df, entry, sl, tp, max_points, window):
+    feed = get_live_feed(symbol, interval)
+    feed.seed(seed_df)
+    # A failed fetch keeps the last frame on screen; the next tick retries
+    try:
+        feed.poll()
+        poll_error = None
+    except Exception as e:
+        poll_error = e
+
+    # Only the right edge moves; a zoom that ends earlier stays static
+    following = window[1] >= 100.0
+    key = (symbol, interval, seed_df["time"].iloc[-1], len(seed_df), entry, sl, tp, max_points, window)
+
+    held = st.session_state.get("live_chart")
+    changes = None
+    if held is not None and held["key"] == key:
+        changes = feed.changes_since(held["version"])
+
+    if changes is None:
+        fig = build_full_chart(seed_df.copy(), entry, sl, tp, max_points=max_points, window=window)
+        changes, version = feed.all_changes()
+        held = {"key": key, "fig": fig, "version": version, "last_time": seed_df["time"].iloc[-1]}
+        st.session_state["live_chart"] = held
+
+    if following and changes:
+        held["last_time"] = patch_figure(held["fig"], changes, held["last_time"])
+    held["version"] = feed.version
+
+    st.plotly_chart(held["fig"], use_container_width=True)
+
+    if poll_error is not None:
+        since = time.strftime('%H:%M:%S', time.localtime(feed.polled_at)) if feed.polled_at else "never"
+        st.caption(f"🟠 Stale — live update failed ({poll_error}) · last update {since}")
+        return
+
+    try:
+        signal, conf, price, *_ = signal_for(symbol)
+        st.caption(f"🟢 Live — {signal} ({conf:.2f}%) · last {feed.live['close']} · "
+                   f"updated {time.strftime('%H:%M:%S')}")
+    except Exception as e:
+        st.caption(f"🟢 Live — signal unavailable ({e})")
+
+live_chart = st.fragment(run_every=LIVE_REFRESH)(_live_chart)
+
+
+# ======================================
+# STREAMLIT UI — PRO DASHBOARD
+# ======================================
+st.title("⚡ TradeAI — Pro Trading Dashboard")
+
+symbol_input = st.text_input("Enter Symbol (BTCUSDT, ETHUSD, etc.):", "BTCUSDT")
+interval = st.selectbox("Chart Interval", ["1m","5m","15m","1h","4h","1d"], index=3)
+history = st.sidebar.selectbox("Chart history (candles)", CHART_HISTORY, index=0)
+fast_chart = st.sidebar.checkbox("Fast chart (WebGL + downsampling)", value=True)
+live_mode = st.sidebar.checkbox(f"Live mode (updates every {LIVE_REFRESH}s)", value=False)
+
+
+# ======================================
+# MARKET SCANNER (reads the shared table, never fetches)
+# ======================================
+@st.cache_resource
+def get_scanner():
+    return start_background_scanner()
+
+if st.sidebar.checkbox("Run market scanner (all USDT pairs)"):
+    get_scanner()
+    snap = SHARED_TABLE.snapshot()
+    with st.sidebar.expander(f"📡 Scanner — {len(snap)} pairs", expanded=True):
+        if snap.empty:
+            st.write("Scanner warming up…")
+        else:
+            st.dataframe(snap[["symbol", "signal", "confidence", "price", "atr_pct"]].head(50),
+                         hide_index=True)
+
+# The last requested symbol survives reruns, so changing the chart interval
+# re-renders from cache instead of needing another button press.
+if st.button("Generate Signal"):
+    st.session_state["active_symbol"] = symbol_input
+
+active_symbol = st.session_state.get("active_symbol")
+
+if active_symbol:
+
+    # Normalize symbol
+    fixed_symbol, note = cached_normalize(active_symbol)
+    if note:
+        st.warning(note)
+
+    if fixed_symbol is None:
+        st.error("Invalid symbol.")
+        st.stop()
+
+    # ======================================
+    # CONCURRENT FAN-OUT
+    # ======================================
+    # Every source is fetched in parallel; each panel renders as soon as its
+    # data lands, so first paint waits for the slowest request, not the sum.
+    ctx = get_script_run_ctx()
+    pool = ThreadPoolExecutor(
+        max_workers=len(HEATMAP_INTERVALS) + 3,
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+    )
+
+    started = time.monotonic()
+    jobs = {pool.submit(signal_for, fixed_symbol): ("signal", None)}
+    jobs.update({pool.submit(tf_trend, fixed_symbol, tf): ("heatmap", tf) for tf in HEATMAP_INTERVALS})
+    jobs[pool.submit(klines, fixed_symbol, interval, history)] = ("chart", None)
+    # News comes from the shared background cache; only a coin nobody has
+    # viewed yet waits (in this pool thread) for its first fetch.
+    jobs[pool.submit(get_crypto_news, fixed_symbol, SOURCE_TIMEOUTS["news"] - 1)] = ("news", None)
+
+    # Placeholders keep the page layout stable while panels fill in
+    header_slot = st.empty()
+    desc_slot = st.empty()
+    st.markdown("### 🔥 Multi-Timeframe Trend Heatmap")
+    heatmap_slot = st.empty()
+    zoom = st.slider("Zoom (% of history)", 0.0, 100.0, (0.0, 100.0), step=0.5, key="chart_zoom")
+    chart_slot = st.empty()
+    st.markdown("### 🧾 Trade Levels")
+    levels_slot = st.empty()
+    rr_slot = st.empty()
+    st.markdown("### 📰 Latest Crypto News")
+    news_slot = st.empty()
+
+    header_slot.subheader(f"{fixed_symbol} — …")
+    chart_slot.info("Loading chart…")
+    news_slot.caption("Loading news…")
+
+    trends = {tf: "…" for tf in HEATMAP_INTERVALS}
+
+    def render_heatmap():
+        heatmap_slot.dataframe(pd.DataFrame(list(trends.items()), columns=["Timeframe", "Trend"]).set_index("Timeframe"))
+
+    render_heatmap()
+
+    results = {}
+
+    def render_signal(res):
+        signal, conf, price, entry, sl, tp, rr, desc = res
+        header_slot.subheader(f"{fixed_symbol} — {signal} ({conf:.2f}%)")
+        desc_slot.write(desc)
+        with levels_slot.container():
+            c1, c2, c3 = st.columns(3)
+            c1.info(f"Entry: {entry}")
+            c2.success(f"TP: {tp}")
+            c3.error(f"SL: {sl}")
+        rr_slot.markdown(f"### 🎯 Risk/Reward Ratio: **{rr}**")
+
+    def render_chart():
+        if "chart" not in results:
+            return
+        # Levels come from the signal; draw without them if it failed
+        sig = results.get("signal")
+        if sig is None and "signal" not in results.get("failed", {}):
+            return
+        entry, sl, tp = (sig[3], sig[4], sig[5]) if sig else (None, "-", "-")
+        max_points = CHART_WIDTH_PX if fast_chart else None
+        if live_mode:
+            with chart_slot.container():
+                live_chart(fixed_symbol, interval, results["chart"], entry, sl, tp, max_points, zoom)
+            return
+        fig = build_full_chart(results["chart"], entry, sl, tp, max_points=max_points, window=zoom)
+        chart_slot.plotly_chart(fig, use_container_width=True)
+
+    def render_news(news):
+        with news_slot.container():
+            status = SHARED_NEWS.status(fixed_symbol)
+            if not news:
+                if status == "loading":
+                    st.caption("Loading news…")
+                else:
+                    st.info("No news found for this asset.")
+            else:
+                st.caption(f"News {status}")
+            for item in news:
+                st.markdown(f"""
+                <div style="padding:12px; border-radius:10px; background-color:#111827; margin-bottom:10px;">
+                    <h4>{item['sentiment']} — {item['title']}</h4>
+                    <p style="color:#9ca3af;">{item['source']} — {item['published']}</p>
+                    <a href="{item['url']}" target="_blank">Read More</a>
+                </div>
+                """, unsafe_allow_html=True)
+
+    def fail(source, reason):
+        results.setdefault("failed", {})[source] = reason
+        if source == "signal":
+            header_slot.subheader(f"{fixed_symbol} — signal unavailable")
+            desc_slot.error(f"Prediction failed: {reason}")
+            render_chart()
+        elif source == "chart":
+            chart_slot.error(f"Chart data unavailable: {reason}")
+        elif source == "news":
+            news_slot.info("News unavailable right now.")
+
+    pending = set(jobs)
+    while pending:
+        now = time.monotonic()
+        timed_out = [f for f in pending if now - started > SOURCE_TIMEOUTS[jobs[f][0]]]
+        for fut in timed_out:
+            source, tf = jobs[fut]
+            pending.discard(fut)
+            if source == "heatmap":
+                trends[tf] = "TIMEOUT"
+            else:
+                fail(source, "timed out")
+        if not pending:
+            # The last jobs may be heatmap cells that just timed out
+            if timed_out:
+                render_heatmap()
+            break
+
+        next_deadline = min(started + SOURCE_TIMEOUTS[jobs[f][0]] for f in pending)
+        done, pending = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                             return_when=FIRST_COMPLETED)
+
+        for fut in done:
+            source, tf = jobs[fut]
+            try:
+                res = fut.result()
+            except Exception as e:
+                if source == "heatmap":
+                    trends[tf] = "ERR"
+                else:
+                    fail(source, e)
+                continue
+
+            if source == "signal":
+                results["signal"] = res
+                render_signal(res)
+                render_chart()
+            elif source == "heatmap":
+                trends[tf] = res
+            elif source == "chart":
+                results["chart"] = res
+                render_chart()
+            elif source == "news":
+                render_news(res)
+
+        render_heatmap()
+
+    # Late requests finish in the background and still warm the cache
+    pool.shutdown(wait=False)
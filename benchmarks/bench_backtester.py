@@ -0,0 +1,118 @@
+import argparse
+import time
+
+from benchmarks.synthetic import make_labeled_frame
+from src import backtester
+from src.backtester import LABEL, compute_levels
+
+
+# ----------------------------------------------
+# ORIGINAL ROW LOOP (reference for equality + speedup)
+# ----------------------------------------------
+def backtest_frame_loop(df):
+    initial_balance = 1000
+    balance = initial_balance
+    equity_curve = [balance]
+
+    wins = 0
+    losses = 0
+    trades = 0
+
+    trade_log = []
+
+    for i in range(1, len(df)):
+        row = df.iloc[i]
+
+        signal = row[LABEL]  # 0=sell,1=hold,2=buy
+
+        if signal == 1:
+            continue  # HOLD = skip
+
+        sl, tp = compute_levels(row)
+        if sl is None:
+            continue
+
+        entry = row["Close"]
+        low_future = df.iloc[i+1]["Low"] if i+1 < len(df) else entry
+        high_future = df.iloc[i+1]["High"] if i+1 < len(df) else entry
+
+        trades += 1
+
+        # BUY BACKTEST
+        if signal == 2:
+            if low_future <= sl:   # SL hit
+                balance *= 0.985
+                losses += 1
+                outcome = "SL"
+            elif high_future >= tp:  # TP hit
+                balance *= 1.02
+                wins += 1
+                outcome = "TP"
+            else:
+                outcome = "NONE"
+
+        # SELL BACKTEST
+        if signal == 0:
+            if high_future >= sl:
+                balance *= 0.985
+                losses += 1
+                outcome = "SL"
+            elif low_future <= tp:
+                balance *= 1.02
+                wins += 1
+                outcome = "TP"
+            else:
+                outcome = "NONE"
+
+        equity_curve.append(balance)
+        trade_log.append([i, entry, sl, tp, outcome])
+
+    # Metrics
+    accuracy = (wins / trades) * 100 if trades > 0 else 0
+    profit_factor = wins / losses if losses > 0 else wins
+    max_drawdown = (initial_balance - min(equity_curve)) / initial_balance * 100
+
+    summary = {
+        "Total Trades": trades,
+        "Wins": wins,
+        "Losses": losses,
+        "Accuracy %": accuracy,
+        "Profit Factor": profit_factor,
+        "Max Drawdown %": max_drawdown,
+        "Final Balance": balance,
+        "Return %": (balance - initial_balance) / initial_balance * 100,
+    }
+
+    return summary, trade_log, equity_curve
+
+
+def _best_of(fn, df, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn(df)
+        best = min(best, time.perf_counter() - t)
+    return best, out
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Row loop vs array kernel for backtest_coin")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10s} {'loop s':>10s} {'vector s':>10s} {'speedup':>9s}  identical")
+    for rows in args.rows:
+        df = make_labeled_frame(rows)
+
+        t_loop, ref = _best_of(backtest_frame_loop, df, 1)
+        t_vec, out = _best_of(backtester._backtest_frame, df, args.repeat)
+
+        identical = (ref[0] == out[0]) and (ref[1] == out[1]) and (ref[2] == out[2])
+        print(f"{rows:10d} {t_loop:10.3f} {t_vec:10.4f} {t_loop / t_vec:8.0f}x  {identical}")
+
+        if not identical:
+            raise SystemExit("[ERROR] Vectorized backtest diverged from the row loop!")
@@ -0,0 +1,82 @@
+import argparse
+import contextlib
+import os
+
+import requests
+
+from benchmarks.synthetic import make_kline_payload
+from src.predict import API_URL
+
+
+# ----------------------------------------------
+# RECORDED KLINES
+# ----------------------------------------------
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def fixture_path(symbol, interval, limit):
+    return os.path.join(FIXTURE_DIR, f"{symbol}_{interval}_{limit}.json")
+
+
+def record(symbol, interval="1m", limit=1000):
+    """Save one live /api/v3/klines response body verbatim."""
+    r = requests.get(API_URL, params={"symbol": symbol, "interval": interval, "limit": limit}, timeout=10)
+    r.raise_for_status()
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = fixture_path(symbol, interval, limit)
+    with open(path, "wb") as f:
+        f.write(r.content)
+    return path
+
+
+def load_payload(symbol="BTCUSDT", interval="1m", limit=1000, seed=42):
+    """
+    Raw klines body for `symbol`: the recorded fixture when there is one,
+    otherwise a seeded synthetic body in the same wire format.
+    """
+    path = fixture_path(symbol, interval, limit)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read(), "recorded"
+    return make_kline_payload(limit, seed), "synthetic"
+
+
+# ----------------------------------------------
+# REPLAY
+# ----------------------------------------------
+@contextlib.contextmanager
+def replay(payload):
+    """
+    Answer every HTTP request with `payload`, so fetch + decode paths run
+    offline and network time stays out of the measurement.
+    """
+    original = requests.sessions.Session.request
+
+    def request(self, method, url, *args, **kwargs):
+        r = requests.Response()
+        r.status_code = 200
+        r._content = payload
+        r.headers["Content-Type"] = "application/json"
+        r.url = url
+        return r
+
+    requests.sessions.Session.request = request
+    try:
+        yield
+    finally:
+        requests.sessions.Session.request = original
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record Binance kline fixtures for the benchmarks")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--limit", type=int, nargs="+", default=[200, 1000])
+    args = parser.parse_args()
+
+    for symbol in args.symbols:
+        for limit in args.limit:
+            print(f"[✔] {record(symbol, args.interval, limit)}")
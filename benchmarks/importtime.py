@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.suite import ROOT, RESULTS_DIR, _git_commit
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+TARGETS = ["src.predict", "src.service", "src.news", "src.resample"]
+RUNS = 7
+TOP = 15
+
+# Modules a cold import of predict should not pay for
+HEAVY = ("numpy", "pandas", "requests", "xgboost", "sklearn", "joblib", "scipy", "ta")
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+# ----------------------------------------------
+# -X importtime PROFILE
+# ----------------------------------------------
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        m = LINE.match(line)
+        if m:
+            self_us, cum_us, indent, name = m.groups()
+            rows.append((name, int(self_us), int(cum_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def import_profile(module, runs=RUNS):
+    """
+    Import `module` in `runs` fresh interpreters. Returns the cumulative
+    import time of each run (seconds) and the parsed rows of the fastest.
+    """
+    totals, best_rows = [], None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                             cwd=ROOT, capture_output=True, text=True)
+        if out.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{out.stderr[-2000:]}")
+        rows = parse_importtime(out.stderr)
+        total = next(cum for name, _, cum, depth in reversed(rows) if name == module and depth == 0)
+        totals.append(total / 1e6)
+        if total / 1e6 <= min(totals):
+            best_rows = rows
+    return totals, best_rows
+
+
+def heavy_modules(rows):
+    return sorted({name.split(".")[0] for name, *_ in rows if name.split(".")[0] in HEAVY})
+
+
+def report(module, totals, rows, top=TOP):
+    print(f"== import {module}: best {min(totals) * 1000:.1f} ms, "
+          f"median {statistics.median(totals) * 1000:.1f} ms ({len(totals)} runs)")
+    heavy = heavy_modules(rows)
+    print(f"   heavy modules pulled in: {', '.join(heavy) if heavy else 'none'}")
+    for name, self_us, cum_us, depth in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"   {self_us / 1000:8.2f} ms self {cum_us / 1000:9.2f} ms cum  {name}")
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start import cost (python -X importtime)")
+    parser.add_argument("modules", nargs="*", default=TARGETS)
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--top", type=int, default=TOP)
+    parser.add_argument("--max-ms", type=float, help="fail if any module's best import exceeds this")
+    parser.add_argument("--out", help="results JSON (same format as `suite run`, so `suite compare` works)")
+    args = parser.parse_args()
+
+    results, over = [], []
+    for module in args.modules:
+        totals, rows = import_profile(module, args.runs)
+        report(module, totals, rows, args.top)
+        results.append({
+            "case": f"import.{module}",
+            "rows": 1,
+            "repeat": len(totals),
+            "best": min(totals),
+            "median": statistics.median(totals),
+            "mean": statistics.fmean(totals),
+            "rows_per_sec": None,
+            "runs": totals,
+            "heavy_modules": heavy_modules(rows),
+        })
+        if args.max_ms and min(totals) * 1000 > args.max_ms:
+            over.append(module)
+
+    meta = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": _git_commit(),
+            "python": sys.version.split()[0]}
+    out = args.out
+    if out is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = meta["timestamp"].replace(":", "").replace("-", "")
+        out = os.path.join(RESULTS_DIR, f"importtime-{stamp}-{meta['commit'] or 'nogit'}.json")
+    with open(out, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    print(f"\n[✔] Results → {out}")
+
+    if over:
+        raise SystemExit(f"[✘] Over {args.max_ms:g} ms: {', '.join(over)}")
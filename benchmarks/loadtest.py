@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.mockserver import SYMBOLS, Faults, start_server
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+WORKERS = 8
+DURATION = 20.0           # seconds of load after warm-up
+WARMUP_REQUESTS = 20
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# ----------------------------------------------
+# LOAD
+# ----------------------------------------------
+def _summary(latencies, errors, elapsed):
+    lat = np.asarray(latencies) * 1000
+    ok = len(lat)
+    out = {
+        "requests": ok + sum(errors.values()),
+        "ok": ok,
+        "errors": dict(errors),
+        "seconds": elapsed,
+        "throughput": ok / elapsed if elapsed > 0 else 0.0,
+    }
+    if ok:
+        out.update({f"p{p:g}_ms": float(np.percentile(lat, p)) for p in PERCENTILES})
+        out.update({"mean_ms": float(lat.mean()), "max_ms": float(lat.max())})
+    return out
+
+
+def run_load(call, symbols, workers=WORKERS, duration=DURATION, rate=None):
+    """
+    Drive call(symbol) from `workers` threads for `duration` seconds.
+
+    Closed loop by default: each worker starts its next call as soon as the
+    last one returns. With `rate` (calls/s), calls are scheduled on a fixed
+    timetable and latency counts from the scheduled start, so a stall shows
+    up in the tail instead of silently lowering the offered load.
+    """
+    latencies, errors = [], Counter()
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+    ticket = iter(range(1 << 62))
+
+    def one(symbol, t0):
+        try:
+            call(symbol)
+        except Exception as e:
+            with lock:
+                errors[type(e).__name__] += 1
+            return
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+
+    def worker():
+        while True:
+            with lock:
+                i = next(ticket)
+            if rate:
+                t0 = started + i / rate
+                if t0 >= deadline:
+                    return
+                time.sleep(max(t0 - time.perf_counter(), 0.0))
+            else:
+                t0 = time.perf_counter()
+                if t0 >= deadline:
+                    return
+            one(symbols[i % len(symbols)], t0)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(workers):
+            pool.submit(worker)
+    return _summary(latencies, errors, time.perf_counter() - started)
+
+
+def _assets(kind, seed=42):
+    from src import predict
+
+    if kind != "synthetic":
+        try:
+            return predict.load_assets()
+        except FileNotFoundError:
+            if kind == "model":
+                raise
+    from benchmarks.suite import small_model
+    print("[INFO] Using a small model trained on synthetic data")
+    return small_model(seed)
+
+
+def _report(result):
+    print(f"  {result['ok']:,} ok / {result['requests']:,} requests in {result['seconds']:.1f}s "
+          f"→ {result['throughput']:.1f} req/s")
+    if result["ok"]:
+        print("  latency ms: " + "  ".join(f"p{p:g} {result[f'p{p:g}_ms']:.1f}" for p in PERCENTILES)
+              + f"  max {result['max_ms']:.1f}")
+    if result["errors"]:
+        print(f"  errors: {result['errors']}")
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="predict_signal throughput and tail latency against a mock Binance")
+    parser.add_argument("--base", help="use a running server (e.g. benchmarks.mockserver) instead of starting one")
+    parser.add_argument("--symbols", nargs="+", default=SYMBOLS)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--rate", type=float, help="open-loop calls/s (default: closed loop)")
+    parser.add_argument("--model", choices=["auto", "model", "synthetic"], default="auto")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--weight-limit", type=int, default=0, help="server weight per minute (0: off)")
+    parser.add_argument("--out", help="write the summary as JSON")
+    args = parser.parse_args()
+
+    server = None
+    if args.base is None:
+        faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate,
+                        args.weight_limit, seed=0)
+        server = start_server(symbols=args.symbols, faults=faults)
+        args.base = server.base_url
+    # src.predict is already imported (by the mock's imports), so its
+    # BINANCE_API_BASE default has been read; repoint the URLs it uses
+    from src import predict
+
+    os.environ["BINANCE_API_BASE"] = args.base
+    predict.API_BASE = args.base
+    predict.API_URL = args.base + "/api/v3/klines"
+    predict.EXCHANGE_INFO = args.base + "/api/v3/exchangeInfo"
+
+    assets = _assets(args.model)
+    call = lambda symbol: predict.predict_signal(symbol, assets)
+
+    print(f"[LOAD] {args.base}: {len(args.symbols)} symbols, {args.workers} workers, "
+          + (f"{args.rate:g} calls/s open loop" if args.rate else "closed loop"))
+    for i in range(WARMUP_REQUESTS):
+        try:
+            call(args.symbols[i % len(args.symbols)])
+        except Exception:
+            pass
+
+    result = run_load(call, args.symbols, args.workers, args.duration, args.rate)
+    _report(result)
+    if server is not None:
+        result["server"] = server.stats()
+        print(f"  server: {result['server']}")
+        server.shutdown()
+
+    if args.out:
+        result["meta"] = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "base": args.base,
+                          "workers": args.workers, "rate": args.rate}
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\n[✔] Results → {args.out}")
@@ -0,0 +1,343 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+from benchmarks.fixtures import FIXTURE_DIR
+from benchmarks.synthetic import make_ohlcv
+from src.resample import INTERVAL_MS
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT",
+           "ADAUSDT", "DOGEUSDT", "AVAXUSDT", "LINKUSDT", "DOTUSDT"]
+TAPE_ROWS = 20_000        # synthetic candles per symbol/interval
+WARMUP = 10_000           # candles already closed when the server starts
+SPEED = 1.0               # replayed candle time per wall-clock second
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+KLINES_WEIGHT = 2         # request weight, as Binance counts it
+EXCHANGE_INFO_WEIGHT = 20
+WEIGHT_PER_MINUTE = 6000  # Binance REQUEST_WEIGHT per IP; 0 disables
+
+NEWS_PATH = "/api/v1/posts/"   # CryptoPanic stand-in for src.news
+NEWS_POSTS = 5
+
+
+# ----------------------------------------------
+# TAPES (candles served per symbol/interval)
+# ----------------------------------------------
+class Tape:
+    """
+    Candles for one symbol/interval as pre-serialized JSON rows. Open times
+    are shifted so the first replayed candle opens at the server's start,
+    and a candle becomes visible once replay time reaches it.
+    """
+
+    def __init__(self, open_time, rows, interval_ms, start, started_at, speed):
+        self.interval_ms = interval_ms
+        self.start = start
+        self.started_at = started_at
+        self.speed = speed
+
+        shift = int(started_at * 1000) // interval_ms * interval_ms - int(open_time[start])
+        self.open_time = open_time + shift
+        self.rows = [
+            json.dumps([int(t), *r[:5], int(t) + interval_ms - 1, *r[5:]], separators=(",", ":")).encode()
+            for t, r in zip(self.open_time, rows)
+        ]
+
+    def cursor(self, now=None):
+        """Index of the newest visible candle."""
+        elapsed = ((now or time.time()) - self.started_at) * self.speed * 1000
+        return min(self.start + int(elapsed // self.interval_ms), len(self.rows) - 1)
+
+    def query(self, limit, start_time=None, end_time=None):
+        last = self.cursor() + 1
+        if start_time is not None:
+            lo = int(np.searchsorted(self.open_time[:last], start_time, "left"))
+            hi = min(lo + limit, last)
+        else:
+            hi = last if end_time is None else int(np.searchsorted(self.open_time[:last], end_time, "right"))
+            lo = max(hi - limit, 0)
+        return b"[" + b",".join(self.rows[lo:hi]) + b"]"
+
+
+def _synthetic_rows(symbol, interval_ms, rows):
+    df = make_ohlcv(rows, seed=zlib.crc32(f"{symbol}:{interval_ms}".encode()), interval_ms=interval_ms)
+    fmt = lambda a: np.char.mod("%.8f", a)
+    vol = df["Volume"].to_numpy()
+    quote = vol * df["Close"].to_numpy()
+    cols = [fmt(df[c].to_numpy()) for c in ("Open", "High", "Low", "Close")] + [fmt(vol)]
+    rows_out = [
+        [o, h, l, c, v, q, 100, bv, bq, "0"]
+        for o, h, l, c, v, q, bv, bq in zip(*cols, fmt(quote), fmt(vol / 2), fmt(quote / 2))
+    ]
+    return df["open_time"].to_numpy(dtype=np.int64), rows_out
+
+
+def _recorded_rows(symbol, interval):
+    """Largest recorded fixture for symbol/interval (benchmarks/fixtures.py), if any."""
+    if not os.path.isdir(FIXTURE_DIR):
+        return None
+    found = [f for f in os.listdir(FIXTURE_DIR) if f.startswith(f"{symbol}_{interval}_") and f.endswith(".json")]
+    if not found:
+        return None
+    best = max(found, key=lambda f: int(f.rsplit("_", 1)[1][:-5]))
+    with open(os.path.join(FIXTURE_DIR, best)) as f:
+        data = json.load(f)
+    if not data:
+        return None
+    return np.array([r[0] for r in data], dtype=np.int64), [r[1:6] + r[7:] for r in data]
+
+
+# ----------------------------------------------
+# FAULT INJECTION
+# ----------------------------------------------
+class Faults:
+    """
+    latency_ms + an exponential tail of mean jitter_ms on every response;
+    error_rate of requests get a 5xx; throttle_rate get a 429 regardless of
+    weight; weight_per_minute enforces Binance's request-weight limit with
+    429 + Retry-After (0 disables).
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0,
+                 weight_per_minute=WEIGHT_PER_MINUTE, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.weight_per_minute = weight_per_minute
+        self._rng = random.Random(seed)
+        self._minute = None
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.expovariate(1.0 / self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + jitter) / 1000
+
+    def decide(self, weight):
+        """(status or None, used weight, retry_after seconds)."""
+        now = time.time()
+        with self._lock:
+            minute = int(now // 60)
+            if minute != self._minute:
+                self._minute, self._used = minute, 0
+            retry_after = 60 - int(now % 60)
+
+            if self.throttle_rate and self._rng.random() < self.throttle_rate:
+                return 429, self._used, retry_after
+            if self.weight_per_minute and self._used + weight > self.weight_per_minute:
+                return 429, self._used, retry_after
+            self._used += weight
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self._rng.choice((500, 502, 503)), self._used, None
+            return None, self._used, None
+
+
+# ----------------------------------------------
+# SERVER
+# ----------------------------------------------
+ERRORS = {
+    400: (-1121, "Invalid symbol."),
+    404: (-1000, "Unknown endpoint."),
+    429: (-1003, "Too much request weight used; please use the websocket for live updates."),
+    500: (-1000, "An unknown error occurred while processing the request."),
+    502: (-1001, "Internal error; unable to process your request. Please try again."),
+    503: (-1001, "Service unavailable."),
+}
+
+
+class MockBinance(ThreadingHTTPServer):
+    """
+    /api/v3/klines and /api/v3/exchangeInfo over replayed candles, plus a
+    CryptoPanic-style NEWS_PATH with ETag revalidation (bump news_version
+    to publish new posts).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, symbols=SYMBOLS, speed=SPEED, tape_rows=TAPE_ROWS, warmup=WARMUP,
+                 faults=None, recorded=True):
+        super().__init__(address, _Handler)
+        self.symbols = list(symbols)
+        self.speed = speed
+        self.tape_rows = tape_rows
+        self.warmup = warmup
+        self.faults = faults or Faults()
+        self.recorded = recorded
+        self.news_version = 0
+        self.started_at = time.time()
+        self._tapes = {}
+        self._tape_lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def tape(self, symbol, interval):
+        key = (symbol, interval)
+        tape = self._tapes.get(key)
+        if tape is None:
+            with self._tape_lock:
+                tape = self._tapes.get(key)
+                if tape is None:
+                    recorded = _recorded_rows(symbol, interval) if self.recorded else None
+                    t, rows = recorded or _synthetic_rows(symbol, INTERVAL_MS[interval], self.tape_rows)
+                    start = min(self.warmup, len(rows) // 2)
+                    tape = Tape(t, rows, INTERVAL_MS[interval], start, self.started_at, self.speed)
+                    self._tapes[key] = tape
+        return tape
+
+    def count(self, path, status):
+        with self._stats_lock:
+            key = f"{path} {status}"
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def news(self, currency):
+        """(body, etag) of the current posts for `currency`."""
+        version = self.news_version
+        posts = [{
+            "title": f"{currency} headline {version}.{i}",
+            "source": {"title": "mock"},
+            "url": f"https://example.invalid/{currency}/{version}/{i}",
+            "published_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+            "votes": {"positive": i, "negative": 2},
+        } for i in range(NEWS_POSTS)]
+        body = json.dumps({"results": posts}).encode()
+        return body, f'"{zlib.crc32(body):08x}"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers:
+            self.send_header(k, str(v))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, path, headers=()):
+        code, msg = ERRORS[status]
+        self.server.count(path, status)
+        self._send(status, json.dumps({"code": code, "msg": msg}).encode(), headers)
+
+    def _news(self, path, query):
+        body, etag = self.server.news(query.get("currencies", "").upper())
+        if self.headers.get("If-None-Match") == etag:
+            self.server.count(path, 304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.server.count(path, 200)
+        self._send(200, body, [("ETag", etag)])
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        path = url.path
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if path == "/mock/stats":
+            return self._send(200, json.dumps(server.stats()).encode())
+        if path == NEWS_PATH:
+            time.sleep(server.faults.delay())
+            return self._news(path, query)
+        weight = {"/api/v3/klines": KLINES_WEIGHT, "/api/v3/exchangeInfo": EXCHANGE_INFO_WEIGHT}.get(path)
+        if weight is None:
+            return self._error(404, path)
+
+        time.sleep(server.faults.delay())
+        status, used, retry_after = server.faults.decide(weight)
+        used_header = [("X-MBX-USED-WEIGHT-1M", used)]
+        if status == 429:
+            return self._error(429, path, used_header + [("Retry-After", retry_after)])
+        if status is not None:
+            return self._error(status, path)
+
+        if path == "/api/v3/exchangeInfo":
+            body = json.dumps({
+                "timezone": "UTC",
+                "serverTime": int(time.time() * 1000),
+                "symbols": [{"symbol": s, "status": "TRADING", "baseAsset": s[:-4], "quoteAsset": s[-4:]}
+                            for s in server.symbols],
+            }).encode()
+        else:
+            symbol = query.get("symbol", "").upper()
+            interval = query.get("interval")
+            if symbol not in server.symbols or interval not in INTERVAL_MS:
+                return self._error(400, path, used_header)
+            limit = min(max(int(query.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+            start = int(query["startTime"]) if "startTime" in query else None
+            end = int(query["endTime"]) if "endTime" in query else None
+            body = server.tape(symbol, interval).query(limit, start, end)
+
+        server.count(path, 200)
+        self._send(200, body, used_header)
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """Serve on a background thread. Returns the server (see .base_url)."""
+    server = MockBinance((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="mock-binance", daemon=True).start()
+    return server
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Binance klines/exchangeInfo replay server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--symbols", nargs="+", default=SYMBOLS)
+    parser.add_argument("--speed", type=float, default=SPEED, help="replayed seconds per wall-clock second")
+    parser.add_argument("--rows", type=int, default=TAPE_ROWS, help="synthetic candles per symbol/interval")
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="candles visible at start")
+    parser.add_argument("--synthetic", action="store_true", help="ignore recorded fixtures")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="mean of an exponential latency tail")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--weight-limit", type=int, default=WEIGHT_PER_MINUTE, help="weight per minute (0: off)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    faults = Faults(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate,
+                    args.weight_limit, args.seed)
+    server = MockBinance((args.host, args.port), args.symbols, args.speed, args.rows, args.warmup,
+                         faults, recorded=not args.synthetic)
+    print(f"[MOCK] Serving {len(args.symbols)} symbols on {server.base_url} "
+          f"(export BINANCE_API_BASE={server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+        print("\n[MOCK] Stopped.")
@@ -0,0 +1,118 @@
+import argparse
+import threading
+import time
+
+from benchmarks.mockserver import NEWS_PATH, start_server
+from src.news import NewsCache
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+# Short periods so a full check runs in a few seconds
+REFRESH = 1.0
+IDLE = 0.5
+EVICT = 2.0
+READERS = 50
+
+
+def _cache(server, **options):
+    cache = NewsCache(url=server.base_url + NEWS_PATH, params={}, **options)
+    cache.loops = 0
+    refresh_due = cache.refresh_due
+
+    def counted(now=None):
+        cache.loops += 1
+        return refresh_due(now)
+
+    cache.refresh_due = counted
+    return cache.start()
+
+
+def _upstream(server, status):
+    return server.stats().get(f"{NEWS_PATH} {status}", 0)
+
+
+# ----------------------------------------------
+# CHECKS (against the local stand-in server)
+# ----------------------------------------------
+def check_shared(server):
+    """N concurrent readers of one currency cost one upstream request."""
+    cache = _cache(server, refresh=60, idle=60)
+    before = _upstream(server, 200)
+    threads = [threading.Thread(target=cache.get, args=("BTCUSDT",), kwargs={"wait": 5})
+               for _ in range(READERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cache.stop()
+    fetched = _upstream(server, 200) - before
+    return fetched == 1 and len(cache.get("BTCUSDT")) > 0, f"{READERS} readers → {fetched} upstream 200s"
+
+
+def check_revalidate(server):
+    """An unchanged feed is revalidated with a 304; a new version is fetched."""
+    cache = _cache(server, refresh=0.3, idle=60)
+    cache.get("ETHUSDT", wait=5)
+    for _ in range(8):
+        time.sleep(0.1)
+        cache.get("ETHUSDT")
+    not_modified = _upstream(server, 304)
+    server.news_version += 1
+    time.sleep(0.5)
+    title = cache.get("ETHUSDT")[0]["title"]
+    cache.stop()
+    ok = not_modified > 0 and title.endswith(f"{server.news_version}.0")
+    return ok, f"{not_modified} 304s, latest '{title}'"
+
+
+def check_idle(server):
+    """An unread currency stops refreshing without the worker spinning, then is evicted."""
+    cache = _cache(server, refresh=REFRESH, idle=IDLE, evict=EVICT)
+    cache.get("SOLUSDT", wait=5)
+    time.sleep(IDLE)
+    before, loops = _upstream(server, 200) + _upstream(server, 304), cache.loops
+    time.sleep(3 * REFRESH)
+    fetches = _upstream(server, 200) + _upstream(server, 304) - before
+    loops = cache.loops - loops
+    evicted = "SOL" not in cache._entries
+    cache.stop()
+    ok = fetches == 0 and loops <= 4 and evicted
+    return ok, f"{fetches} fetches, {loops} worker loops in {3 * REFRESH:g}s, evicted={evicted}"
+
+
+def check_comeback(server):
+    """A reader returning to an idle, overdue currency wakes the worker at once."""
+    cache = _cache(server, refresh=REFRESH, idle=IDLE, evict=60)
+    cache.get("XRPUSDT", wait=5)
+    time.sleep(REFRESH + IDLE)
+    before = _upstream(server, 200) + _upstream(server, 304)
+    cache.get("XRPUSDT")
+    time.sleep(0.3)
+    fetches = _upstream(server, 200) + _upstream(server, 304) - before
+    cache.stop()
+    return fetches == 1, f"{fetches} fetch within 0.3s of the read"
+
+
+CHECKS = [check_shared, check_revalidate, check_idle, check_comeback]
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check src.news against the local stand-in server")
+    parser.parse_args()
+
+    server = start_server(symbols=["BTCUSDT"])
+    failed = []
+    for check in CHECKS:
+        ok, detail = check(server)
+        print(f"{'[✔]' if ok else '[✘]'} {check.__name__}: {detail}")
+        if not ok:
+            failed.append(check.__name__)
+    server.shutdown()
+
+    if failed:
+        raise SystemExit(f"[✘] Failed: {', '.join(failed)}")
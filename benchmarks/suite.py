@@ -0,0 +1,355 @@
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import FIXTURE_DIR, load_payload, replay
+from benchmarks.synthetic import make_ohlcv, make_labeled_frame, write_ohlcv
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+ROWS = [10_000, 100_000]
+REPEAT = 5
+TIME_BUDGET = 30.0       # seconds per case/size before repeats stop early
+THRESHOLD = 0.10         # slowdown that counts as a regression
+MIN_SECONDS = 0.001      # ignore differences below timer noise
+BENCH_ROUNDS = 50        # boosting rounds for the training benchmark
+
+CASES = {}
+
+
+def case(name, max_rows=None, fixed_rows=None):
+    """
+    Register a benchmark. The function takes (rows, seed, workdir) and
+    returns (prepare, run): prepare() builds a fresh input outside the
+    timer, run(input) is the timed call.
+    """
+    def wrap(fn):
+        fn.max_rows = max_rows
+        fn.fixed_rows = fixed_rows
+        CASES[name] = fn
+        return fn
+    return wrap
+
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ----------------------------------------------
+# SHARED INPUTS (built once per size)
+# ----------------------------------------------
+@functools.lru_cache(maxsize=4)
+def pipeline_frames(rows, seed):
+    from src import features, regime, labeler
+
+    ohlcv = make_ohlcv(rows, seed)
+    feat = features.add_indicators(ohlcv.copy())
+    with_regime = regime.detect_regime(feat.copy())
+    labeled = labeler.apply_labels(with_regime.copy()).reset_index(drop=True)
+    return ohlcv, feat, with_regime, labeled
+
+
+@functools.lru_cache(maxsize=1)
+def small_model(seed):
+    """Model assets trained on synthetic data, shaped like the real ones."""
+    from xgboost import XGBClassifier
+    from src import train
+
+    labeled = pipeline_frames(20_000, seed)[3]
+    with quiet():
+        X, y, scaler, feature_names = train.prepare_data(labeled)
+    model = XGBClassifier(n_estimators=BENCH_ROUNDS, max_depth=6, tree_method="hist")
+    model.fit(X, y)
+    return model, scaler, feature_names
+
+
+def raw_frame(rows, seed):
+    # predict.get_live_data layout
+    df = make_ohlcv(rows, seed).rename(columns={"open_time": "time"})
+    for i in range(1, 7):
+        df[f"_{i}"] = 0
+    return df
+
+
+# ----------------------------------------------
+# HOT PATHS
+# ----------------------------------------------
+@case("klines.decode", max_rows=1_000_000)
+def bench_klines_decode(rows, seed, workdir):
+    from src import predict
+
+    payload, _ = load_payload("BTCUSDT", "1m", rows, seed)
+
+    def run(_):
+        with replay(payload):
+            return predict.get_live_data("BTCUSDT")
+    return lambda: None, run
+
+
+@case("features.add_indicators")
+def bench_add_indicators(rows, seed, workdir):
+    from src import features
+
+    ohlcv = pipeline_frames(rows, seed)[0]
+    return ohlcv.copy, features.add_indicators
+
+
+@case("predict.build_features")
+def bench_build_features(rows, seed, workdir):
+    from src import predict
+
+    df = raw_frame(rows, seed)
+    return df.copy, predict.build_features
+
+
+@case("regime.detect_regime")
+def bench_detect_regime(rows, seed, workdir):
+    from src import regime
+
+    feat = pipeline_frames(rows, seed)[1]
+    return feat.copy, regime.detect_regime
+
+
+@case("labeler.apply_labels")
+def bench_apply_labels(rows, seed, workdir):
+    from src import labeler
+
+    with_regime = pipeline_frames(rows, seed)[2]
+    return with_regime.copy, labeler.apply_labels
+
+
+@case("train.prepare_data")
+def bench_prepare_data(rows, seed, workdir):
+    from src import train
+
+    labeled = pipeline_frames(rows, seed)[3]
+
+    def run(df):
+        with quiet():
+            return train.prepare_data(df)
+    return labeled.copy, run
+
+
+@case("train.xgb_train", max_rows=2_000_000)
+def bench_xgb_train(rows, seed, workdir):
+    import xgboost as xgb
+    from src import train
+
+    with quiet():
+        X, y, _, feature_names = train.prepare_data(pipeline_frames(rows, seed)[3])
+
+    def run(_):
+        dtrain = xgb.DMatrix(X, label=y, feature_names=feature_names)
+        return xgb.train(train.XGB_PARAMS, dtrain, num_boost_round=BENCH_ROUNDS)
+    return lambda: None, run
+
+
+@case("backtester.backtest_coin")
+def bench_backtest_coin(rows, seed, workdir):
+    from src import backtester
+
+    path = os.path.join(workdir, f"labeled_bench_{rows}.csv")
+    if not os.path.exists(path):
+        make_labeled_frame(rows, seed).to_csv(path, index=False)
+    return lambda: path, backtester.backtest_coin
+
+
+@case("predict.predict_signal", fixed_rows=200)
+def bench_predict_signal(rows, seed, workdir):
+    from src import predict
+
+    payload, _ = load_payload("BTCUSDT", predict.INTERVAL, predict.LIMIT, seed)
+    assets = small_model(seed)
+
+    def run(_):
+        with replay(payload):
+            return predict.predict_signal("BTCUSDT", assets)
+    return lambda: None, run
+
+
+# ----------------------------------------------
+# RUNNER
+# ----------------------------------------------
+def time_case(prepare, run, repeat=REPEAT, budget=TIME_BUDGET):
+    runs = []
+    spent = 0.0
+    for _ in range(repeat):
+        arg = prepare()
+        t = time.perf_counter()
+        run(arg)
+        runs.append(time.perf_counter() - t)
+        spent += runs[-1]
+        if spent > budget:
+            break
+    return runs
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_suite(rows=ROWS, cases=None, repeat=REPEAT, seed=42, budget=TIME_BUDGET):
+    names = cases or list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown cases: {unknown} (have {list(CASES)})")
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            fn = CASES[name]
+            sizes = [fn.fixed_rows] if fn.fixed_rows else rows
+            for n in sizes:
+                if fn.max_rows and n > fn.max_rows:
+                    print(f"[SKIP] {name} @ {n:,} rows (max {fn.max_rows:,})")
+                    continue
+
+                prepare, run = fn(n, seed, workdir)
+                runs = time_case(prepare, run, repeat, budget)
+                median = statistics.median(runs)
+                results.append({
+                    "case": name,
+                    "rows": n,
+                    "repeat": len(runs),
+                    "best": min(runs),
+                    "median": median,
+                    "mean": statistics.fmean(runs),
+                    "rows_per_sec": n / median if median > 0 else None,
+                    "runs": runs,
+                })
+                print(f"{name:28s} {n:>12,d} rows  median {median * 1000:10.2f} ms  "
+                      f"best {min(runs) * 1000:10.2f} ms  ({len(runs)} runs)")
+
+    recorded = os.path.isdir(FIXTURE_DIR) and any(f.endswith(".json") for f in os.listdir(FIXTURE_DIR))
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "seed": seed,
+        "kline_fixtures": "recorded" if recorded else "synthetic",
+    }
+    return {"meta": meta, "results": results}
+
+
+def save_results(report, path=None):
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = report["meta"]["timestamp"].replace(":", "").replace("-", "")
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{report['meta']['commit'] or 'nogit'}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+# ----------------------------------------------
+# COMPARE
+# ----------------------------------------------
+def compare(base, new, threshold=THRESHOLD, metric="median", min_seconds=MIN_SECONDS):
+    """
+    Pair results by (case, rows) and flag each as REGRESSION, IMPROVED or
+    ok by the ratio new/base of `metric`.
+    """
+    old = {(r["case"], r["rows"]): r for r in base["results"]}
+    rows = []
+    for r in new["results"]:
+        b = old.get((r["case"], r["rows"]))
+        if b is None:
+            continue
+        ratio = r[metric] / b[metric] if b[metric] > 0 else float("inf")
+        if abs(r[metric] - b[metric]) < min_seconds:
+            status = "ok"
+        elif ratio > 1 + threshold:
+            status = "REGRESSION"
+        elif ratio < 1 / (1 + threshold):
+            status = "IMPROVED"
+        else:
+            status = "ok"
+        rows.append({"case": r["case"], "rows": r["rows"], "base": b[metric],
+                     "new": r[metric], "ratio": ratio, "status": status})
+    return pd.DataFrame(rows)
+
+
+def _load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Performance benchmarks for the hot paths")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="time the hot paths and save JSON results")
+    p_run.add_argument("--rows", type=int, nargs="+", default=ROWS)
+    p_run.add_argument("--cases", nargs="+", help=f"subset of: {', '.join(CASES)}")
+    p_run.add_argument("--repeat", type=int, default=REPEAT)
+    p_run.add_argument("--budget", type=float, default=TIME_BUDGET)
+    p_run.add_argument("--seed", type=int, default=42)
+    p_run.add_argument("--out", help=f"results file (default: {RESULTS_DIR}/<time>-<commit>.json)")
+
+    p_cmp = sub.add_parser("compare", help="flag regressions between two result files")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=THRESHOLD)
+    p_cmp.add_argument("--metric", choices=["median", "best", "mean"], default="median")
+
+    p_gen = sub.add_parser("generate", help="write a seeded synthetic OHLCV file (.csv or .parquet)")
+    p_gen.add_argument("path")
+    p_gen.add_argument("--rows", type=int, default=1_000_000)
+    p_gen.add_argument("--seed", type=int, default=42)
+
+    sub.add_parser("list", help="list benchmark cases")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(args.rows, args.cases, args.repeat, args.seed, args.budget)
+        print(f"\n[✔] Results → {save_results(report, args.out)}")
+
+    elif args.command == "compare":
+        table = compare(_load(args.base), _load(args.new), args.threshold, args.metric)
+        if table.empty:
+            raise SystemExit("[ERROR] No common (case, rows) pairs to compare.")
+        print(table.to_string(index=False, formatters={
+            "base": "{:.4f}".format, "new": "{:.4f}".format, "ratio": "{:.2f}x".format,
+        }))
+        regressions = int((table["status"] == "REGRESSION").sum())
+        if regressions:
+            raise SystemExit(f"\n[✘] {regressions} regression(s) over {args.threshold:.0%}")
+        print("\n[✔] No regressions")
+
+    elif args.command == "generate":
+        write_ohlcv(args.path, args.rows, args.seed)
+        print(f"[✔] {args.rows:,} rows → {args.path}")
+
+    elif args.command == "list":
+        for name, fn in CASES.items():
+            limits = f"fixed {fn.fixed_rows} rows" if fn.fixed_rows else (
+                f"up to {fn.max_rows:,} rows" if fn.max_rows else "any size")
+            print(f"{name:28s} {limits}")
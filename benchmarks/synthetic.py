@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.backtester import LABEL
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+START_MS = 1_600_000_000_000     # 2020-09-13, aligned to the minute
+INTERVAL_MS = 60_000
+CHUNK_ROWS = 1_000_000           # rows generated at a time
+
+
+# ----------------------------------------------
+# SEEDED OHLCV
+# ----------------------------------------------
+def iter_ohlcv(rows, seed=42, chunk_rows=CHUNK_ROWS, start_ms=START_MS, interval_ms=INTERVAL_MS):
+    """
+    Yield a geometric random walk as OHLCV chunks (features.fetch_full_history
+    layout). The same seed gives the same series whatever the chunk size, so
+    50M rows can be streamed to disk without holding them in memory.
+    """
+    # One generator per column keeps draws independent of the chunk size
+    steps_rng, high_rng, low_rng, vol_rng = (
+        np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(4)
+    )
+    last_close = 100.0
+    done = 0
+    while done < rows:
+        n = min(chunk_rows, rows - done)
+        close = last_close * np.exp(np.cumsum(steps_rng.normal(0, 0.004, n)))
+        open_ = np.r_[last_close, close[:-1]]
+        high = np.maximum(open_, close) * (1 + high_rng.uniform(0, 0.004, n))
+        low = np.minimum(open_, close) * (1 - low_rng.uniform(0, 0.004, n))
+        volume = vol_rng.uniform(1, 100, n)
+
+        yield pd.DataFrame({
+            "open_time": start_ms + (done + np.arange(n, dtype=np.int64)) * interval_ms,
+            "Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume,
+        })
+
+        last_close = close[-1]
+        done += n
+
+
+def make_ohlcv(rows, seed=42, **options):
+    return pd.concat(iter_ohlcv(rows, seed, **options), ignore_index=True)
+
+
+def write_ohlcv(path, rows, seed=42, chunk_rows=CHUNK_ROWS):
+    """Stream a synthetic series to CSV or Parquet (by extension)."""
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        for chunk in iter_ohlcv(rows, seed, chunk_rows):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer = writer or pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+    else:
+        for i, chunk in enumerate(iter_ohlcv(rows, seed, chunk_rows)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+# ----------------------------------------------
+# BINANCE WIRE FORMAT
+# ----------------------------------------------
+def to_klines(df, interval_ms=INTERVAL_MS):
+    """OHLCV rows as /api/v3/klines returns them (prices as strings)."""
+    fmt = lambda a: np.char.mod("%.8f", a).tolist()
+    t = df["open_time"].to_numpy(dtype=np.int64)
+    vol = df["Volume"].to_numpy()
+    quote = vol * df["Close"].to_numpy()
+    return [
+        [int(a), o, h, l, c, v, int(a) + interval_ms - 1, q, 100, bv, bq, "0"]
+        for a, o, h, l, c, v, q, bv, bq in zip(
+            t, fmt(df["Open"].to_numpy()), fmt(df["High"].to_numpy()),
+            fmt(df["Low"].to_numpy()), fmt(df["Close"].to_numpy()), fmt(vol),
+            fmt(quote), fmt(vol / 2), fmt(quote / 2),
+        )
+    ]
+
+
+def make_kline_payload(rows, seed=42):
+    return json.dumps(to_klines(make_ohlcv(rows, seed))).encode()
+
+
+# ----------------------------------------------
+# SYNTHETIC LABELED DATA
+# ----------------------------------------------
+def make_labeled_frame(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, rows)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.004, rows))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.004, rows))
+    atr = pd.Series(high - low).rolling(14, min_periods=1).mean().to_numpy()
+
+    return pd.DataFrame({
+        "Open": open_, "High": high, "Low": low, "Close": close,
+        "Volume": rng.uniform(1, 100, rows),
+        "atr": atr,
+        LABEL: rng.integers(0, 3, rows),
+    })
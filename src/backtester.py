@@ -1,163 +1,380 @@
-import pandas as pd
-import numpy as np
-import os
-import matplotlib.pyplot as plt
-
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_PATH = os.path.join(BASE_DIR, "data", "processed")
-RESULTS_PATH = os.path.join(BASE_DIR, "backtest_results")
-
-os.makedirs(RESULTS_PATH, exist_ok=True)
-
-LABEL = "label"  # your model output (-1,0,1)
-
-# ----------------------------------------------
-# ATR-Based SL/TP Helper
-# ----------------------------------------------
-def compute_levels(row):
-    price = row["Close"]
-    atr = row["atr"]
-
-    if row[LABEL] == 2:  # BUY (mapped model output)
-        sl = price - (1.5 * atr)
-        tp = price + (2.0 * atr)
-    elif row[LABEL] == 0:  # SELL
-        sl = price + (1.5 * atr)
-        tp = price - (2.0 * atr)
-    else:
-        return None, None  # HOLD = no trade
-
-    return sl, tp
-
-
-# ----------------------------------------------
-# RUN BACKTEST ON SINGLE COIN
-# ----------------------------------------------
-def backtest_coin(filepath):
-    df = pd.read_csv(filepath)
-
-    # Only valid labeled rows
-    df = df.dropna()
-
-    initial_balance = 1000
-    balance = initial_balance
-    equity_curve = [balance]
-
-    wins = 0
-    losses = 0
-    trades = 0
-
-    trade_log = []
-
-    for i in range(1, len(df)):
-        row = df.iloc[i]
-
-        signal = row[LABEL]  # 0=sell,1=hold,2=buy
-
-        if signal == 1:
-            continue  # HOLD = skip
-
-        sl, tp = compute_levels(row)
-        if sl is None:
-            continue
-
-        entry = row["Close"]
-        low_future = df.iloc[i+1]["Low"] if i+1 < len(df) else entry
-        high_future = df.iloc[i+1]["High"] if i+1 < len(df) else entry
-
-        trades += 1
-
-        # BUY BACKTEST
-        if signal == 2:
-            if low_future <= sl:   # SL hit
-                balance *= 0.985
-                losses += 1
-                outcome = "SL"
-            elif high_future >= tp:  # TP hit
-                balance *= 1.02
-                wins += 1
-                outcome = "TP"
-            else:
-                outcome = "NONE"
-
-        # SELL BACKTEST
-        if signal == 0:
-            if high_future >= sl:
-                balance *= 0.985
-                losses += 1
-                outcome = "SL"
-            elif low_future <= tp:
-                balance *= 1.02
-                wins += 1
-                outcome = "TP"
-            else:
-                outcome = "NONE"
-
-        equity_curve.append(balance)
-        trade_log.append([i, entry, sl, tp, outcome])
-
-    # Metrics
-    accuracy = (wins / trades) * 100 if trades > 0 else 0
-    profit_factor = wins / losses if losses > 0 else wins
-    max_drawdown = (initial_balance - min(equity_curve)) / initial_balance * 100
-
-    summary = {
-        "Total Trades": trades,
-        "Wins": wins,
-        "Losses": losses,
-        "Accuracy %": accuracy,
-        "Profit Factor": profit_factor,
-        "Max Drawdown %": max_drawdown,
-        "Final Balance": balance,
-        "Return %": (balance - initial_balance) / initial_balance * 100,
-    }
-
-    return summary, trade_log, equity_curve
-
-
-# ----------------------------------------------
-# RUN BACKTEST FOR ALL LABELED FILES
-# ----------------------------------------------
-def run_all_backtests():
-    files = [f for f in os.listdir(DATA_PATH) if f.startswith("labeled_")]
-
-    results = {}
-
-    for file in files:
-        print(f"[BACKTEST] {file}...")
-
-        filepath = os.path.join(DATA_PATH, file)
-        summary, log, curve = backtest_coin(filepath)
-
-        results[file] = summary
-
-        # Save summary
-        pd.DataFrame([summary]).to_csv(
-            os.path.join(RESULTS_PATH, f"summary_{file}.csv"),
-            index=False
-        )
-
-        # Save trade log
-        pd.DataFrame(log, columns=["Index", "Entry", "SL", "TP", "Outcome"]).to_csv(
-            os.path.join(RESULTS_PATH, f"log_{file}.csv"),
-            index=False
-        )
-
-        # Save equity curve plot
-        plt.figure(figsize=(10, 5))
-        plt.plot(curve)
-        plt.title(f"Equity Curve - {file}")
-        plt.xlabel("Trades")
-        plt.ylabel("Balance")
-        plt.grid(True)
-        plt.savefig(os.path.join(RESULTS_PATH, f"equity_{file}.png"))
-        plt.close()
-
-        print(f"[✔] Completed: {file}\n")
-
-    print("\nAll backtests complete!")
-    return results
-
-
-if __name__ == "__main__":
-    run_all_backtests()
+import pandas as pd
+import numpy as np
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from src import metrics
+from src import profiling
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, "data", "processed")
+RESULTS_PATH = os.path.join(BASE_DIR, "backtest_results")
+
+RESULTS_FILE = os.path.join(RESULTS_PATH, "backtest_results.parquet")
+
+os.makedirs(RESULTS_PATH, exist_ok=True)
+
+LABEL = "label"  # your model output (-1,0,1)
+
+INITIAL_BALANCE = 1000
+SL_ATR_MULT = 1.5
+TP_ATR_MULT = 2.0
+LOSS_FACTOR = 0.985   # balance multiplier when SL is hit
+WIN_FACTOR = 1.02     # balance multiplier when TP is hit
+
+# Outcome codes used by the array kernels
+NONE, SL, TP = 0, 1, 2
+OUTCOMES = np.array(["NONE", "SL", "TP"], dtype=object)
+
+# ----------------------------------------------
+# ATR-Based SL/TP Helper
+# ----------------------------------------------
+def compute_levels(row):
+    price = row["Close"]
+    atr = row["atr"]
+
+    if row[LABEL] == 2:  # BUY (mapped model output)
+        sl = price - (SL_ATR_MULT * atr)
+        tp = price + (TP_ATR_MULT * atr)
+    elif row[LABEL] == 0:  # SELL
+        sl = price + (SL_ATR_MULT * atr)
+        tp = price - (TP_ATR_MULT * atr)
+    else:
+        return None, None  # HOLD = no trade
+
+    return sl, tp
+
+
+def compute_levels_array(price, atr, buy, sl_mult=SL_ATR_MULT, tp_mult=TP_ATR_MULT):
+    """Vectorized compute_levels: `buy` is a bool mask, everything else is SELL."""
+    sl = np.where(buy, price - (sl_mult * atr), price + (sl_mult * atr))
+    tp = np.where(buy, price + (tp_mult * atr), price - (tp_mult * atr))
+    return sl, tp
+
+
+# ----------------------------------------------
+# ARRAY KERNEL: NEXT-CANDLE SL/TP CHECK
+# ----------------------------------------------
+def next_candle_inputs(df, first=1, final=True):
+    """
+    Every BUY/SELL row (from position `first`) paired with the following
+    candle's High/Low, exactly like the original row loop. The last row
+    has no next candle, so the loop compared against entry instead;
+    with final=False it is left out for the next chunk to handle.
+    """
+    signal = df[LABEL].to_numpy()
+    close = df["Close"].to_numpy(dtype=float)
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    atr = df["atr"].to_numpy(dtype=float)
+    n = len(df)
+
+    idx = np.flatnonzero((signal == 2) | (signal == 0))
+    idx = idx[idx >= first]
+    if not final:
+        idx = idx[idx < n - 1]
+
+    entry = close[idx]
+    buy = signal[idx] == 2
+
+    nxt = idx + 1
+    has_next = nxt < n
+    nxt = np.minimum(nxt, n - 1)
+    low_f = np.where(has_next, low[nxt], entry)
+    high_f = np.where(has_next, high[nxt], entry)
+
+    return idx, entry, atr[idx], buy, low_f, high_f
+
+
+def next_candle_trades(df, first=1, final=True):
+    """Positional index, entry, SL, TP and outcome code arrays for one coin."""
+    idx, entry, atr, buy, low_f, high_f = next_candle_inputs(df, first, final)
+    sl, tp = compute_levels_array(entry, atr, buy)
+
+    sl_hit = np.where(buy, low_f <= sl, high_f >= sl)
+    tp_hit = np.where(buy, high_f >= tp, low_f <= tp)
+    outcome = np.where(sl_hit, SL, np.where(tp_hit, TP, NONE)).astype(np.int8)
+
+    return idx, entry, sl, tp, outcome
+
+
+def equity_from_outcomes(outcome, initial_balance=INITIAL_BALANCE,
+                         loss_factor=LOSS_FACTOR, win_factor=WIN_FACTOR):
+    # cumprod multiplies left to right, so balances match `balance *= f` bit for bit
+    factors = np.array([1.0, loss_factor, win_factor])[outcome]
+    return np.cumprod(np.concatenate(([float(initial_balance)], factors)))
+
+
+def summarize(outcome, curve, initial_balance=INITIAL_BALANCE):
+    trades = int(len(outcome))
+    wins = int(np.count_nonzero(outcome == TP))
+    losses = int(np.count_nonzero(outcome == SL))
+    balance = float(curve[-1]) if wins + losses else initial_balance
+
+    accuracy = (wins / trades) * 100 if trades > 0 else 0
+    profit_factor = wins / losses if losses > 0 else wins
+    max_drawdown = (initial_balance - float(curve.min())) / initial_balance * 100
+
+    return {
+        "Total Trades": trades,
+        "Wins": wins,
+        "Losses": losses,
+        "Accuracy %": accuracy,
+        "Profit Factor": profit_factor,
+        "Max Drawdown %": max_drawdown,
+        "Final Balance": balance,
+        "Return %": (balance - initial_balance) / initial_balance * 100,
+    }
+
+
+# ----------------------------------------------
+# RUN BACKTEST ON SINGLE COIN
+# ----------------------------------------------
+@profiling.profiled("backtester", "filepath")
+def backtest_coin(filepath):
+    df = pd.read_csv(filepath)
+
+    # Only valid labeled rows
+    df = df.dropna()
+
+    with metrics.throughput("backtester.backtest_coin", len(df)):
+        return _backtest_frame(df)
+
+
+def _backtest_frame(df):
+    idx, entry, sl, tp, outcome = next_candle_trades(df)
+    curve = equity_from_outcomes(outcome)
+
+    summary = summarize(outcome, curve)
+    trade_log = [list(t) for t in zip(idx.tolist(), entry.tolist(), sl.tolist(),
+                                      tp.tolist(), OUTCOMES[outcome].tolist())]
+    equity_curve = [INITIAL_BALANCE] + curve[1:].tolist()
+
+    return summary, trade_log, equity_curve
+
+
+@profiling.profiled("backtester", "filepath")
+def backtest_coin_table(filepath):
+    """backtest_coin, but the trade log comes back as a columnar DataFrame."""
+    return backtest_frame_table(pd.read_csv(filepath).dropna())
+
+
+def backtest_frame_table(df):
+    with metrics.throughput("backtester.backtest_coin", len(df)):
+        idx, entry, sl, tp, outcome = next_candle_trades(df)
+        curve = equity_from_outcomes(outcome)
+
+    trades = pd.DataFrame({
+        "Index": idx, "Entry": entry, "SL": sl, "TP": tp,
+        "Outcome": OUTCOMES[outcome], "Balance": curve[1:],
+    })
+    return summarize(outcome, curve), trades
+
+
+# ----------------------------------------------
+# STREAMING BACKTEST (constant memory)
+# ----------------------------------------------
+CHUNK_ROWS = 250_000
+
+
+def backtest_coin_stream(filepath, log_path=None, equity_path=None, chunk_rows=CHUNK_ROWS):
+    """
+    Same results as backtest_coin, but the file is read in `chunk_rows`
+    pieces. Only the last row of a chunk (it still needs its next candle),
+    the balance, the running equity low and the counters cross chunk
+    boundaries. Trade log / equity curve are appended to CSV as they are
+    produced, so memory does not grow with history length.
+    """
+    carry = None          # last valid row of the previous chunk
+    offset = 0            # global position of the first row in `frame`
+    balance = float(INITIAL_BALANCE)
+    low_equity = balance
+    trades = wins = losses = 0
+
+    log_out = open(log_path, "w") if log_path else None
+    eq_out = open(equity_path, "w") if equity_path else None
+    if log_out:
+        log_out.write("Index,Entry,SL,TP,Outcome\n")
+    if eq_out:
+        eq_out.write(f"Balance\n{INITIAL_BALANCE}\n")
+
+    rows = 0
+    reader = pd.read_csv(filepath, chunksize=chunk_rows)
+    try:
+        with metrics.throughput("backtester.backtest_coin_stream") as timer:
+            chunk = next(reader, None)
+            while chunk is not None:
+                chunk = chunk.dropna()
+                nxt = next(reader, None)
+                final = nxt is None
+                rows += len(chunk)
+
+                frame = chunk if carry is None else pd.concat([carry, chunk], ignore_index=True)
+                if len(frame):
+                    first = 1 if offset == 0 else 0
+                    idx, entry, sl, tp, outcome = next_candle_trades(frame, first, final)
+
+                    curve = equity_from_outcomes(outcome, balance)
+                    balance = float(curve[-1])
+                    low_equity = min(low_equity, float(curve.min()))
+                    trades += len(outcome)
+                    wins += int(np.count_nonzero(outcome == TP))
+                    losses += int(np.count_nonzero(outcome == SL))
+
+                    if log_out and len(idx):
+                        pd.DataFrame({
+                            "Index": idx + offset, "Entry": entry, "SL": sl, "TP": tp,
+                            "Outcome": OUTCOMES[outcome],
+                        }).to_csv(log_out, header=False, index=False)
+                    if eq_out and len(idx):
+                        pd.Series(curve[1:]).to_csv(eq_out, header=False, index=False)
+
+                    if not final:
+                        carry = frame.iloc[[-1]]
+                        offset += len(frame) - 1
+
+                chunk = nxt
+            timer.rows = rows
+    finally:
+        if log_out:
+            log_out.close()
+        if eq_out:
+            eq_out.close()
+
+    if wins + losses == 0:
+        balance = INITIAL_BALANCE
+
+    return {
+        "Total Trades": trades,
+        "Wins": wins,
+        "Losses": losses,
+        "Accuracy %": (wins / trades) * 100 if trades > 0 else 0,
+        "Profit Factor": wins / losses if losses > 0 else wins,
+        "Max Drawdown %": (INITIAL_BALANCE - low_equity) / INITIAL_BALANCE * 100,
+        "Final Balance": balance,
+        "Return %": (balance - INITIAL_BALANCE) / INITIAL_BALANCE * 100,
+    }
+
+
+# ----------------------------------------------
+# RESULTS FILE (one Parquet file for the whole run)
+# ----------------------------------------------
+def save_results(summaries, trades, path=RESULTS_FILE):
+    """
+    Trades of every coin go into one long table (with a `coin` column);
+    per-coin summaries ride along in the Parquet schema metadata.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(trades, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[b"summaries"] = json.dumps(summaries).encode()
+    meta[b"initial_balance"] = str(INITIAL_BALANCE).encode()
+
+    pq.write_table(table.replace_schema_metadata(meta), path)
+    return path
+
+
+def load_results(path=RESULTS_FILE, coin=None):
+    import pyarrow.parquet as pq
+
+    filters = [("coin", "==", coin)] if coin else None
+    trades = pq.read_table(path, filters=filters).to_pandas()
+
+    meta = pq.read_schema(path).metadata
+    summaries = json.loads(meta[b"summaries"])
+    summary = pd.DataFrame.from_dict(summaries, orient="index")
+    summary.index.name = "coin"
+
+    return summary, trades
+
+
+def plot_equity(coin, path=RESULTS_FILE, out_dir=RESULTS_PATH, trades=None):
+    """Render one equity curve PNG on demand from the results file."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    if trades is None:
+        _, trades = load_results(path, coin=coin)
+    curve = [INITIAL_BALANCE] + trades["Balance"].tolist()
+
+    plt.figure(figsize=(10, 5))
+    plt.plot(curve)
+    plt.title(f"Equity Curve - {coin}")
+    plt.xlabel("Trades")
+    plt.ylabel("Balance")
+    plt.grid(True)
+
+    out = os.path.join(out_dir, f"equity_{coin}.png")
+    plt.savefig(out)
+    plt.close()
+    return out
+
+
+# ----------------------------------------------
+# RUN BACKTEST FOR ALL LABELED FILES
+# ----------------------------------------------
+def _run_one(file, plot):
+    summary, trades = backtest_coin_table(os.path.join(DATA_PATH, file))
+    if plot:
+        plot_equity(file, trades=trades)
+    trades.insert(0, "coin", file)
+    return file, summary, trades
+
+
+def run_all_backtests(workers=None, plot=False, path=RESULTS_FILE):
+    files = sorted(f for f in os.listdir(DATA_PATH) if f.startswith("labeled_"))
+
+    if not files:
+        print("[ERROR] No labeled files found!")
+        return {}
+
+    results = {}
+    frames = []
+
+    # One coin per task; workers=None uses every core
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for file, summary, trades in pool.map(_run_one, files, [plot] * len(files)):
+            results[file] = summary
+            frames.append(trades)
+            print(f"[✔] Completed: {file} ({summary['Total Trades']} trades)")
+
+    save_results(results, pd.concat(frames, ignore_index=True), path)
+
+    print(f"\nAll backtests complete! → {path}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest every labeled file")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--plot", action="store_true", help="render equity PNGs during the run")
+    parser.add_argument("--plot-only", nargs="+", metavar="COIN",
+                        help="render PNGs for these coins from the last results file and exit")
+    parser.add_argument("--stream", nargs="+", metavar="FILE",
+                        help="constant-memory backtest of these files, logs written as CSV")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if args.plot_only:
+        for coin in args.plot_only:
+            print(f"[✔] {plot_equity(coin)}")
+    elif args.stream:
+        for path in args.stream:
+            name = os.path.basename(path)
+            summary = backtest_coin_stream(
+                path,
+                log_path=os.path.join(RESULTS_PATH, f"log_{name}"),
+                equity_path=os.path.join(RESULTS_PATH, f"equity_{name}"),
+                chunk_rows=args.chunk_rows,
+            )
+            print(f"[✔] {name}: {summary}")
+    else:
+        run_all_backtests(workers=args.workers, plot=args.plot)
+
+    if metrics.ENABLED:
+        metrics.report()
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+
+# ----------------------------------------------
+# FORMAT
+# ----------------------------------------------
+# [preamble][JSON header][pad][section][pad][section]...
+#
+# The preamble is magic, format version and header length. The header holds
+# the feature schema, training metadata and each section's offset (from the
+# start of the data area), length and dtype. Every section starts on a
+# 64-byte boundary so it can be viewed straight out of the mapped file.
+MAGIC = b"CPBUNDLE"
+FORMAT_VERSION = 1
+ALIGN = 64
+PREAMBLE = struct.Struct("<8sII")
+
+
+def _pad(n, align=ALIGN):
+    return (n + align - 1) // align * align
+
+
+# ----------------------------------------------
+# WRITE
+# ----------------------------------------------
+def write_bundle(path, booster, mean, scale, feature_names, metadata=None):
+    """
+    Write an XGBoost booster, StandardScaler parameters and the feature
+    schema as one file. The write is atomic: readers that already have the
+    old bundle mapped keep their pages.
+    """
+    sections = {
+        "mean": (np.ascontiguousarray(mean, dtype="<f8").tobytes(), "<f8"),
+        "scale": (np.ascontiguousarray(scale, dtype="<f8").tobytes(), "<f8"),
+        "model": (bytes(booster.save_raw("ubj")), "ubj"),
+    }
+    if not len(feature_names) * 8 == len(sections["mean"][0]) == len(sections["scale"][0]):
+        raise ValueError("[ERROR] mean/scale do not match the feature list")
+
+    layout, offset, digest = {}, 0, hashlib.sha256()
+    for name, (data, dtype) in sections.items():
+        offset = _pad(offset)
+        layout[name] = {"offset": offset, "length": len(data), "dtype": dtype}
+        offset += len(data)
+        digest.update(data)
+
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sha256": digest.hexdigest(),
+        "feature_names": list(feature_names),
+        "sections": layout,
+        "metadata": metadata or {},
+    }).encode()
+    data_start = _pad(PREAMBLE.size + len(header))
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        for name, (data, _) in sections.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+# ----------------------------------------------
+# READ
+# ----------------------------------------------
+def read_header(path):
+    """Bundle header only (schema, metadata, sha256), without mapping the data."""
+    with open(path, "rb") as f:
+        return _parse_header(f.read(PREAMBLE.size), f.read, path)[0]
+
+
+def _parse_header(preamble, read, path):
+    if len(preamble) < PREAMBLE.size:
+        raise ValueError(f"[ERROR] {path} is not a model bundle")
+    magic, version, header_len = PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise ValueError(f"[ERROR] {path} is not a model bundle")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"[ERROR] {path} is bundle format {version}; this code reads up to {FORMAT_VERSION}")
+    header = json.loads(read(header_len))
+    return header, _pad(PREAMBLE.size + header_len)
+
+
+class ModelBundle:
+    """
+    A bundle file mapped read-only. Arrays are views into the mapping, so
+    processes that load the same bundle share its pages through the OS
+    page cache instead of each holding a private copy.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        pos = PREAMBLE.size
+
+        def read(n):
+            return self._mm[pos:pos + n]
+
+        self.header, self._data_start = _parse_header(self._mm[:PREAMBLE.size], read, path)
+        self.feature_names = self.header["feature_names"]
+        self.metadata = self.header["metadata"]
+
+    def section(self, name):
+        s = self.header["sections"][name]
+        start = self._data_start + s["offset"]
+        return memoryview(self._mm)[start:start + s["length"]]
+
+    def array(self, name):
+        s = self.header["sections"][name]
+        return np.frombuffer(self._mm, dtype=s["dtype"], count=s["length"] // np.dtype(s["dtype"]).itemsize,
+                             offset=self._data_start + s["offset"])
+
+
+# ----------------------------------------------
+# SCALER
+# ----------------------------------------------
+class BundleScaler:
+    """
+    StandardScaler.transform over parameters read from a bundle. Exposes the
+    attributes predict.safe_scale relies on (feature_names_in_, transform).
+    """
+
+    def __init__(self, mean, scale, feature_names):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"[ERROR] Expected {self.n_features_in_} features, got shape {X.shape}")
+        return (X - self.mean_) / self.scale_
+
+
+def load_bundle(path):
+    """(model, scaler, feature_names, metadata) from a bundle file."""
+    from xgboost import XGBClassifier
+
+    bundle = ModelBundle(path)
+    model = XGBClassifier()
+    model.load_model(bytearray(bundle.section("model")))
+    scaler = BundleScaler(bundle.array("mean"), bundle.array("scale"), bundle.feature_names)
+    return model, scaler, list(bundle.feature_names), bundle.metadata
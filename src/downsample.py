@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+
+# ------------------------------
+# LINE SERIES (LTTB)
+# ------------------------------
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    visual shape of (x, y). First and last points are always kept. Returns
+    every index when the series already fits.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over points 1 .. n-2; spacing > 1 keeps every bucket non-empty
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (hi, edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+
+    return idx
+
+
+def lttb_series(x, y, n_out):
+    """LTTB over the finite part of y (indicator warm-up NaNs are skipped)."""
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(y))
+    keep = finite[lttb(np.asarray(x, dtype=float)[finite], y[finite], n_out)]
+    return keep
+
+
+# ------------------------------
+# CANDLES (OHLC BUCKETS)
+# ------------------------------
+def candle_buckets(n, max_candles):
+    """
+    Start index of each bucket of consecutive candles so at most
+    `max_candles` remain. Buckets are aligned to the newest candle, so the
+    live candle closes the last bucket and only the oldest may be partial.
+    """
+    k = -(-n // max_candles) if max_candles > 0 else 1
+    if k <= 1:
+        return np.arange(n)
+    starts = np.arange(n % k, n, k)
+    return np.r_[0, starts] if n % k else starts
+
+
+def aggregate_candles(df, max_candles, time_col="time"):
+    """OHLCV candles merged into at most `max_candles` buckets."""
+    n = len(df)
+    starts = candle_buckets(n, max_candles)
+    if len(starts) == n:
+        return df
+
+    ends = np.r_[starts[1:] - 1, n - 1]
+    out = {
+        time_col: df[time_col].to_numpy()[starts],
+        "open": df["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(dtype=float), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(dtype=float), starts),
+        "close": df["close"].to_numpy()[ends],
+    }
+    if "volume" in df:
+        out["volume"] = np.add.reduceat(df["volume"].to_numpy(dtype=float), starts)
+    return pd.DataFrame(out)
+
+
+def aggregate_extreme(values, starts):
+    """Per bucket, the value with the largest magnitude (histogram bars)."""
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+    if len(starts) == len(values):
+        return values
+    bucket = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(values)]))
+    order = np.lexsort((-np.abs(values), bucket))
+    first = np.r_[0, np.flatnonzero(np.diff(bucket[order])) + 1]
+    return values[order[first]]
@@ -0,0 +1,272 @@
+import argparse
+import heapq
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src import metrics
+from src.backtester import (
+    LABEL, INITIAL_BALANCE, SL_ATR_MULT, TP_ATR_MULT, compute_levels_array
+)
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+TIMEOUT = 240            # bars a position may stay open
+MAX_POSITIONS = 1        # 1 = one position at a time, >1 = pyramiding
+POSITION_SIZE = 1.0      # fraction of balance committed per position
+FEE = 0.0004             # per side, fraction of notional
+SLIPPAGE_BPS = 1.0       # adverse slippage on every fill
+
+# When SL and TP both sit inside a bar that opened between them, we can't
+# know which traded first
+AMBIGUITY_RULES = ("sl_first", "tp_first", "nearest_to_open")
+
+EXIT_SL, EXIT_TP, EXIT_TIMEOUT, EXIT_END = 1, 2, 3, 4
+EXIT_NAMES = np.array(["", "SL", "TP", "TIMEOUT", "END"], dtype=object)
+
+MAX_CELLS = 4_000_000    # candidates x timeout compared per block
+
+
+# ----------------------------------------------
+# EXIT KERNEL
+# ----------------------------------------------
+def _first_true(mask):
+    # Index of the first True per row, or the row width if none
+    any_hit = mask.any(axis=1)
+    return np.where(any_hit, mask.argmax(axis=1), mask.shape[1])
+
+
+def find_exits(open_, high, low, close, bars, buy, sl, tp,
+               timeout=TIMEOUT, ambiguity="sl_first"):
+    """
+    For positions opened at the close of `bars`, find the bar and level
+    where each one exits. Positions are independent here, so every
+    candidate is resolved in bulk over a sliding window of `timeout` bars.
+    """
+    if ambiguity not in AMBIGUITY_RULES:
+        raise ValueError(f"ambiguity must be one of {AMBIGUITY_RULES}")
+
+    n = len(close)
+    m = len(bars)
+    pad = np.full(timeout, np.nan)
+
+    # Row k of each view holds bars k .. k+timeout-1 (NaN past the end)
+    hi_w = sliding_window_view(np.concatenate((high, pad)), timeout)
+    lo_w = sliding_window_view(np.concatenate((low, pad)), timeout)
+    op_w = sliding_window_view(np.concatenate((open_, pad)), timeout)
+
+    exit_bar = np.empty(m, dtype=np.int64)
+    exit_kind = np.empty(m, dtype=np.int8)
+    exit_level = np.empty(m)
+
+    block = max(1, MAX_CELLS // timeout)
+    for s in range(0, m, block):
+        e = min(m, s + block)
+        rows = bars[s:e] + 1
+        b = buy[s:e, None]
+        sl_b, tp_b = sl[s:e, None], tp[s:e, None]
+
+        hi, lo = hi_w[rows], lo_w[rows]
+        sl_mask = np.where(b, lo <= sl_b, hi >= sl_b)
+        tp_mask = np.where(b, hi >= tp_b, lo <= tp_b)
+
+        k_sl = _first_true(sl_mask)
+        k_tp = _first_true(tp_mask)
+
+        # Both levels in one bar: a bar that opens past a level fills it
+        # first; only an open between the two is ambiguous
+        same = (k_sl == k_tp) & (k_sl < timeout)
+        bar_open = op_w[rows, np.minimum(k_sl, timeout - 1)]
+        opened_sl = np.where(buy[s:e], bar_open <= sl[s:e], bar_open >= sl[s:e])
+        opened_tp = np.where(buy[s:e], bar_open >= tp[s:e], bar_open <= tp[s:e])
+        inside = same & ~opened_sl & ~opened_tp
+
+        take_sl = (k_sl < k_tp) | (same & opened_sl)
+        if ambiguity == "sl_first":
+            take_sl |= inside
+        elif ambiguity == "nearest_to_open":
+            take_sl |= inside & (np.abs(bar_open - sl[s:e]) <= np.abs(tp[s:e] - bar_open))
+
+        k_hit = np.where(take_sl, k_sl, k_tp)
+        hit = k_hit < timeout
+
+        last = np.minimum(bars[s:e] + timeout, n - 1)
+        exit_bar[s:e] = np.where(hit, bars[s:e] + 1 + k_hit, last)
+        exit_kind[s:e] = np.where(hit, np.where(take_sl, EXIT_SL, EXIT_TP),
+                                  np.where(bars[s:e] + timeout <= n - 1, EXIT_TIMEOUT, EXIT_END))
+
+        # A bar that opens through the level fills at the open, not the level
+        k = np.minimum(k_hit, timeout - 1)
+        bar_open = op_w[rows, k]
+        level = np.where(take_sl, sl[s:e], tp[s:e])
+        through = np.where(buy[s:e] == take_sl, bar_open < level, bar_open > level)
+        filled = np.where(hit & through, bar_open, level)
+        exit_level[s:e] = np.where(hit, filled, close[exit_bar[s:e]])
+
+    return exit_bar, exit_kind, exit_level
+
+
+# ----------------------------------------------
+# POSITION RULES + ACCOUNTING
+# ----------------------------------------------
+def _accept_single(bars, exit_bar):
+    # One position at a time: next entry is the first signal at/after the exit bar
+    taken = []
+    i = 0
+    while i < len(bars):
+        taken.append(i)
+        i = int(np.searchsorted(bars, exit_bar[i], side="left"))
+        if i <= taken[-1]:
+            i = taken[-1] + 1
+    return np.asarray(taken, dtype=np.int64)
+
+
+def simulate_arrays(open_, high, low, close, atr, signal,
+                    timeout=TIMEOUT, max_positions=MAX_POSITIONS,
+                    position_size=POSITION_SIZE, fee=FEE, slippage_bps=SLIPPAGE_BPS,
+                    ambiguity="sl_first", sl_mult=SL_ATR_MULT, tp_mult=TP_ATR_MULT,
+                    initial_balance=INITIAL_BALANCE):
+    """
+    Event-driven backtest over plain arrays. `signal` uses the backtester
+    codes (2 = BUY, 0 = SELL, anything else = no entry).
+    """
+    bars = np.flatnonzero((signal == 2) | (signal == 0))
+    bars = bars[bars < len(close) - 1]
+    buy = signal[bars] == 2
+
+    sl, tp = compute_levels_array(close[bars], atr[bars], buy, sl_mult, tp_mult)
+    exit_bar, exit_kind, exit_level = find_exits(
+        open_, high, low, close, bars, buy, sl, tp, timeout, ambiguity
+    )
+
+    slip = slippage_bps / 10_000
+    side = np.where(buy, 1.0, -1.0)
+    entry_px = close[bars] * (1 + side * slip)
+    exit_px = exit_level * (1 - side * slip)
+    gross = side * (exit_px - entry_px) / entry_px
+    costs = fee * (1 + exit_px / entry_px)
+    net = gross - costs
+
+    balance_after = np.empty(len(bars))
+    if max_positions == 1:
+        taken = _accept_single(bars, exit_bar)
+        balance_after[taken] = initial_balance * np.cumprod(1 + position_size * net[taken])
+    else:
+        taken = []
+        open_heap = []   # (exit_bar, candidate)
+        balance = float(initial_balance)
+        stake = {}
+        for i in range(len(bars)):
+            while open_heap and open_heap[0][0] <= bars[i]:
+                _, j = heapq.heappop(open_heap)
+                balance += stake.pop(j) * net[j]
+                balance_after[j] = balance
+            if len(open_heap) < max_positions:
+                stake[i] = balance * position_size / max_positions
+                heapq.heappush(open_heap, (exit_bar[i], i))
+                taken.append(i)
+        while open_heap:
+            _, j = heapq.heappop(open_heap)
+            balance += stake.pop(j) * net[j]
+            balance_after[j] = balance
+        taken = np.asarray(taken, dtype=np.int64)
+
+    trades = pd.DataFrame({
+        "Entry Bar": bars[taken],
+        "Exit Bar": exit_bar[taken],
+        "Side": np.where(buy[taken], "BUY", "SELL"),
+        "Entry": entry_px[taken],
+        "Exit": exit_px[taken],
+        "SL": sl[taken],
+        "TP": tp[taken],
+        "Outcome": EXIT_NAMES[exit_kind[taken]],
+        "Return": net[taken],
+        "Balance": balance_after[taken],
+    })
+
+    # Equity is realized at exit; order by exit for the curve
+    curve = np.concatenate(([float(initial_balance)],
+                            trades.sort_values("Exit Bar", kind="stable")["Balance"].to_numpy()))
+    return summarize_events(trades, curve, initial_balance), trades
+
+
+def summarize_events(trades, curve, initial_balance=INITIAL_BALANCE):
+    n = len(trades)
+    wins = int((trades["Return"] > 0).sum())
+    losses = int((trades["Return"] <= 0).sum())
+    balance = float(curve[-1])
+
+    peak = np.maximum.accumulate(curve)
+    max_dd = float(((peak - curve) / peak).max() * 100) if n else 0.0
+
+    gain = trades.loc[trades["Return"] > 0, "Return"].sum()
+    loss = -trades.loc[trades["Return"] <= 0, "Return"].sum()
+
+    return {
+        "Total Trades": n,
+        "Wins": wins,
+        "Losses": losses,
+        "SL Exits": int((trades["Outcome"] == "SL").sum()),
+        "TP Exits": int((trades["Outcome"] == "TP").sum()),
+        "Timeouts": int(trades["Outcome"].isin(["TIMEOUT", "END"]).sum()),
+        "Accuracy %": (wins / n) * 100 if n > 0 else 0,
+        "Profit Factor": float(gain / loss) if loss > 0 else float(gain),
+        "Avg Bars Held": float((trades["Exit Bar"] - trades["Entry Bar"]).mean()) if n else 0.0,
+        "Max Drawdown %": max_dd,
+        "Final Balance": balance,
+        "Return %": (balance - initial_balance) / initial_balance * 100,
+    }
+
+
+def simulate(source, signal=None, **options):
+    """
+    Event-driven backtest of one labeled file (path or DataFrame).
+    Positions stay open until SL, TP or `timeout` bars; peak-to-trough
+    drawdown is reported instead of backtest_coin's drop below the start.
+    """
+    df = pd.read_csv(source).dropna() if isinstance(source, str) else source
+    if signal is None:
+        signal = df[LABEL].to_numpy()
+
+    with metrics.throughput("event_backtester.simulate", len(df)):
+        return simulate_arrays(
+            df["Open"].to_numpy(dtype=float),
+            df["High"].to_numpy(dtype=float),
+            df["Low"].to_numpy(dtype=float),
+            df["Close"].to_numpy(dtype=float),
+            df["atr"].to_numpy(dtype=float),
+            np.asarray(signal),
+            **options
+        )
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-candle event-driven backtest")
+    parser.add_argument("file")
+    parser.add_argument("--timeout", type=int, default=TIMEOUT)
+    parser.add_argument("--max-positions", type=int, default=MAX_POSITIONS)
+    parser.add_argument("--position-size", type=float, default=POSITION_SIZE)
+    parser.add_argument("--fee", type=float, default=FEE)
+    parser.add_argument("--slippage-bps", type=float, default=SLIPPAGE_BPS)
+    parser.add_argument("--ambiguity", choices=AMBIGUITY_RULES, default="sl_first")
+    parser.add_argument("--out", help="write the trade list to this CSV")
+    args = parser.parse_args()
+
+    summary, trades = simulate(
+        args.file, timeout=args.timeout, max_positions=args.max_positions,
+        position_size=args.position_size, fee=args.fee,
+        slippage_bps=args.slippage_bps, ambiguity=args.ambiguity,
+    )
+
+    for k, v in summary.items():
+        print(f"{k:16s}: {v}")
+
+    if args.out:
+        trades.to_csv(args.out, index=False)
+        print(f"\n[✔] Saved → {args.out}")
@@ -0,0 +1,196 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from src.resample import INTERVAL_MS, MAX_LIMIT, fetch_klines
+
+
+# ------------------------------
+# INCREMENTAL INDICATORS
+# ------------------------------
+# Each one holds state up to the last *closed* candle. peek() gives the
+# value for the candle still forming without committing it, push() commits
+# a closed candle. Values match the dashboard's pandas ema/rsi/macd exactly.
+class IncrementalEMA:
+    def __init__(self, period):
+        self.alpha = 2 / (period + 1)
+        self.value = None
+
+    def peek(self, x):
+        return x if self.value is None else self.value + self.alpha * (x - self.value)
+
+    def push(self, x):
+        self.value = self.peek(x)
+        return self.value
+
+
+class IncrementalRSI:
+    """Simple-average RSI over `period` closes, like the dashboard's rsi()."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None
+        self.gains = deque(maxlen=period - 1)
+        self.losses = deque(maxlen=period - 1)
+
+    def peek(self, x):
+        if self.prev is None or len(self.gains) < self.period - 1:
+            return np.nan
+        delta = x - self.prev
+        avg_gain = (sum(self.gains) + max(delta, 0.0)) / self.period
+        avg_loss = (sum(self.losses) + max(-delta, 0.0)) / self.period
+        rs = avg_gain / (avg_loss + 1e-9)
+        return 100 - (100 / (1 + rs))
+
+    def push(self, x):
+        value = self.peek(x)
+        if self.prev is not None:
+            delta = x - self.prev
+            self.gains.append(max(delta, 0.0))
+            self.losses.append(max(-delta, 0.0))
+        self.prev = x
+        return value
+
+
+class IncrementalMACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = IncrementalEMA(fast)
+        self.slow = IncrementalEMA(slow)
+        self.signal = IncrementalEMA(signal)
+
+    def peek(self, x):
+        line = self.fast.peek(x) - self.slow.peek(x)
+        sig = self.signal.peek(line)
+        return line, sig, line - sig
+
+    def push(self, x):
+        line = self.fast.push(x) - self.slow.push(x)
+        sig = self.signal.push(line)
+        return line, sig, line - sig
+
+
+class IndicatorState:
+    """The dashboard chart's indicator set, advanced one candle at a time."""
+
+    def __init__(self):
+        self.emas = {f"ema{p}": IncrementalEMA(p) for p in (9, 21, 50, 100)}
+        self.rsi = IncrementalRSI()
+        self.macd = IncrementalMACD()
+
+    def _values(self, x, commit):
+        out = {k: (e.push(x) if commit else e.peek(x)) for k, e in self.emas.items()}
+        out["rsi"] = self.rsi.push(x) if commit else self.rsi.peek(x)
+        out["macd"], out["macd_signal"], out["macd_hist"] = (
+            self.macd.push(x) if commit else self.macd.peek(x)
+        )
+        return out
+
+    def peek(self, x):
+        return self._values(x, commit=False)
+
+    def push(self, x):
+        return self._values(x, commit=True)
+
+
+# ------------------------------
+# SHARED LIVE FEED
+# ------------------------------
+class LiveFeed:
+    """
+    Latest candles for one symbol/interval, shared by every open dashboard.
+
+    poll() asks Binance only for candles since the live one, at most once
+    per `min_refresh` seconds however many sessions call it. After a gap
+    longer than one page it pages forward from the live candle, so no
+    closed candle is skipped. Each change is logged as (version, kind, row)
+    where kind is "update" (the live candle moved) or "append" (a new
+    candle opened) and row carries the candle plus its indicator values.
+    """
+
+    def __init__(self, symbol, interval, min_refresh=2.0, log_size=512, fetch=fetch_klines):
+        self.symbol = symbol
+        self.interval = interval
+        self.min_refresh = min_refresh
+        self.fetch = fetch
+
+        self.state = IndicatorState()
+        self.live = None              # the candle still forming
+        self.version = 0
+        self.log = deque(maxlen=log_size)
+        self._last_poll = 0.0
+        self.polled_at = None         # wall time of the last successful poll
+        self._lock = threading.Lock()
+
+    @property
+    def seeded(self):
+        return self.live is not None
+
+    def seed(self, df):
+        """Start from a chart frame (time, open, high, low, close, volume)."""
+        with self._lock:
+            if self.live is not None:
+                return
+            closes = df["close"].to_numpy(dtype=float)
+            for x in closes[:-1]:
+                self.state.push(x)
+            self.live = self._row(df.iloc[-1])
+
+    def _row(self, candle):
+        row = {k: candle[k] for k in ("time", "open", "high", "low", "close", "volume")}
+        row["time"] = pd.Timestamp(row["time"])
+        row.update(self.state.peek(float(row["close"])))
+        return row
+
+    def _apply(self, candle):
+        t = pd.Timestamp(candle["time"])
+        if t < self.live["time"]:
+            return
+        if t > self.live["time"]:
+            # The live candle closed: commit its final close, then move on
+            self.state.push(float(self.live["close"]))
+            kind = "append"
+        else:
+            kind = "update"
+        self.live = self._row(candle)
+        self.version += 1
+        self.log.append((self.version, kind, self.live))
+
+    def poll(self):
+        with self._lock:
+            if self.live is None or time.time() - self._last_poll < self.min_refresh:
+                return self.version
+            self._last_poll = time.time()
+
+            # Page forward from the live candle (it may have moved since)
+            step = INTERVAL_MS[self.interval]
+            while True:
+                start = int(self.live["time"].value // 1_000_000)
+                missing = (int(time.time() * 1000) - start) // step + 1
+                limit = int(min(max(missing, 2), MAX_LIMIT))
+                bars = self.fetch(self.symbol, self.interval, limit, start_time=start)
+                bars = bars.rename(columns={"open_time": "time"})
+                bars["time"] = pd.to_datetime(bars["time"], unit="ms")
+
+                for _, candle in bars.iterrows():
+                    self._apply(candle)
+                if len(bars) < limit or int(self.live["time"].value // 1_000_000) == start:
+                    break
+
+            self.polled_at = time.time()
+            return self.version
+
+    def changes_since(self, version):
+        """Logged changes after `version`, or None if the log no longer reaches back."""
+        with self._lock:
+            if version == self.version:
+                return []
+            if not self.log or self.log[0][0] > version + 1:
+                return None
+            return [entry for entry in self.log if entry[0] > version]
+
+    def all_changes(self):
+        with self._lock:
+            return list(self.log), self.version
@@ -0,0 +1,247 @@
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+
+# ------------------------------
+# SETTINGS
+# ------------------------------
+# Off unless CRYPTOPRE_METRICS=1 (or enable() is called). When off, every
+# hook returns a shared no-op context, so the hot path pays one flag check.
+ENABLED = os.environ.get("CRYPTOPRE_METRICS", "0").lower() in ("1", "true", "yes", "on")
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RESERVOIR = 2048          # recent samples kept per stage for percentiles
+QUANTILES = (0.5, 0.95, 0.99)
+PREFIX = "cryptopre"
+
+_lock = threading.Lock()
+_stages = {}
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+# ------------------------------
+# PER-STAGE HISTOGRAM
+# ------------------------------
+class StageStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.samples = deque(maxlen=RESERVOIR)
+        self.rows = 0
+        self.row_seconds = 0.0
+
+    def observe(self, seconds, rows=None):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+        self.samples.append(seconds)
+        if rows is not None:
+            self.rows += rows
+            self.row_seconds += seconds
+
+    def quantile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def rows_per_sec(self):
+        return self.rows / self.row_seconds if self.row_seconds > 0 else 0.0
+
+
+def observe(stage, seconds, rows=None):
+    if not ENABLED:
+        return
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = StageStats()
+        stats.observe(seconds, rows)
+
+
+# ------------------------------
+# TIMING HOOKS
+# ------------------------------
+class _NoopTimer:
+    # One instance is shared by every disabled call site, so it must not
+    # keep state: `t.rows = n` inside a block is accepted and dropped
+    __slots__ = ()
+
+    @property
+    def rows(self):
+        return None
+
+    @rows.setter
+    def rows(self, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ("stage", "rows", "start")
+
+    def __init__(self, stage, rows=None):
+        self.stage = stage
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.start, self.rows)
+        return False
+
+
+def timer(stage):
+    """with metrics.timer("predict.model"): ..."""
+    return _Timer(stage) if ENABLED else _NOOP
+
+
+def throughput(stage, rows=None):
+    """
+    Like timer(), but also counts rows for a rows/sec figure.
+    Set `t.rows` inside the block when the count is only known afterwards.
+    """
+    return _Timer(stage, rows if rows is not None else 0) if ENABLED else _NOOP
+
+
+def timed(stage):
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Timer(stage):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# ------------------------------
+# IN-PROCESS API
+# ------------------------------
+def snapshot():
+    with _lock:
+        items = list(_stages.items())
+
+    out = {}
+    for stage, s in sorted(items):
+        out[stage] = {
+            "count": s.count,
+            "total_s": s.total,
+            "mean_s": s.total / s.count if s.count else 0.0,
+            "p50_s": s.quantile(0.50),
+            "p95_s": s.quantile(0.95),
+            "p99_s": s.quantile(0.99),
+            "rows": s.rows,
+            "rows_per_sec": s.rows_per_sec(),
+        }
+    return out
+
+
+def report():
+    snap = snapshot()
+    if not snap:
+        print("[METRICS] No samples recorded (set CRYPTOPRE_METRICS=1).")
+        return
+    print(f"{'stage':32s} {'count':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'rows/s':>12s}")
+    for stage, m in snap.items():
+        rps = f"{m['rows_per_sec']:.0f}" if m["rows"] else "-"
+        print(f"{stage:32s} {m['count']:7d} {m['p50_s']*1e3:9.2f} "
+              f"{m['p95_s']*1e3:9.2f} {m['p99_s']*1e3:9.2f} {rps:>12s}")
+
+
+# ------------------------------
+# PROMETHEUS TEXT FORMAT
+# ------------------------------
+def render_prometheus():
+    with _lock:
+        items = sorted(_stages.items())
+
+    hist = f"{PREFIX}_stage_duration_seconds"
+    summ = f"{PREFIX}_stage_latency_seconds"
+    rows = f"{PREFIX}_stage_rows_total"
+    rate = f"{PREFIX}_stage_rows_per_second"
+
+    lines = [f"# HELP {hist} Wall time per pipeline/prediction stage.",
+             f"# TYPE {hist} histogram"]
+    for stage, s in items:
+        cumulative = 0
+        for le, n in zip(BUCKETS, s.buckets):
+            cumulative += n
+            lines.append(f'{hist}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+        lines.append(f'{hist}_bucket{{stage="{stage}",le="+Inf"}} {s.count}')
+        lines.append(f'{hist}_sum{{stage="{stage}"}} {s.total}')
+        lines.append(f'{hist}_count{{stage="{stage}"}} {s.count}')
+
+    lines += [f"# HELP {summ} Recent-sample latency quantiles per stage.",
+              f"# TYPE {summ} summary"]
+    for stage, s in items:
+        for q in QUANTILES:
+            lines.append(f'{summ}{{stage="{stage}",quantile="{q}"}} {s.quantile(q)}')
+        lines.append(f'{summ}_sum{{stage="{stage}"}} {s.total}')
+        lines.append(f'{summ}_count{{stage="{stage}"}} {s.count}')
+
+    lines += [f"# HELP {rows} Rows processed by batch stages.",
+              f"# TYPE {rows} counter"]
+    lines += [f'{rows}{{stage="{stage}"}} {s.rows}' for stage, s in items if s.rows]
+
+    lines += [f"# HELP {rate} Average rows/sec of batch stages.",
+              f"# TYPE {rate} gauge"]
+    lines += [f'{rate}{{stage="{stage}"}} {s.rows_per_sec()}' for stage, s in items if s.rows]
+
+    return "\n".join(lines) + "\n"
+
+
+def serve_metrics(port=9108, host="127.0.0.1"):
+    """Expose /metrics on a daemon thread (for the batch scripts)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[METRICS] Serving http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,165 @@
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+from src import labeler
+from src import predict
+from src.bundle import read_header
+from src.backtester import DATA_PATH, LABEL, _backtest_frame
+from src.event_backtester import simulate
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "data", "predictions")
+
+BATCH_ROWS = 200_000
+THRESHOLDS = (0, 40, 50, 60, 70)     # minimum confidence % to act on a signal
+
+# Columns build_features zeroes at inference time; zero them here too so
+# the score has no look-ahead. Other columns (e.g. regime) come from the
+# offline pipeline, whose definitions differ from build_features, so these
+# scores approximate live ones rather than reproduce them.
+LIVE_ZEROED = ["future_close", "future_return"]
+
+
+# ----------------------------------------------
+# MODEL VERSION
+# ----------------------------------------------
+def model_version(paths=None):
+    paths = paths or predict.asset_paths()
+    if len(paths) == 1:
+        # Bundles carry a digest of their contents
+        return read_header(paths[0])["sha256"][:16]
+    h = hashlib.sha256()
+    for p in paths:
+        with open(p, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+
+# ----------------------------------------------
+# BATCHED SCORING (cached per model version)
+# ----------------------------------------------
+def score_history(df, assets, batch_rows=BATCH_ROWS):
+    """Class probabilities for every row, scored in large batches."""
+    model, scaler, features = assets
+
+    X = df.reindex(columns=features).astype(float)
+    for col in LIVE_ZEROED:
+        if col in X.columns:
+            X[col] = 0.0
+    X = X.replace([np.inf, -np.inf], 0).fillna(0)
+
+    out = []
+    with metrics.throughput("model_backtest.score", len(X)):
+        for start in range(0, len(X), batch_rows):
+            X_scaled = predict.safe_scale(scaler, X.iloc[start:start + batch_rows].copy())
+            out.append(model.predict_proba(X_scaled).astype(np.float32))
+
+    return np.concatenate(out) if out else np.empty((0, len(predict.SIGNAL_MAP)), np.float32)
+
+
+def _source_signature(path):
+    st = os.stat(path)
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+def cached_probabilities(path, df, assets, version, cache_dir=CACHE_DIR):
+    cache_file = os.path.join(cache_dir, version, os.path.basename(path) + ".npz")
+    signature = _source_signature(path)
+
+    if os.path.exists(cache_file):
+        # Closed before returning, so a later savez can replace the file on Windows
+        with np.load(cache_file) as cached:
+            if np.array_equal(cached["signature"], signature) and len(cached["proba"]) == len(df):
+                return cached["proba"], True
+
+    proba = score_history(df, assets)
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    np.savez(cache_file, proba=proba, signature=signature)
+    return proba, False
+
+
+def signals_from_proba(proba, threshold=0):
+    """Backtester codes for the model's calls; below `threshold` % becomes HOLD."""
+    pred = proba.argmax(axis=1)
+    conf = proba.max(axis=1) * 100
+
+    # Class k is labeler LABEL code k (the training target), the same
+    # mapping predict.SIGNAL_MAP uses for live signals
+    lookup = np.array([labeler.TO_BACKTEST[k] for k in range(proba.shape[1])])
+    codes = lookup[pred]
+    codes[conf < threshold] = labeler.TO_BACKTEST[labeler.HOLD]
+    return codes
+
+
+# ----------------------------------------------
+# BACKTEST MODEL SIGNALS
+# ----------------------------------------------
+def backtest_model(path, assets, version, thresholds=THRESHOLDS, mode="next", **event_options):
+    """
+    Backtest one labeled file on the model's signals instead of its labels.
+    mode="next" uses backtest_coin's next-candle rules, mode="event" the
+    multi-candle simulator.
+    """
+    df = pd.read_csv(path).dropna().reset_index(drop=True)
+    proba, hit = cached_probabilities(path, df, assets, version)
+
+    rows = []
+    for th in thresholds:
+        signal = signals_from_proba(proba, th)
+        if mode == "event":
+            summary, _ = simulate(df, signal=signal, **event_options)
+        else:
+            summary, _, _ = _backtest_frame(df.assign(**{LABEL: signal}))
+        rows.append({"File": os.path.basename(path), "Min Confidence %": th, **summary})
+
+    return rows, hit
+
+
+def run_model_backtests(thresholds=THRESHOLDS, mode="next", files=None, **event_options):
+    assets = predict.load_assets()
+    version = model_version()
+    print(f"[MODEL] Version {version}")
+
+    if files is None:
+        files = sorted(os.path.join(DATA_PATH, f) for f in os.listdir(DATA_PATH)
+                       if f.startswith("labeled_"))
+
+    rows = []
+    for path in files:
+        file_rows, hit = backtest_model(path, assets, version, thresholds, mode, **event_options)
+        rows.extend(file_rows)
+        print(f"[✔] {os.path.basename(path)} ({'cached' if hit else 'scored'} predictions)")
+
+    return pd.DataFrame(rows)
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest the model's own predictions")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=THRESHOLDS)
+    parser.add_argument("--mode", choices=["next", "event"], default="next")
+    parser.add_argument("--out", help="write the result table to this CSV")
+    args = parser.parse_args()
+
+    table = run_model_backtests(args.thresholds, args.mode)
+    print()
+    print(table.to_string(index=False))
+
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"\n[✔] Saved → {args.out}")
+
+    if metrics.ENABLED:
+        metrics.report()
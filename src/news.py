@@ -0,0 +1,221 @@
+import argparse
+import threading
+import time
+
+from src import transport
+
+
+# ------------------------------
+# NEWS SETTINGS
+# ------------------------------
+NEWS_URL = "https://cryptopanic.com/api/v1/posts/"
+NEWS_PARAMS = {"auth_token": "", "kind": "news", "filter": "hot"}
+
+REFRESH_SECONDS = 300     # a currency's news is re-fetched this often
+RETRY_SECONDS = 60        # after a failed fetch
+IDLE_SECONDS = 1800       # stop refreshing currencies nobody has read for this long
+EVICT_SECONDS = 7200      # and drop them from the cache after this long
+TIMEOUT = 5
+LIMIT = 7
+
+
+# ------------------------------
+# PARSING
+# ------------------------------
+def currency_of(symbol):
+    return symbol.replace("USDT", "")
+
+
+def parse_posts(posts, limit=LIMIT):
+    news_list = []
+    for p in posts[:limit]:
+        votes = p.get("votes", {})
+        bull = votes.get("positive", 0)
+        bear = votes.get("negative", 0)
+
+        if bull > bear:
+            sentiment = "🟢 Bullish"
+        elif bear > bull:
+            sentiment = "🔴 Bearish"
+        else:
+            sentiment = "🟡 Neutral"
+
+        news_list.append({
+            "title": p.get("title", "No title"),
+            "source": p.get("source", {}).get("title", "Unknown"),
+            "url": p.get("url", ""),
+            "published": p.get("published_at", "")[:10],
+            "sentiment": sentiment
+        })
+
+    return news_list
+
+
+# ------------------------------
+# SHARED NEWS CACHE
+# ------------------------------
+class NewsEntry:
+    __slots__ = ("items", "etag", "last_modified", "fetched_at", "due", "last_read", "error", "ready")
+
+    def __init__(self):
+        self.items = []
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = 0.0
+        self.due = 0.0
+        self.last_read = time.time()
+        self.error = None
+        self.ready = threading.Event()   # set once the first fetch finishes
+
+
+class NewsCache:
+    """
+    Latest news per currency, shared by every reader.
+
+    Readers never touch the network: get() returns whatever is cached, even
+    if stale, and a background worker refreshes each currency once per
+    `refresh` seconds (stale-while-revalidate). Refreshes send the last
+    ETag / Last-Modified, so an unchanged feed costs a 304 and no parsing.
+    However many sessions read BTC, BTC costs one upstream request per period.
+    """
+
+    def __init__(self, refresh=REFRESH_SECONDS, retry=RETRY_SECONDS,
+                 idle=IDLE_SECONDS, evict=EVICT_SECONDS, url=NEWS_URL, params=None, timeout=TIMEOUT):
+        self.refresh = refresh
+        self.retry = retry
+        self.idle = idle
+        self.evict = max(evict, idle)
+        self.url = url
+        self.params = dict(NEWS_PARAMS if params is None else params)
+        self.timeout = timeout
+
+        self.requests = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- read path ----
+    def get(self, symbol, wait=0.0):
+        """
+        Cached news for `symbol`. Only a currency never fetched before can
+        wait, and only up to `wait` seconds; stale data is returned at once.
+        """
+        coin = currency_of(symbol)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(coin)
+            if entry is None:
+                entry = self._entries[coin] = NewsEntry()
+                self._wake.set()
+            elif now - entry.last_read >= self.idle and entry.due <= now:
+                # Back from idle with an overdue refresh the worker is not waiting for
+                self._wake.set()
+            entry.last_read = now
+
+        if wait and not entry.ready.is_set():
+            entry.ready.wait(wait)
+        return entry.items
+
+    def status(self, symbol):
+        entry = self._entries.get(currency_of(symbol))
+        if entry is None or not entry.ready.is_set():
+            return "loading"
+        if entry.error:
+            return f"stale ({entry.error})"
+        return f"updated {int(time.time() - entry.fetched_at)}s ago"
+
+    # ---- refresh path ----
+    def fetch(self, coin, entry):
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        self.requests += 1
+        r = transport.get(self.url, params={**self.params, "currencies": coin},
+                          headers=headers, timeout=self.timeout)
+
+        if r.status_code == 304:
+            return False
+        r.raise_for_status()
+
+        entry.items = parse_posts(r.json().get("results", []))
+        entry.etag = r.headers.get("ETag")
+        entry.last_modified = r.headers.get("Last-Modified")
+        return True
+
+    def refresh_due(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            due = [(coin, e) for coin, e in self._entries.items()
+                   if e.due <= now and now - e.last_read < self.idle]
+
+        for coin, entry in due:
+            try:
+                self.fetch(coin, entry)
+                entry.error = None
+                entry.fetched_at = time.time()
+                entry.due = entry.fetched_at + self.refresh
+            except Exception as e:
+                entry.error = type(e).__name__
+                entry.due = time.time() + self.retry
+            entry.ready.set()
+
+        return len(due)
+
+    def next_due(self, now=None):
+        """Earliest refresh among entries still being read; evicts long-unread ones."""
+        now = now or time.time()
+        with self._lock:
+            for coin in [c for c, e in self._entries.items() if now - e.last_read >= self.evict]:
+                del self._entries[coin]
+            upcoming = [e.due for e in self._entries.values() if now - e.last_read < self.idle]
+        return min(upcoming) if upcoming else None
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            self.refresh_due()
+            due = self.next_due()
+            wait = due - time.time() if due is not None else self.refresh
+            self._wake.wait(min(max(wait, 0.05), self.refresh))
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="news-cache", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+SHARED_NEWS = NewsCache()
+
+
+def get_crypto_news(symbol, wait=0.0):
+    """Non-blocking read from the shared, background-refreshed cache."""
+    return SHARED_NEWS.start().get(symbol, wait=wait)
+
+
+# ------------------------------
+# MAIN
+# ------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print cached CryptoPanic news")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--wait", type=float, default=TIMEOUT)
+    args = parser.parse_args()
+
+    for symbol in args.symbols:
+        print(f"== {symbol} ({len(get_crypto_news(symbol, wait=args.wait))} items, "
+              f"{SHARED_NEWS.status(symbol)})")
+        for item in SHARED_NEWS.get(symbol):
+            print(f"  {item['sentiment']} {item['published']} {item['title']} — {item['source']}")
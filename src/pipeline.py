@@ -0,0 +1,423 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from src import profiling
+
+
+# -------------------------------------------------------
+# PATHS + DEFAULTS
+# -------------------------------------------------------
+# Stage modules (ta, sklearn, xgboost) are imported inside the stage
+# functions, so checking an up-to-date pipeline never pays for them.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(BASE_DIR, "src")
+DATA_PATH = os.path.join(BASE_DIR, "data", "processed")
+RESULTS_PATH = os.path.join(BASE_DIR, "backtest_results")
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+
+MANIFEST_PATH = os.path.join(DATA_PATH, "pipeline_manifest.json")
+
+SYMBOLS = ["BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT",
+           "ADAUSDT", "AVAXUSDT", "DOGEUSDT", "DOTUSDT", "TRXUSDT"]
+INTERVAL = "1h"
+
+KINDS = ["fetch", "indicators", "regime", "labels", "backtest", "report", "train"]
+
+
+# -------------------------------------------------------
+# STAGE FUNCTIONS (run in worker processes)
+# -------------------------------------------------------
+def run_fetch(symbol, interval, out):
+    from src import features
+    features.fetch_full_history(symbol, interval).to_csv(out, index=False)
+
+
+def run_indicators(src, out):
+    import pandas as pd
+    from src import features
+    features.add_indicators(pd.read_csv(src)).to_csv(out, index=False)
+
+
+def run_regime(src, out):
+    from src import regime
+    if regime.add_regime_file(src, out) is None:
+        raise ValueError(f"{os.path.basename(src)} is missing indicator columns")
+
+
+def run_labels(src, out):
+    from src import labeler
+    if labeler.label_file(src, out) is None:
+        raise ValueError(f"{os.path.basename(src)} has no Close column")
+
+
+def run_backtest(src, out):
+    import pandas as pd
+    from src import backtester, labeler
+    coin = os.path.basename(src)
+    df = pd.read_csv(src).dropna()
+    if backtester.LABEL not in df.columns:
+        df[backtester.LABEL] = df["LABEL"].map(labeler.TO_BACKTEST)
+    summary, trades = backtester.backtest_frame_table(df)
+    trades.insert(0, "coin", coin)
+    backtester.save_results({coin: summary}, trades, out)
+
+
+def run_report(sources, out):
+    """Merge per-coin backtests into the single results file backtester writes."""
+    import pandas as pd
+    from src import backtester
+    summaries, frames = {}, []
+    for path in sources:
+        summary, trades = backtester.load_results(path)
+        summaries.update(summary.to_dict(orient="index"))
+        frames.append(trades)
+    backtester.save_results(summaries, pd.concat(frames, ignore_index=True), out)
+
+
+def run_train(sources, outputs):
+    from src import train
+    train.train_model(files=list(sources))
+
+
+def _profiled_stage(kind, name, fn, *args):
+    with profiling.profile(kind, name.partition(":")[2] or None):
+        return fn(*args)
+
+
+# -------------------------------------------------------
+# HASHING
+# -------------------------------------------------------
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+_SOURCE_CACHE = {}
+
+
+def _defines(node, name):
+    if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+        return node.name == name
+    if isinstance(node, ast.Assign):
+        names = [t for target in node.targets
+                 for t in (target.elts if isinstance(target, ast.Tuple) else [target])]
+        return any(isinstance(t, ast.Name) and t.id == name for t in names)
+    return False
+
+
+def code_hash(refs):
+    """
+    Hash the source of ("module.py", "name") pairs without importing them,
+    so editing one stage's code invalidates only that stage. A name may be
+    a function, a class or a module-level constant (the whole assignment,
+    e.g. `HOLD, SELL, BUY = 0, 1, 2`, is hashed).
+    """
+    h = hashlib.sha256()
+    for module, name in refs:
+        path = os.path.join(SRC_DIR, module)
+        if path not in _SOURCE_CACHE:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            _SOURCE_CACHE[path] = (text, ast.parse(text))
+        text, tree = _SOURCE_CACHE[path]
+        node = next((n for n in tree.body if _defines(n, name)), None)
+        if node is None:
+            raise KeyError(f"{name} not found in {module}")
+        h.update(f"{module}:{name}\n".encode())
+        h.update(ast.get_source_segment(text, node).encode())
+    return h.hexdigest()
+
+
+class Manifest:
+    """
+    Stage keys and output hashes from previous runs, plus a stat cache so a
+    file whose size and mtime are unchanged is never re-read.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.files = data.get("files", {})
+        self.stages = data.get("stages", {})
+
+    def _rel(self, path):
+        return os.path.relpath(path, BASE_DIR)
+
+    def file_hash(self, path):
+        st = os.stat(path)
+        rel = self._rel(path)
+        entry = self.files.get(rel)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+        digest = _sha256_file(path)
+        self.files[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"files": self.files, "stages": self.stages}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+# -------------------------------------------------------
+# STAGES + DAG
+# -------------------------------------------------------
+class Stage:
+    def __init__(self, name, kind, fn, args, inputs=(), outputs=(), params=None, code=()):
+        self.name = name
+        self.kind = kind
+        self.fn = fn
+        self.args = args
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or {}
+        self.code = list(code)
+        self.deps = set()
+
+    def key(self, manifest):
+        payload = {
+            "kind": self.kind,
+            "params": self.params,
+            "code": code_hash(self.code),
+            "inputs": [[manifest._rel(p), manifest.file_hash(p)] for p in self.inputs],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def up_to_date(self, manifest, key):
+        record = manifest.stages.get(self.name)
+        if record is None or record["key"] != key:
+            return False
+        for path in self.outputs:
+            if not os.path.exists(path) or manifest.file_hash(path) != record["outputs"].get(manifest._rel(path)):
+                return False
+        return True
+
+
+# Source each stage's output depends on: the pipeline wrapper, the stage
+# body and the module constants it reads (thresholds, trade sizing, model
+# parameters, label codes)
+LABEL_CODES = [("labeler.py", "HOLD")]
+
+FETCH_CODE = [("pipeline.py", "run_fetch"), ("features.py", "fetch_full_history")]
+INDICATORS_CODE = [("pipeline.py", "run_indicators"), ("features.py", "add_indicators"),
+                   ("features.py", "_add_indicators")]
+REGIME_CODE = [("pipeline.py", "run_regime"), ("regime.py", "detect_regime"),
+               ("regime.py", "_detect_regime"), ("regime.py", "REQUIRED"),
+               ("regime.py", "add_regime_file")]
+LABELS_CODE = LABEL_CODES + [
+    ("pipeline.py", "run_labels"), ("labeler.py", "apply_labels"),
+    ("labeler.py", "_apply_labels"), ("labeler.py", "label_file"),
+]
+BACKTEST_CODE = LABEL_CODES + [
+    ("pipeline.py", "run_backtest"), ("labeler.py", "TO_BACKTEST"),
+    ("backtester.py", "LABEL"), ("backtester.py", "INITIAL_BALANCE"),
+    ("backtester.py", "SL_ATR_MULT"), ("backtester.py", "TP_ATR_MULT"),
+    ("backtester.py", "LOSS_FACTOR"), ("backtester.py", "WIN_FACTOR"),
+    ("backtester.py", "NONE"), ("backtester.py", "OUTCOMES"),
+    ("backtester.py", "backtest_frame_table"), ("backtester.py", "next_candle_trades"),
+    ("backtester.py", "next_candle_inputs"), ("backtester.py", "compute_levels_array"),
+    ("backtester.py", "equity_from_outcomes"), ("backtester.py", "summarize"),
+    ("backtester.py", "save_results"),
+]
+REPORT_CODE = [("pipeline.py", "run_report"), ("backtester.py", "load_results"),
+               ("backtester.py", "save_results")]
+TRAIN_CODE = LABEL_CODES + [
+    ("pipeline.py", "run_train"), ("train.py", "NON_FEATURES"),
+    ("train.py", "XGB_PARAMS"), ("train.py", "NUM_BOOST_ROUND"),
+    ("train.py", "load_dataset"), ("train.py", "prepare_data"),
+    ("train.py", "_prepare_data"), ("train.py", "train_model"),
+    ("bundle.py", "FORMAT_VERSION"), ("bundle.py", "write_bundle"),
+]
+
+
+def build_dag(symbols=SYMBOLS, interval=INTERVAL):
+    stages = []
+    labeled, backtests = [], []
+
+    for sym in symbols:
+        hist = os.path.join(DATA_PATH, f"hist_{sym}.csv")
+        ind = os.path.join(DATA_PATH, f"ind_{sym}.csv")
+        feat = os.path.join(DATA_PATH, f"feat_{sym}.csv")
+        lab = os.path.join(DATA_PATH, f"labeled_feat_{sym}.csv")
+        bt = os.path.join(RESULTS_PATH, f"bt_{sym}.parquet")
+
+        stages += [
+            Stage(f"fetch:{sym}", "fetch", run_fetch, (sym, interval, hist),
+                  outputs=[hist], params={"symbol": sym, "interval": interval},
+                  code=FETCH_CODE),
+            Stage(f"indicators:{sym}", "indicators", run_indicators, (hist, ind),
+                  inputs=[hist], outputs=[ind], code=INDICATORS_CODE),
+            Stage(f"regime:{sym}", "regime", run_regime, (ind, feat),
+                  inputs=[ind], outputs=[feat], code=REGIME_CODE),
+            Stage(f"labels:{sym}", "labels", run_labels, (feat, lab),
+                  inputs=[feat], outputs=[lab], code=LABELS_CODE),
+            Stage(f"backtest:{sym}", "backtest", run_backtest, (lab, bt),
+                  inputs=[lab], outputs=[bt], code=BACKTEST_CODE),
+        ]
+        labeled.append(lab)
+        backtests.append(bt)
+
+    results_file = os.path.join(RESULTS_PATH, "backtest_results.parquet")
+    model_files = [os.path.join(MODEL_DIR, "universal_signal_model.bundle")]
+    stages += [
+        Stage("report", "report", run_report, (backtests, results_file),
+              inputs=backtests, outputs=[results_file],
+              code=REPORT_CODE),
+        Stage("train", "train", run_train, (labeled, model_files),
+              inputs=labeled, outputs=model_files,
+              code=TRAIN_CODE),
+    ]
+
+    producer = {out: s for s in stages for out in s.outputs}
+    for s in stages:
+        s.deps = {producer[p].name for p in s.inputs if p in producer}
+    return {s.name: s for s in stages}
+
+
+def select(dag, kinds):
+    """The stages of the given kinds plus everything they depend on."""
+    wanted = [n for n, s in dag.items() if s.kind in kinds]
+    keep = set()
+    while wanted:
+        name = wanted.pop()
+        if name not in keep:
+            keep.add(name)
+            wanted.extend(dag[name].deps)
+    return {n: s for n, s in dag.items() if n in keep}
+
+
+# -------------------------------------------------------
+# RUN
+# -------------------------------------------------------
+def run_pipeline(symbols=SYMBOLS, interval=INTERVAL, kinds=KINDS, workers=None,
+                 refresh=False, dry_run=False, manifest_path=MANIFEST_PATH):
+    """
+    Run every stale stage, each as soon as its inputs are ready. A stage is
+    skipped when its key (input hashes + params + stage source) matches the
+    last run and its outputs are untouched; `refresh` re-downloads history.
+    Returns {stage: "ran" | "stale" (dry run) | "skipped" | "failed" | "blocked"}.
+    """
+    started = time.perf_counter()
+    os.makedirs(DATA_PATH, exist_ok=True)
+    os.makedirs(RESULTS_PATH, exist_ok=True)
+    os.makedirs(MODEL_DIR, exist_ok=True)
+
+    dag = select(build_dag(symbols, interval), kinds)
+    manifest = Manifest(manifest_path)
+    status = {}
+    running = {}
+    pool = None
+
+    def ready():
+        return [s for n, s in dag.items()
+                if n not in status and n not in running.values() and s.deps <= status.keys()]
+
+    try:
+        while len(status) < len(dag):
+            progressed = False
+            for stage in ready():
+                progressed = True
+                if any(status[d] in ("failed", "blocked") for d in stage.deps):
+                    status[stage.name] = "blocked"
+                    continue
+
+                # Downstream of a stale stage is stale; its inputs may not exist yet
+                if dry_run and any(status[d] == "stale" for d in stage.deps):
+                    print(f"[STALE] {stage.name}")
+                    status[stage.name] = "stale"
+                    continue
+
+                key = stage.key(manifest)
+                if not (refresh and stage.kind == "fetch") and stage.up_to_date(manifest, key):
+                    status[stage.name] = "skipped"
+                    continue
+
+                if dry_run:
+                    print(f"[STALE] {stage.name}")
+                    status[stage.name] = "stale"
+                    continue
+
+                pool = pool or ProcessPoolExecutor(max_workers=workers)
+                if profiling.ENABLED:
+                    fut = pool.submit(_profiled_stage, stage.kind, stage.name, stage.fn, *stage.args)
+                else:
+                    fut = pool.submit(stage.fn, *stage.args)
+                fut.key = key
+                running[fut] = stage.name
+                print(f"[RUN] {stage.name}")
+
+            if progressed and not running:
+                continue
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                stage = dag[name]
+                try:
+                    fut.result()
+                except Exception as e:
+                    status[name] = "failed"
+                    print(f"[ERROR] {name}: {e}")
+                    continue
+
+                manifest.stages[name] = {
+                    "key": fut.key,
+                    "outputs": {manifest._rel(p): manifest.file_hash(p) for p in stage.outputs},
+                }
+                manifest.save()
+                status[name] = "ran"
+                print(f"[✔] {name}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+        if not dry_run:
+            manifest.save()
+
+    counts = {k: sum(1 for v in status.values() if v == k)
+              for k in ("ran", "stale", "skipped", "failed", "blocked")}
+    print(f"\n[PIPELINE] {counts['ran']} ran, {counts['stale']} stale, {counts['skipped']} up to date, "
+          f"{counts['failed']} failed, {counts['blocked']} blocked "
+          f"({time.perf_counter() - started:.2f}s)")
+    return status
+
+
+# -------------------------------------------------------
+# MAIN
+# -------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental features → regime → labels → backtest/train pipeline")
+    parser.add_argument("--symbols", nargs="+", default=SYMBOLS)
+    parser.add_argument("--interval", default=INTERVAL)
+    parser.add_argument("--stages", nargs="+", choices=KINDS, default=KINDS,
+                        help="stage kinds to bring up to date (their inputs are included)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--refresh", action="store_true", help="re-download price history")
+    parser.add_argument("--dry-run", action="store_true", help="list stale stages without running them")
+    parser.add_argument("--profile", nargs="?", const=",".join(profiling.DEFAULT_MODES), metavar="MODES",
+                        help=f"profile each stage ({', '.join(profiling.MODES)} or all); see src/profiling.py")
+    args = parser.parse_args()
+
+    if args.profile:
+        profiling.enable(args.profile)
+        print(f"[PROFILE] {','.join(profiling.ACTIVE)} → {profiling.run_dir()}")
+
+    status = run_pipeline(args.symbols, args.interval, args.stages, args.workers,
+                          args.refresh, args.dry_run)
+    if any(v in ("failed", "blocked") for v in status.values()):
+        raise SystemExit(1)
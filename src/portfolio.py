@@ -0,0 +1,214 @@
+import argparse
+import csv
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+
+from src import labeler, metrics
+from src.backtester import (
+    DATA_PATH, RESULTS_PATH, LABEL, INITIAL_BALANCE, SL_ATR_MULT, TP_ATR_MULT
+)
+
+
+# ----------------------------------------------
+# SETTINGS
+# ----------------------------------------------
+TIME_COL = "open_time"
+
+ALLOC_PER_TRADE = 0.05       # fraction of equity per new position
+MAX_GROSS_EXPOSURE = 1.0     # sum of open notional / equity
+MAX_POSITIONS = 20           # concurrent positions across all coins
+FEE = 0.0004                 # per side, fraction of notional
+
+CHUNK_ROWS = 50_000          # rows read per coin at a time
+EQUITY_FILE = os.path.join(RESULTS_PATH, "portfolio_equity.csv")
+
+COLUMNS = [TIME_COL, "High", "Low", "Close", "atr", LABEL]
+RAW_LABEL = "LABEL"          # labeler's column, used when LABEL is absent
+
+
+# ----------------------------------------------
+# STREAM ONE COIN
+# ----------------------------------------------
+def stream_coin(path, coin_id, chunk_rows=CHUNK_ROWS):
+    """
+    Yield (time, coin_id, high, low, close, atr, signal) per candle, reading
+    the file in chunks. Without a time column the row number is the clock.
+    Files straight from the labeler only have LABEL; it is mapped to the
+    backtester's codes through labeler.TO_BACKTEST.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    has_time = TIME_COL in header
+    raw = LABEL not in header and RAW_LABEL in header
+    usecols = [c for c in COLUMNS if c in header] + ([RAW_LABEL] if raw else [])
+    if not has_time:
+        print(f"[WARN] {os.path.basename(path)} has no {TIME_COL}; aligning by row number.")
+
+    offset = 0
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows):
+        chunk = chunk.dropna()
+        if raw:
+            chunk[LABEL] = chunk[RAW_LABEL].map(labeler.TO_BACKTEST)
+        t = chunk[TIME_COL].to_numpy(dtype=np.int64) if has_time else np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield from zip(
+            t.tolist(), [coin_id] * len(chunk),
+            chunk["High"].tolist(), chunk["Low"].tolist(), chunk["Close"].tolist(),
+            chunk["atr"].tolist(), chunk[LABEL].tolist()
+        )
+
+
+# ----------------------------------------------
+# PORTFOLIO BACKTEST
+# ----------------------------------------------
+def backtest_portfolio(files=None, alloc_per_trade=ALLOC_PER_TRADE,
+                       max_gross_exposure=MAX_GROSS_EXPOSURE, max_positions=MAX_POSITIONS,
+                       fee=FEE, initial_balance=INITIAL_BALANCE,
+                       equity_path=EQUITY_FILE, chunk_rows=CHUNK_ROWS):
+    """
+    Backtest every labeled coin against one shared balance.
+
+    Per-coin candle streams are k-way merged on time with heapq.merge, so
+    memory holds one chunk per coin plus open positions, never a wide
+    frame of all symbols. Trade rules follow backtest_coin: a BUY/SELL
+    signal enters at the close and is resolved on that coin's next candle
+    (SL first, then TP, otherwise closed at that candle's close). Position
+    size is alloc_per_trade of equity, capped by max_positions and
+    max_gross_exposure. The equity curve is written to `equity_path` as
+    the timeline advances.
+    """
+    if files is None:
+        files = sorted(os.path.join(DATA_PATH, f) for f in os.listdir(DATA_PATH)
+                       if f.startswith("labeled_"))
+    if not files:
+        raise Exception("[ERROR] No labeled files found!")
+
+    coins = [os.path.basename(f) for f in files]
+    streams = [stream_coin(f, i, chunk_rows) for i, f in enumerate(files)]
+
+    balance = float(initial_balance)
+    open_pos = {}          # coin_id -> (side, entry, sl, tp, notional)
+    exposure = 0.0
+    peak = balance
+    max_dd = 0.0
+    peak_exposure = 0.0
+
+    per_coin = {c: {"Trades": 0, "Wins": 0, "Losses": 0, "PnL": 0.0} for c in coins}
+    events = 0
+    stamps = 0
+
+    out = open(equity_path, "w", newline="")
+    writer = csv.writer(out)
+    writer.writerow(["time", "equity", "exposure", "open_positions"])
+    buffer = []
+
+    def close_stamp(t):
+        nonlocal peak, max_dd, stamps
+        peak = max(peak, balance)
+        max_dd = max(max_dd, (peak - balance) / peak)
+        buffer.append((t, balance, exposure, len(open_pos)))
+        stamps += 1
+        if len(buffer) >= 10_000:
+            writer.writerows(buffer)
+            buffer.clear()
+
+    current_t = None
+    try:
+        with metrics.throughput("portfolio.backtest") as timer:
+            for t, cid, high, low, close, atr, signal in heapq.merge(*streams):
+                events += 1
+                if t != current_t:
+                    if current_t is not None:
+                        close_stamp(current_t)
+                    current_t = t
+
+                # Resolve this coin's position on its next candle
+                pos = open_pos.pop(cid, None)
+                if pos is not None:
+                    side, entry, sl, tp, notional = pos
+                    if (side > 0 and low <= sl) or (side < 0 and high >= sl):
+                        exit_px = sl
+                    elif (side > 0 and high >= tp) or (side < 0 and low <= tp):
+                        exit_px = tp
+                    else:
+                        exit_px = close
+
+                    pnl = notional * (side * (exit_px - entry) / entry - fee * (1 + exit_px / entry))
+                    balance += pnl
+                    exposure -= notional
+
+                    stats = per_coin[coins[cid]]
+                    stats["Trades"] += 1
+                    stats["PnL"] += pnl
+                    if pnl > 0:
+                        stats["Wins"] += 1
+                    else:
+                        stats["Losses"] += 1
+
+                # Open a new one if limits allow
+                if signal in (2, 0) and len(open_pos) < max_positions and balance > 0:
+                    room = max_gross_exposure * balance - exposure
+                    notional = min(alloc_per_trade * balance, room)
+                    if notional > 0:
+                        side = 1 if signal == 2 else -1
+                        sl = close - side * SL_ATR_MULT * atr
+                        tp = close + side * TP_ATR_MULT * atr
+                        open_pos[cid] = (side, close, sl, tp, notional)
+                        exposure += notional
+                        peak_exposure = max(peak_exposure, exposure / balance)
+
+            if current_t is not None:
+                close_stamp(current_t)
+            timer.rows = events
+    finally:
+        writer.writerows(buffer)
+        out.close()
+
+    coin_table = pd.DataFrame.from_dict(per_coin, orient="index")
+    coin_table.index.name = "coin"
+
+    trades = int(coin_table["Trades"].sum())
+    wins = int(coin_table["Wins"].sum())
+
+    summary = {
+        "Symbols": len(coins),
+        "Timestamps": stamps,
+        "Total Trades": trades,
+        "Wins": wins,
+        "Losses": trades - wins,
+        "Accuracy %": (wins / trades) * 100 if trades > 0 else 0,
+        "Peak Exposure %": peak_exposure * 100,
+        "Max Drawdown %": max_dd * 100,
+        "Final Balance": balance,
+        "Return %": (balance - initial_balance) / initial_balance * 100,
+        "Open At End": len(open_pos),
+    }
+    return summary, coin_table
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared-capital backtest across all labeled coins")
+    parser.add_argument("--alloc", type=float, default=ALLOC_PER_TRADE)
+    parser.add_argument("--max-exposure", type=float, default=MAX_GROSS_EXPOSURE)
+    parser.add_argument("--max-positions", type=int, default=MAX_POSITIONS)
+    parser.add_argument("--fee", type=float, default=FEE)
+    args = parser.parse_args()
+
+    summary, coin_table = backtest_portfolio(
+        alloc_per_trade=args.alloc, max_gross_exposure=args.max_exposure,
+        max_positions=args.max_positions, fee=args.fee,
+    )
+
+    print(coin_table.sort_values("PnL", ascending=False).to_string())
+    print()
+    for k, v in summary.items():
+        print(f"{k:16s}: {v}")
+    print(f"\n[✔] Equity curve → {EQUITY_FILE}")
+
+    if metrics.ENABLED:
+        metrics.report()
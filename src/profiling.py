@@ -0,0 +1,405 @@
+import argparse
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+
+# ------------------------------
+# SETTINGS
+# ------------------------------
+# Off unless CRYPTOPRE_PROFILE is set (or enable() is called). When off,
+# profile() returns a shared no-op context, as metrics.timer() does.
+#   CRYPTOPRE_PROFILE=1                 cProfile + tracemalloc
+#   CRYPTOPRE_PROFILE=all               cProfile + sampling + tracemalloc
+#   CRYPTOPRE_PROFILE=sample,memory     any comma-separated subset of MODES
+MODES = ("cprofile", "sample", "memory")
+DEFAULT_MODES = ("cprofile", "memory")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_DIR = os.environ.get("CRYPTOPRE_PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+INDEX = "profiles.jsonl"
+
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+MEMORY_FRAMES = 10        # traceback depth kept by tracemalloc
+TOP_ALLOCATIONS = 15
+
+
+def _parse_modes(value):
+    value = (value or "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return ()
+    if value in ("1", "true", "yes", "on"):
+        return DEFAULT_MODES
+    if value == "all":
+        return MODES
+    modes = tuple(m.strip() for m in value.split(",") if m.strip())
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        raise ValueError(f"[ERROR] Unknown profiling mode(s) {unknown}; choose from {MODES}")
+    return modes
+
+
+ACTIVE = _parse_modes(os.environ.get("CRYPTOPRE_PROFILE"))
+ENABLED = bool(ACTIVE)
+
+_local = threading.local()
+_counter = Counter()
+_counter_lock = threading.Lock()
+
+# tracemalloc and cProfile are process-wide: tracing is reference-counted
+# across overlapping calls, and only one call at a time holds the profiler
+_memory_lock = threading.Lock()
+_memory_users = set()
+_memory_owned = False
+_cprofile_lock = threading.Lock()
+
+
+def enable(modes=DEFAULT_MODES, out_dir=None):
+    """
+    Turn profiling on here and in child processes started afterwards
+    (pipeline workers inherit the environment).
+    """
+    global ACTIVE, ENABLED, PROFILE_DIR
+    ACTIVE = _parse_modes(",".join(modes) if not isinstance(modes, str) else modes)
+    ENABLED = bool(ACTIVE)
+    os.environ["CRYPTOPRE_PROFILE"] = ",".join(ACTIVE)
+    if out_dir:
+        PROFILE_DIR = os.environ["CRYPTOPRE_PROFILE_DIR"] = out_dir
+
+
+def disable():
+    global ACTIVE, ENABLED
+    ACTIVE, ENABLED = (), False
+    os.environ.pop("CRYPTOPRE_PROFILE", None)
+
+
+def run_dir():
+    """One directory per run, shared with worker processes through the environment."""
+    run = os.environ.get("CRYPTOPRE_PROFILE_RUN")
+    if run is None:
+        run = os.environ["CRYPTOPRE_PROFILE_RUN"] = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(PROFILE_DIR, run)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def symbol_of(path):
+    """BTCUSDT from data/processed/labeled_feat_BTCUSDT.csv."""
+    return os.path.splitext(os.path.basename(path))[0].rsplit("_", 1)[-1]
+
+
+# ------------------------------
+# SAMPLING PROFILER
+# ------------------------------
+def _frame_name(frame):
+    code = frame.f_code
+    where = code.co_filename
+    where = os.path.relpath(where, BASE_DIR) if where.startswith(BASE_DIR) else os.path.basename(where)
+    return f"{code.co_name} ({where}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a
+    background thread. Output is the collapsed-stack format ("a;b;c N")
+    read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+
+
+# ------------------------------
+# PROFILE HOOK
+# ------------------------------
+class _NoopProfile:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopProfile()
+
+
+class _Profile:
+    """
+    Profiles one stage call with the active modes and writes
+    <stage>.<symbol>.<pid>.<n>.{pstats,collapsed,tracemalloc} plus a line in
+    profiles.jsonl. Nested calls in the same thread are covered by the
+    outer profile and do nothing themselves.
+
+    Calls overlapping in other threads share tracemalloc, so their peaks
+    include each other's allocations (flagged "overlapped" in the index),
+    and skip cProfile while another call holds it. A profile that cannot be
+    written is reported, never raised into the stage.
+    """
+
+    def __init__(self, stage, symbol=None):
+        self.stage = stage
+        self.symbol = symbol
+
+    def __enter__(self):
+        _local.active = True
+        self.modes = ACTIVE
+        self.profiler = self.sampler = None
+        self.tracing = self.overlapped = False
+        try:
+            if "memory" in self.modes:
+                self._start_memory()
+            if "sample" in self.modes:
+                self.sampler = StackSampler(threading.get_ident()).start()
+            if "cprofile" in self.modes and _cprofile_lock.acquire(blocking=False):
+                import cProfile
+                try:
+                    self.profiler = cProfile.Profile()
+                    self.profiler.enable()
+                except Exception:
+                    self.profiler = None
+                    _cprofile_lock.release()
+                    raise
+        except Exception as e:
+            print(f"[ERROR] Profiling {self.stage} disabled for this call: {e!r}")
+            self._release()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        try:
+            if self.profiler is not None:
+                self.profiler.disable()
+            if self.sampler is not None:
+                self.sampler.stop()
+            self._write(seconds, exc[0] is not None)
+        except Exception as e:
+            print(f"[ERROR] Profile of {self.stage}:{self.symbol or '-'} not written: {e!r}")
+        finally:
+            self._release()
+        return False
+
+    def _start_memory(self):
+        global _memory_owned
+        import tracemalloc
+
+        with _memory_lock:
+            if not _memory_users:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(MEMORY_FRAMES)
+                    _memory_owned = True
+                # Only a call running alone may reset the shared peak
+                tracemalloc.reset_peak()
+            else:
+                self.overlapped = True
+                for other in _memory_users:
+                    other.overlapped = True
+            _memory_users.add(self)
+            self.tracing = True
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+
+    def _release(self):
+        global _memory_owned
+        import tracemalloc
+
+        if self.profiler is not None:
+            self.profiler = None
+            _cprofile_lock.release()
+        if self.tracing:
+            with _memory_lock:
+                _memory_users.discard(self)
+                if not _memory_users and _memory_owned:
+                    tracemalloc.stop()
+                    _memory_owned = False
+            self.tracing = False
+        _local.active = False
+
+    def _write(self, seconds, failed):
+        import tracemalloc
+
+        with _counter_lock:
+            _counter[(self.stage, self.symbol)] += 1
+            n = _counter[(self.stage, self.symbol)]
+        out = run_dir()
+        name = ".".join(p for p in (self.stage, self.symbol, str(os.getpid()), str(n)) if p)
+        entry = {"stage": self.stage, "symbol": self.symbol, "pid": os.getpid(), "n": n,
+                 "seconds": seconds, "failed": failed, "files": {}}
+
+        if self.profiler is not None:
+            path = os.path.join(out, name + ".pstats")
+            self.profiler.dump_stats(path)
+            entry["files"]["pstats"] = os.path.basename(path)
+        elif "cprofile" in self.modes:
+            entry["cprofile_skipped"] = True    # another thread held the profiler
+        if self.sampler is not None:
+            path = os.path.join(out, name + ".collapsed")
+            self.sampler.write(path)
+            entry["files"]["collapsed"] = os.path.basename(path)
+            entry["samples"] = sum(self.sampler.stacks.values())
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            path = os.path.join(out, name + ".tracemalloc")
+            snapshot.dump(path)
+            entry["files"]["tracemalloc"] = os.path.basename(path)
+            entry["peak_bytes"] = peak - self.memory_start
+            entry["retained_bytes"] = current - self.memory_start
+            entry["overlapped"] = self.overlapped
+            entry["top_allocations"] = [
+                {"where": str(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ]
+
+        # One short append per entry, so concurrent workers do not interleave lines
+        with open(os.path.join(out, INDEX), "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def profile(stage, symbol=None):
+    """with profiling.profile("labeler", "BTCUSDT"): ..."""
+    if not ENABLED or getattr(_local, "active", False):
+        return _NOOP
+    return _Profile(stage, symbol)
+
+
+def profiled(stage, symbol_arg=None):
+    """
+    Decorator form of profile(). `symbol_arg` names the parameter holding
+    the symbol or a per-symbol file path.
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            symbol = None
+            if symbol_arg is not None:
+                import inspect
+                bound = inspect.signature(fn).bind(*args, **kwargs)
+                bound.apply_defaults()
+                symbol = symbol_of(str(bound.arguments[symbol_arg]))
+            with profile(stage, symbol):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+# ------------------------------
+# REPORTS
+# ------------------------------
+def load_index(path):
+    with open(os.path.join(path, INDEX)) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def merged_stats(path, entries):
+    import pstats
+
+    files = [os.path.join(path, e["files"]["pstats"]) for e in entries if "pstats" in e["files"]]
+    return pstats.Stats(*files) if files else None
+
+
+def merged_collapsed(path, entries):
+    stacks = Counter()
+    for e in entries:
+        if "collapsed" in e["files"]:
+            with open(os.path.join(path, e["files"]["collapsed"])) as f:
+                for line in f:
+                    stack, _, n = line.rstrip("\n").rpartition(" ")
+                    stacks[stack] += int(n)
+    return stacks
+
+
+def report(path, stage=None, symbol=None, top=20):
+    entries = [e for e in load_index(path)
+               if (stage is None or e["stage"] == stage) and (symbol is None or e["symbol"] == symbol)]
+    if not entries:
+        print(f"[PROFILE] No profiles in {path}")
+        return
+
+    print(f"{'stage':14s} {'symbol':12s} {'calls':>6s} {'total s':>9s} {'max s':>8s} {'peak MB':>9s}")
+    groups = {}
+    for e in entries:
+        groups.setdefault((e["stage"], e["symbol"] or "-"), []).append(e)
+    for (st, sym), es in sorted(groups.items()):
+        peak = max((e.get("peak_bytes", 0) for e in es), default=0) / 1e6
+        print(f"{st:14s} {sym:12s} {len(es):6d} {sum(e['seconds'] for e in es):9.2f} "
+              f"{max(e['seconds'] for e in es):8.2f} {peak:9.1f}")
+
+    stats = merged_stats(path, entries)
+    if stats is not None:
+        print(f"\n[cProfile] {len(stats.files)} profiles merged")
+        stats.files = []
+        stats.sort_stats("cumulative").print_stats(top)
+
+    stacks = merged_collapsed(path, entries)
+    if stacks:
+        out = os.path.join(path, re.sub(r"[^\w.-]", "_", f"{stage or 'all'}.{symbol or 'all'}") + ".collapsed")
+        with open(out, "w") as f:
+            for s, n in stacks.most_common():
+                f.write(f"{s} {n}\n")
+        print(f"[✔] Merged flame graph input → {out}")
+
+
+# ------------------------------
+# MAIN
+# ------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Opt-in per-stage profiling")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="run a module with profiling on, e.g. run src.pipeline --symbols BTCUSDT")
+    p_run.add_argument("--modes", default=",".join(DEFAULT_MODES), help=f"comma list of {MODES} or 'all'")
+    p_run.add_argument("--out", help=f"profile directory (default: {PROFILE_DIR})")
+    p_run.add_argument("module")
+    p_run.add_argument("args", nargs=argparse.REMAINDER)
+
+    p_rep = sub.add_parser("report", help="summarize a profile run directory")
+    p_rep.add_argument("path")
+    p_rep.add_argument("--stage")
+    p_rep.add_argument("--symbol")
+    p_rep.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        import runpy
+
+        enable(args.modes, args.out)
+        print(f"[PROFILE] {','.join(ACTIVE)} → {run_dir()}")
+        sys.argv = [args.module] + args.args
+        runpy.run_module(args.module, run_name="__main__", alter_sys=True)
+
+    elif args.command == "report":
+        report(args.path, args.stage, args.symbol, args.top)
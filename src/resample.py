@@ -0,0 +1,269 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import transport
+from src.predict import API_URL
+
+
+# ------------------------------
+# INTERVALS
+# ------------------------------
+# Epoch-aligned Binance intervals (1w/1M are not, so they are not derived)
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
+
+MAX_LIMIT = 1000          # Binance klines page size
+BASE_ROWS = 1000          # base candles kept in memory
+MIN_REFRESH = 5.0         # seconds between base refreshes
+
+COLUMNS = ["open_time", "open", "high", "low", "close", "volume"]
+
+
+# ------------------------------
+# RAW KLINES
+# ------------------------------
+def fetch_klines(symbol, interval, limit=MAX_LIMIT, start_time=None, end_time=None):
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
+    if start_time is not None:
+        params["startTime"] = int(start_time)
+    if end_time is not None:
+        params["endTime"] = int(end_time)
+
+    data = transport.get_json(API_URL, params=params)
+    if isinstance(data, dict):
+        raise RuntimeError(f"[BINANCE ERROR] {data}")
+
+    df = pd.DataFrame([row[:6] for row in data], columns=COLUMNS)
+    df["open_time"] = df["open_time"].astype(np.int64)
+    df[COLUMNS[1:]] = df[COLUMNS[1:]].astype(float)
+    return df
+
+
+def _merge(old, new):
+    # Newer rows win: the last candle of `old` may have been in progress
+    if old is None or old.empty:
+        return new.reset_index(drop=True)
+    out = pd.concat([old, new], ignore_index=True)
+    return out.drop_duplicates("open_time", keep="last").sort_values("open_time").reset_index(drop=True)
+
+
+# ------------------------------
+# RESAMPLING
+# ------------------------------
+def resample(base, base_interval, interval):
+    """
+    Aggregate base OHLCV rows into `interval` bars (epoch-aligned, like
+    Binance). A leading bucket that the base only partly covers is dropped;
+    the trailing bucket is kept as the in-progress candle.
+    """
+    step = INTERVAL_MS[interval]
+    base_step = INTERVAL_MS[base_interval]
+    if step % base_step:
+        raise ValueError(f"{interval} is not a multiple of {base_interval}")
+    if base.empty:
+        return base.iloc[0:0]
+
+    t = base["open_time"].to_numpy()
+    bucket = t - t % step
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    out = pd.DataFrame({
+        "open_time": bucket[starts],
+        "open": base["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(base["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(base["low"].to_numpy(), starts),
+        "close": base["close"].to_numpy()[np.r_[starts[1:] - 1, len(t) - 1]],
+        "volume": np.add.reduceat(base["volume"].to_numpy(), starts),
+    })
+
+    if t[0] != bucket[0]:
+        out = out.iloc[1:]
+    return out.reset_index(drop=True)
+
+
+# ------------------------------
+# MULTI-TIMEFRAME STORE
+# ------------------------------
+class MultiTimeframeStore:
+    """
+    One symbol's candles at every timeframe from a single base series.
+
+    The base (default 1m) is refreshed incrementally: only candles since the
+    last known open time are requested. Higher timeframes are resampled
+    locally. History older than the base window is fetched once per
+    timeframe and kept, because closed candles never change; when the base
+    window slides forward, its closed bars are folded into that history.
+
+    A timeframe longer than the base window (1d over 1000 1m rows) can't
+    build its in-progress bar from the base alone, so the base candles since
+    that bar opened are fetched once and kept until the bar closes.
+    """
+
+    def __init__(self, symbol, base_interval="1m", base_rows=BASE_ROWS,
+                 min_refresh=MIN_REFRESH, fetch=fetch_klines):
+        self.symbol = symbol
+        self.base_interval = base_interval
+        self.base_rows = base_rows
+        self.min_refresh = min_refresh
+        self.fetch = fetch
+
+        self.base = None
+        self.history = {}        # interval -> closed bars older than the base window
+        self.spans = set()       # intervals whose in-progress bar the base must cover
+        self.fetches = 0
+        self._last_refresh = 0.0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+
+    # ---- base series ----
+    def _base_request(self):
+        """fetch() arguments for the candles the base is missing."""
+        step = INTERVAL_MS[self.base_interval]
+        if self.base is None or self.base.empty:
+            return (min(self.base_rows, MAX_LIMIT),), {}
+        last_open = int(self.base["open_time"].iloc[-1])
+        missing = (int(time.time() * 1000) - last_open) // step + 1
+        if missing > MAX_LIMIT:
+            return (min(self.base_rows, MAX_LIMIT),), {}
+        return (int(missing) + 1,), {"start_time": last_open}
+
+    def refresh(self, force=False):
+        # Network calls happen outside self._lock, so readers are never
+        # queued behind a fetch; _refresh_lock stops concurrent callers
+        # from fetching the same candles twice
+        with self._refresh_lock:
+            with self._lock:
+                if not force and time.time() - self._last_refresh < self.min_refresh:
+                    return self.base
+                args, kwargs = self._base_request()
+
+            new = self.fetch(self.symbol, self.base_interval, *args, **kwargs)
+
+            with self._lock:
+                self.fetches += 1
+                self._last_refresh = time.time()
+                self.base = _merge(self.base, new)
+                self._trim()
+                return self.base
+
+    def update(self, rows):
+        """Feed base candles from elsewhere (e.g. a websocket) without fetching."""
+        with self._lock:
+            self.base = _merge(self.base, rows[COLUMNS])
+            self._trim()
+
+    def _trim(self):
+        extra = len(self.base) - self.base_rows
+        open_time = self.base["open_time"].to_numpy()
+        for interval in self.spans:
+            # Keep every base candle of the in-progress bar of long intervals
+            step = INTERVAL_MS[interval]
+            extra = min(extra, int(np.searchsorted(open_time, open_time[-1] - open_time[-1] % step)))
+        if extra <= 0:
+            return
+
+        dropped_until = int(self.base["open_time"].iloc[extra])
+        for interval, hist in self.history.items():
+            derived = resample(self.base, self.base_interval, interval)
+            # Every closed bar that starts before the cut, including the one
+            # straddling it: the trimmed base can no longer rebuild that bar,
+            # and leaving it out would break contiguity with the history
+            closed = derived.iloc[:-1]
+            self.history[interval] = _merge(hist, closed[closed["open_time"] < dropped_until])
+
+        self.base = self.base.iloc[extra:].reset_index(drop=True)
+
+    # ---- any timeframe ----
+    def _assemble(self, interval, count, partial=False):
+        """
+        (bars, None) when memory covers `count`, else (None, (first_open, need))
+        for the fetch that fills the gap. With `partial`, whatever memory has.
+        """
+        derived = resample(self.base, self.base_interval, interval)
+        if len(derived) >= count:
+            return derived.tail(count).reset_index(drop=True), None
+
+        if len(derived):
+            first_open = int(derived["open_time"].iloc[0])
+        else:
+            last_open = int(self.base["open_time"].iloc[-1])
+            first_open = last_open - last_open % INTERVAL_MS[interval]
+        hist = self.history.get(interval)
+        older = hist[hist["open_time"] < first_open] if hist is not None else None
+
+        need = count - len(derived)
+        contiguous = (older is not None and len(older) > 0 and
+                      int(older["open_time"].iloc[-1]) == first_open - INTERVAL_MS[interval])
+        if not partial and (older is None or len(older) < need or not contiguous):
+            return None, (first_open, need)
+
+        return pd.concat([older, derived], ignore_index=True).tail(count).reset_index(drop=True), None
+
+    def _head_request(self, interval):
+        """(start, rows) of base candles the in-progress `interval` bar lacks, or None."""
+        step = INTERVAL_MS[interval]
+        base_step = INTERVAL_MS[self.base_interval]
+        first_open = int(self.base["open_time"].iloc[0])
+        last_open = int(self.base["open_time"].iloc[-1])
+        start = last_open - last_open % step
+        if first_open <= start:
+            return None
+        return start, (first_open - start) // base_step
+
+    def _fetch_head(self, interval, start, rows):
+        # Closed base candles from the bar's open up to the base window
+        base_step = INTERVAL_MS[self.base_interval]
+        pages = []
+        while rows > 0:
+            page = self.fetch(self.symbol, self.base_interval, min(rows, MAX_LIMIT), start_time=start)
+            pages.append(page)
+            if len(page) < min(rows, MAX_LIMIT):
+                break
+            rows -= len(page)
+            start += len(page) * base_step
+
+        with self._lock:
+            self.fetches += len(pages)
+            head = pd.concat(pages, ignore_index=True) if pages else None
+            if head is not None and not head.empty:
+                self.base = _merge(head[head["open_time"] < self.base["open_time"].iloc[0]], self.base)
+            self.spans.add(interval)
+
+    def bars(self, interval, count):
+        """Last `count` bars of `interval`, fetching only what the base can't cover."""
+        if self.base is None:
+            self.refresh(force=True)
+
+        with self._lock:
+            if interval == self.base_interval:
+                return self.base.tail(count).reset_index(drop=True)
+            head = self._head_request(interval)
+        if head is not None:
+            self._fetch_head(interval, *head)
+
+        with self._lock:
+            out, missing = self._assemble(interval, count)
+        if out is not None:
+            return out
+
+        first_open, need = missing
+        fetched = self.fetch(self.symbol, interval, min(need, MAX_LIMIT), end_time=first_open - 1)
+
+        with self._lock:
+            self.fetches += 1
+            self.history[interval] = _merge(self.history.get(interval), fetched)
+            # Short only if the exchange has less history than asked for
+            return self._assemble(interval, count, partial=True)[0]
+
+
+def to_chart_frame(bars):
+    """Store bars in the dashboard's get_binance_klines layout."""
+    df = bars.rename(columns={"open_time": "time"}).copy()
+    df["time"] = pd.to_datetime(df["time"], unit="ms")
+    return df
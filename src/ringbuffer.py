@@ -0,0 +1,400 @@
+import argparse
+import struct
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# ------------------------------
+# LAYOUT
+# ------------------------------
+# One shared memory segment: a 64-byte header, then one fixed-size slot per
+# symbol. A slot is
+#   control  int64[6]   seq, count (rows ever written), updated_ns (last
+#                       successful poll), used, failures (consecutive
+#                       failed polls), failed_ns (last failure)
+#   name     32 bytes   symbol, NUL padded
+#   columns  7 x float64/int64[2 * capacity]
+# Row k is stored at k % capacity AND k % capacity + capacity, so the most
+# recent n <= capacity rows are always one contiguous slice: readers get
+# plain NumPy views, never a wrapped copy.
+MAGIC = b"CPRING02"
+HEADER = struct.Struct("<8sIIq")     # magic, capacity, max_symbols, interval_ms
+HEADER_BYTES = 64
+NAME_BYTES = 32
+CONTROL = 6
+SEQ, COUNT, UPDATED, USED, FAILURES, FAILED = range(CONTROL)
+
+FIELDS = ("open_time", "open", "high", "low", "close", "volume", "quote_volume")
+
+CAPACITY = 1000           # rows kept per symbol (one Binance page)
+MAX_SYMBOLS = 256
+POLL_SECONDS = 2.0
+FETCH_WORKERS = 8
+READ_RETRIES = 1000
+
+Window = namedtuple("Window", FIELDS)
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "8h": 28_800_000, "12h": 43_200_000, "1d": 86_400_000,
+}
+
+
+def segment_name(interval):
+    return f"cryptopre13-{interval}"
+
+
+def _slot_bytes(capacity):
+    return CONTROL * 8 + NAME_BYTES + len(FIELDS) * 2 * capacity * 8
+
+
+class TornRead(RuntimeError):
+    """A reader kept overlapping the writer for READ_RETRIES attempts."""
+
+
+# ------------------------------
+# SHARED CANDLE RINGS
+# ------------------------------
+class CandleRing:
+    """
+    Recent OHLCV candles for many symbols in shared memory.
+
+    One ingestion process writes (create + write); any number of processes
+    attach and read. Each slot has a seqlock: the writer makes `seq` odd,
+    writes, then makes it even again. Readers work on views and accept the
+    result only if `seq` was even and unchanged across the read, retrying
+    otherwise, so they never take a lock and never see a half-written
+    candle. This relies on stores becoming visible in program order
+    (x86-64 does this; the writer is a single process).
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        magic, self.capacity, self.max_symbols, self.interval_ms = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"[ERROR] Shared memory {shm.name} is not a candle ring")
+
+        slot = _slot_bytes(self.capacity)
+        span = 2 * self.capacity
+        base = HEADER_BYTES
+        self._ctrl = np.ndarray((self.max_symbols, CONTROL), np.int64, shm.buf, base, (slot, 8))
+        self._names = np.ndarray((self.max_symbols, NAME_BYTES), np.uint8, shm.buf,
+                                 base + CONTROL * 8, (slot, 1))
+        data = base + CONTROL * 8 + NAME_BYTES
+        self._time = np.ndarray((self.max_symbols, span), np.int64, shm.buf, data, (slot, 8))
+        self._values = np.ndarray((self.max_symbols, len(FIELDS) - 1, span), np.float64, shm.buf,
+                                  data + span * 8, (slot, span * 8, 8))
+        self._slots = {}
+
+    # ---- lifecycle ----
+    @classmethod
+    def create(cls, name=None, interval="1m", capacity=CAPACITY, max_symbols=MAX_SYMBOLS):
+        size = HEADER_BYTES + max_symbols * _slot_bytes(capacity)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, capacity, max_symbols, INTERVAL_MS[interval])
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        # Readers must not unlink the writer's segment when they exit
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def close(self):
+        # Drop our views before releasing the buffer they point into
+        self._ctrl = self._names = self._time = self._values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # ---- symbol slots ----
+    def _find(self, symbol):
+        key = symbol.encode().ljust(NAME_BYTES, b"\0")
+        for i in np.flatnonzero(self._ctrl[:, USED]):
+            if bytes(self._names[i]) == key:
+                self._slots[symbol] = int(i)
+                return int(i)
+        return None
+
+    def slot(self, symbol):
+        i = self._slots.get(symbol)
+        return i if i is not None else self._find(symbol)
+
+    def symbols(self):
+        return [bytes(self._names[i]).rstrip(b"\0").decode() for i in np.flatnonzero(self._ctrl[:, USED])]
+
+    def __contains__(self, symbol):
+        return self.slot(symbol) is not None
+
+    def _register(self, symbol):
+        if len(symbol.encode()) > NAME_BYTES:
+            raise ValueError(f"[ERROR] Symbol name too long: {symbol}")
+        free = np.flatnonzero(self._ctrl[:, USED] == 0)
+        if len(free) == 0:
+            raise RuntimeError(f"[ERROR] Candle ring is full ({self.max_symbols} symbols)")
+        i = int(free[0])
+        self._names[i] = np.frombuffer(symbol.encode().ljust(NAME_BYTES, b"\0"), np.uint8)
+        self._ctrl[i, USED] = 1       # published last, after the name
+        self._slots[symbol] = i
+        return i
+
+    # ---- writer ----
+    def write(self, symbol, open_time, *values):
+        """
+        Upsert candles (ascending open_time, one array per FIELDS column).
+        A candle with the newest stored open_time replaces it (the candle
+        still forming); older candles are ignored.
+        """
+        i = self.slot(symbol)
+        if i is None:
+            i = self._register(symbol)
+        cap = self.capacity
+        t = np.asarray(open_time, dtype=np.int64)
+        vals = np.asarray(values, dtype=np.float64).reshape(len(FIELDS) - 1, len(t))
+
+        count = int(self._ctrl[i, COUNT])
+        last = self._time[i, (count - 1) % cap] if count else np.iinfo(np.int64).min
+        keep = t >= last
+        t, vals = t[keep], vals[:, keep]
+        if len(t) == 0:
+            return count
+        start = count - 1 if t[0] == last else count
+        drop = max(len(t) - cap, 0)   # more than fits: only the newest cap rows land
+        t, vals, start = t[drop:], vals[:, drop:], start + drop
+        new_count = start + len(t)
+        pos = np.arange(start, new_count) % cap
+
+        ctrl = self._ctrl[i]
+        ctrl[SEQ] += 1                # odd: write in progress
+        self._time[i, pos] = t
+        self._time[i, pos + cap] = t
+        self._values[i][:, pos] = vals
+        self._values[i][:, pos + cap] = vals
+        ctrl[COUNT] = new_count
+        ctrl[UPDATED] = time.time_ns()
+        ctrl[SEQ] += 1                # even: consistent again
+        return new_count
+
+    def mark_polled(self, symbol, ok=True):
+        """
+        Record one poll of `symbol`, so readers in other processes can tell
+        a quiet symbol from a writer that died or keeps failing.
+        """
+        i = self.slot(symbol)
+        if i is None:
+            return
+        ctrl = self._ctrl[i]
+        if ok:
+            ctrl[UPDATED] = time.time_ns()
+            ctrl[FAILURES] = 0
+        else:
+            ctrl[FAILURES] += 1
+            ctrl[FAILED] = time.time_ns()
+
+    # ---- readers ----
+    def window(self, symbol, n):
+        """
+        Zero-copy views of the latest `n` candles plus the seq they were
+        taken at. Check `changed(symbol, seq)` after using them.
+        """
+        i = self.slot(symbol)
+        if i is None:
+            raise KeyError(symbol)
+        seq = int(self._ctrl[i, SEQ])
+        count = int(self._ctrl[i, COUNT])
+        n = min(n, count, self.capacity)
+        start = (count - n) % self.capacity
+        views = Window(self._time[i, start:start + n], *self._values[i][:, start:start + n])
+        return views, seq
+
+    def changed(self, symbol, seq):
+        return seq & 1 or int(self._ctrl[self.slot(symbol), SEQ]) != seq
+
+    def read(self, symbol, n, fn=None, retries=READ_RETRIES):
+        """
+        fn(window) computed on zero-copy views and returned only if no write
+        overlapped it. Without fn, returns a consistent copy of the window.
+        """
+        fn = fn or (lambda w: Window(*(a.copy() for a in w)))
+        for _ in range(retries):
+            views, seq = self.window(symbol, n)
+            if not seq & 1:
+                out = fn(views)
+                if not self.changed(symbol, seq):
+                    return out
+            # Writer is mid-update: give it the CPU rather than spin
+            time.sleep(0)
+        raise TornRead(f"[ERROR] {symbol}: writer kept overlapping the read")
+
+    def updated_at(self, symbol):
+        """When the writer last fetched `symbol` successfully (epoch seconds)."""
+        return self._ctrl[self.slot(symbol), UPDATED] / 1e9
+
+    def age(self, symbol, now=None):
+        return (now or time.time()) - self.updated_at(symbol)
+
+    def failures(self, symbol):
+        """Consecutive failed polls since the last successful one."""
+        return int(self._ctrl[self.slot(symbol), FAILURES])
+
+    def frame(self, symbol, n):
+        """Latest `n` candles in predict.get_live_data layout."""
+        import pandas as pd
+
+        def build(w):
+            # The one copy out of shared memory
+            return pd.DataFrame({
+                "time": w.open_time, "Open": w.open, "High": w.high, "Low": w.low,
+                "Close": w.close, "Volume": w.volume,
+                "_1": w.open_time + self.interval_ms - 1, "_2": w.quote_volume,
+                "_3": 0, "_4": 0, "_5": 0, "_6": 0,
+            }, copy=True)
+
+        return self.read(symbol, n, build)
+
+
+# ------------------------------
+# INGESTION (the single writer)
+# ------------------------------
+def fetch_rows(symbol, interval, limit, start_time=None):
+    """Klines as (open_time, open, high, low, close, volume, quote_volume) arrays."""
+    from src import transport
+    from src.predict import API_URL
+
+    params = {"symbol": symbol, "interval": interval, "limit": limit}
+    if start_time is not None:
+        params["startTime"] = int(start_time)
+    data = transport.get_json(API_URL, params=params)
+    if isinstance(data, dict):
+        raise RuntimeError(f"[BINANCE ERROR] {data}")
+    if not data:
+        return None
+    cols = list(zip(*data))
+    return (np.array(cols[0], dtype=np.int64),
+            *(np.array(cols[k], dtype=np.float64) for k in (1, 2, 3, 4, 5, 7)))
+
+
+class RingIngestor:
+    """
+    Keeps a CandleRing current for `symbols`: one full window per symbol
+    at start, then only the candles since the newest stored one.
+    """
+
+    def __init__(self, ring, symbols, interval, poll_seconds=POLL_SECONDS,
+                 fetch_workers=FETCH_WORKERS, fetch=fetch_rows):
+        self.ring = ring
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.poll_seconds = poll_seconds
+        self.fetch = fetch
+        self.errors = {}                  # symbol -> last error, while it keeps failing
+        self._pool = ThreadPoolExecutor(max_workers=fetch_workers)
+        self._lock = threading.Lock()     # one writer, even with many fetch threads
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _update(self, symbol):
+        try:
+            last = self.ring.read(symbol, 1).open_time if symbol in self.ring else []
+            if len(last):
+                # Only the candles since the newest stored one (which may still be forming)
+                missing = (time.time_ns() // 1_000_000 - int(last[0])) // self.ring.interval_ms + 1
+                rows = self.fetch(symbol, self.interval, int(min(max(missing, 2), self.ring.capacity)),
+                                  int(last[0]))
+            else:
+                rows = self.fetch(symbol, self.interval, self.ring.capacity)
+            with self._lock:
+                if rows is not None:
+                    self.ring.write(symbol, *rows)
+                self.ring.mark_polled(symbol)
+            self.errors.pop(symbol, None)
+            return None
+        except Exception as e:
+            with self._lock:
+                self.ring.mark_polled(symbol, ok=False)
+            self.errors[symbol] = str(e)
+            return f"{symbol}: {e}"
+
+    def poll(self):
+        errors = [e for e in self._pool.map(self._update, self.symbols) if e]
+        for e in errors:
+            print(f"[RING] {e}")
+        return len(self.symbols) - len(errors)
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            started = time.time()
+            self.poll()
+            self._stop.wait(max(self.poll_seconds - (time.time() - started), 0.0))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="ring-ingestor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False)
+
+
+# ------------------------------
+# MAIN
+# ------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared-memory candle rings")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="create the rings and keep them current")
+    p_serve.add_argument("symbols", nargs="+")
+    p_serve.add_argument("--interval", default="1m")
+    p_serve.add_argument("--name", help="shared memory name (default: cryptopre13-<interval>)")
+    p_serve.add_argument("--capacity", type=int, default=CAPACITY)
+    p_serve.add_argument("--max-symbols", type=int, default=MAX_SYMBOLS)
+    p_serve.add_argument("--poll", type=float, default=POLL_SECONDS)
+
+    p_show = sub.add_parser("show", help="print the latest candles from a running ring")
+    p_show.add_argument("symbol")
+    p_show.add_argument("--interval", default="1m")
+    p_show.add_argument("--name")
+    p_show.add_argument("--rows", type=int, default=5)
+    args = parser.parse_args()
+
+    name = args.name or segment_name(args.interval)
+
+    if args.command == "serve":
+        ring = CandleRing.create(name, args.interval, args.capacity, args.max_symbols)
+        ingestor = RingIngestor(ring, args.symbols, args.interval, args.poll)
+        print(f"[RING] {name}: {len(args.symbols)} symbols x {args.capacity} {args.interval} candles "
+              f"({ring.shm.size / 1e6:.1f} MB)")
+        ingestor.start()
+        try:
+            while True:
+                time.sleep(60)
+        except KeyboardInterrupt:
+            ingestor.stop()
+            ring.close()
+            print("\n[RING] Stopped.")
+
+    elif args.command == "show":
+        ring = CandleRing.attach(name)
+        print(ring.frame(args.symbol.upper(), args.rows)[["time", "Open", "High", "Low", "Close", "Volume"]])
+        symbol = args.symbol.upper()
+        print(f"updated {ring.age(symbol):.1f}s ago, {ring.failures(symbol)} failed polls since")
+        ring.close()
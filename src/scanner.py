@@ -0,0 +1,430 @@
+import argparse
+import heapq
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.predict import (
+    load_assets, get_binance_symbols, get_live_data, predict_batch, atr, LIMIT
+)
+
+
+# ------------------------------
+# SCANNER SETTINGS
+# ------------------------------
+QUOTE = "USDT"
+
+MIN_INTERVAL = 30        # seconds between scans for the most active pairs
+MAX_INTERVAL = 900       # seconds between scans for quiet, illiquid pairs
+
+WEIGHT_PER_MINUTE = 1200  # Binance REQUEST_WEIGHT limit per IP
+BUDGET_SHARE = 0.5        # leave the rest for the dashboard / other tools
+KLINE_WEIGHT = 2          # /api/v3/klines weight for limit=200
+EXCHANGE_INFO_WEIGHT = 20 # /api/v3/exchangeInfo weight for all symbols
+
+UNIVERSE_REFRESH = 3600   # seconds between exchangeInfo reloads (listings / delistings)
+UNIVERSE_RETRY = 30       # seconds before retrying a load that returned no pairs
+
+BATCH_SIZE = 32
+FETCH_WORKERS = 8
+RING_MAX_AGE = 30         # seconds; older ring data is fetched directly instead
+
+VOL_WEIGHT = 0.6          # share of priority from atr_pct rank
+LIQ_WEIGHT = 0.4          # share of priority from quote-volume rank
+
+
+# ------------------------------
+# SHARED SIGNAL TABLE
+# ------------------------------
+class SignalTable:
+    """
+    Thread-safe, in-memory latest signal per symbol.
+    Readers (e.g. the dashboard) never trigger a fetch.
+    """
+
+    COLUMNS = ["symbol", "signal", "confidence", "price", "entry", "sl", "tp",
+               "atr_pct", "quote_volume", "priority", "updated_at", "error"]
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def update(self, symbol, **fields):
+        with self._lock:
+            row = self._rows.setdefault(symbol, {"symbol": symbol})
+            row.update(fields)
+
+    def get(self, symbol):
+        with self._lock:
+            row = self._rows.get(symbol)
+            return dict(row) if row else None
+
+    def age(self, symbol, now=None):
+        row = self.get(symbol)
+        if not row or "updated_at" not in row:
+            return None
+        return (now or time.time()) - row["updated_at"]
+
+    def snapshot(self):
+        with self._lock:
+            rows = [dict(r) for r in self._rows.values()]
+        df = pd.DataFrame(rows, columns=self.COLUMNS)
+        return df.sort_values("priority", ascending=False, na_position="last").reset_index(drop=True)
+
+    def discard(self, symbol):
+        with self._lock:
+            self._rows.pop(symbol, None)
+
+    def __len__(self):
+        return len(self._rows)
+
+
+SHARED_TABLE = SignalTable()
+
+
+# ------------------------------
+# EXCHANGE RATE BUDGET
+# ------------------------------
+class BudgetStopped(Exception):
+    """The scanner stopped while waiting for request weight."""
+
+
+class RateBudget:
+    """Token bucket over Binance request weight."""
+
+    def __init__(self, weight_per_minute=WEIGHT_PER_MINUTE * BUDGET_SHARE):
+        self.rate = weight_per_minute / 60.0
+        self.capacity = weight_per_minute
+        self.tokens = weight_per_minute
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+    def charge(self, weight, stop_event=None):
+        """transport before_attempt hook: every attempt, retries included, pays its weight."""
+        def hook(attempt):
+            if not self.acquire(weight, stop_event):
+                raise BudgetStopped()
+        return hook
+
+    def acquire(self, weight, stop_event=None):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return True
+                wait = (weight - self.tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+# ------------------------------
+# PRIORITY
+# ------------------------------
+def _rank(values, x):
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0 or np.isnan(x):
+        return 0.5
+    return float((values < x).mean())
+
+
+def scan_interval(priority, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+    # Geometric spacing: top pairs every min_interval, the tail every max_interval
+    return min_interval * (max_interval / min_interval) ** (1.0 - priority)
+
+
+# ------------------------------
+# MARKET SCANNER
+# ------------------------------
+class MarketScanner:
+    """
+    Keeps SignalTable fresh for every TRADING USDT pair. The pair list is
+    reloaded every UNIVERSE_REFRESH seconds, so listings join and delisted
+    pairs leave the table; a load that returns nothing is retried after
+    UNIVERSE_RETRY seconds.
+
+    Each symbol has a due time derived from its priority (volatility and
+    liquidity rank). Due symbols move into a ready heap ordered by priority,
+    so when the rate budget can't keep up, stale high-priority pairs are
+    served first and quiet pairs simply wait longer.
+
+    With `ring` (a src.ringbuffer.CandleRing), symbols it holds are read
+    from shared memory instead of fetched, and cost no request weight, as
+    long as the ring's writer polled them within `ring_max_age` seconds.
+    """
+
+    def __init__(self, table=SHARED_TABLE, symbols=None, quote=QUOTE,
+                 min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 budget=None, batch_size=BATCH_SIZE, fetch_workers=FETCH_WORKERS,
+                 assets=None, ring=None, ring_max_age=RING_MAX_AGE):
+        self.table = table
+        self.quote = quote
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.budget = budget or RateBudget()
+        self.batch_size = batch_size
+        self.assets = assets
+        self.ring = ring
+        self.ring_max_age = ring_max_age
+
+        self._symbols = symbols
+        self._universe = set()
+        self._due = []      # (due_time, symbol)
+        self._ready = []    # (-priority, due_time, symbol)
+        self._priority = {}
+        self._pool = ThreadPoolExecutor(max_workers=fetch_workers)
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---- scheduling ----
+    def _load_universe(self):
+        """
+        (added, removed) symbols after reloading the TRADING pairs, or None
+        when exchangeInfo returned none (the current universe is kept).
+        """
+        if self._symbols:
+            symbols = set(self._symbols)
+        else:
+            charge = self.budget.charge(EXCHANGE_INFO_WEIGHT, self._stop)
+            symbols = {s for s in get_binance_symbols(status="TRADING", before_attempt=charge)
+                       if s.endswith(self.quote)}
+        if not symbols:
+            return None
+
+        added, removed = symbols - self._universe, self._universe - symbols
+        now = time.time()
+        for s in added:
+            self._priority.setdefault(s, 0.5)
+            heapq.heappush(self._due, (now, s))
+        for s in removed:
+            # Queued entries are dropped when they come due
+            self._priority.pop(s, None)
+            self.table.discard(s)
+        self._universe = symbols
+        return added, removed
+
+    def _update_priorities(self):
+        snap = self.table.snapshot()
+        if snap.empty:
+            return
+        vols = snap["atr_pct"].astype(float).values
+        liqs = snap["quote_volume"].astype(float).values
+        for sym, v, q in zip(snap["symbol"], vols, liqs):
+            self._priority[sym] = VOL_WEIGHT * _rank(vols, v) + LIQ_WEIGHT * _rank(liqs, q)
+
+    def _next_batch(self, now):
+        while self._due and self._due[0][0] <= now:
+            due, sym = heapq.heappop(self._due)
+            if sym not in self._universe:
+                continue
+            heapq.heappush(self._ready, (-self._priority.get(sym, 0.5), due, sym))
+
+        batch = []
+        while self._ready and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self._ready)[2])
+        return batch
+
+    def _reschedule(self, symbol, now):
+        interval = scan_interval(self._priority.get(symbol, 0.5), self.min_interval, self.max_interval)
+        heapq.heappush(self._due, (now + interval, symbol))
+        return interval
+
+    def _scheduled(self, symbol):
+        return any(s == symbol for _, s in self._due) or any(s == symbol for _, _, s in self._ready)
+
+    def _fail(self, symbols, error, now):
+        # The error is shown in the table; the symbol is tried again on schedule
+        for sym in symbols:
+            if sym not in self._universe:
+                continue
+            self.table.update(sym, error=error, updated_at=now)
+            self._reschedule(sym, now)
+
+    # ---- one scan step ----
+    def _fetch(self, symbol):
+        # A ring whose writer died or keeps failing falls back to the exchange
+        if self.ring is not None and symbol in self.ring and self.ring.age(symbol) <= self.ring_max_age:
+            try:
+                return symbol, self.ring.frame(symbol, LIMIT)
+            except Exception as e:
+                return symbol, e
+        try:
+            # Waiting for weight is part of each attempt, so no overall deadline here
+            charge = self.budget.charge(KLINE_WEIGHT, self._stop)
+            return symbol, get_live_data(symbol, deadline=None, before_attempt=charge)
+        except BudgetStopped:
+            return symbol, None
+        except Exception as e:
+            return symbol, e
+
+    def scan_batch(self, batch):
+        now = time.time()
+        fetched = list(self._pool.map(self._fetch, batch))
+
+        ready = []
+        for sym, df in fetched:
+            if df is None:
+                heapq.heappush(self._due, (now, sym))  # stopped mid-batch
+            elif isinstance(df, Exception) or len(df) == 0:
+                self._fail([sym], str(df) if isinstance(df, Exception) else "no data", now)
+            else:
+                ready.append((sym, df))
+
+        # Volatility/liquidity come from the raw klines before feature building
+        stats = {}
+        for sym, df in list(ready):
+            try:
+                close = df["Close"].iloc[-1]
+                stats[sym] = {
+                    "atr_pct": float(atr(df).iloc[-1] / close) if close else np.nan,
+                    "quote_volume": float(df["_2"].astype(float).sum()),
+                }
+            except Exception as e:
+                ready.remove((sym, df))
+                self._fail([sym], f"{type(e).__name__}: {e}", now)
+
+        if not ready:
+            return 0
+
+        try:
+            results = predict_batch([df for _, df in ready], self.assets)
+        except Exception as e:
+            self._fail([sym for sym, _ in ready], f"{type(e).__name__}: {e}", time.time())
+            return 0
+
+        done = time.time()
+        for (sym, _), (signal, conf, price, entry, sl, tp, rr, desc) in zip(ready, results):
+            if sym not in self._universe:
+                continue  # delisted while the batch ran
+            self.table.update(
+                sym, signal=signal, confidence=conf, price=price, entry=entry, sl=sl, tp=tp,
+                priority=self._priority.get(sym, 0.5), updated_at=done, error=None,
+                **stats[sym]
+            )
+            self._reschedule(sym, done)
+
+        return len(ready)
+
+    # ---- lifecycle ----
+    def run_forever(self, report_every=60):
+        if self.assets is None:
+            self.assets = load_assets()
+
+        last_report = time.time()
+        last_priority = 0.0
+        next_universe = 0.0
+
+        while not self._stop.is_set():
+            now = time.time()
+
+            if now >= next_universe:
+                next_universe = now + self._reload_universe()
+                if not self._universe:
+                    self._stop.wait(next_universe - now)
+                    continue
+
+            if now - last_priority > self.min_interval:
+                self._update_priorities()
+                last_priority = now
+
+            batch = self._next_batch(now)
+            if not batch:
+                wait = self._due[0][0] - now if self._due else 1.0
+                self._stop.wait(min(max(wait, 0.05), 1.0))
+                continue
+
+            try:
+                self.scan_batch(batch)
+            except Exception as e:
+                # Never let one bad batch end the thread the dashboard relies on
+                print(f"[SCANNER] Batch failed: {type(e).__name__}: {e}")
+                self._fail([s for s in batch if not self._scheduled(s)], f"{type(e).__name__}: {e}", now)
+
+            if report_every and now - last_report > report_every:
+                stale = len(self._ready) + sum(1 for d, _ in self._due if d <= now)
+                print(f"[SCANNER] {len(self.table)} signals, {stale} overdue")
+                last_report = now
+
+    def _reload_universe(self):
+        """Reload the pairs and return the seconds until the next reload."""
+        changes = self._load_universe()
+        if changes is None:
+            print(f"[SCANNER] No TRADING {self.quote} pairs from exchangeInfo; "
+                  f"retrying in {UNIVERSE_RETRY}s (tracking {len(self._universe)})")
+            return UNIVERSE_RETRY
+
+        added, removed = changes
+        if added or removed:
+            print(f"[SCANNER] Tracking {len(self._universe)} {self.quote} pairs "
+                  f"(+{len(added)} -{len(removed)}, budget {self.budget.capacity:.0f} weight/min)")
+        # A fixed symbol list never changes
+        return float("inf") if self._symbols else UNIVERSE_REFRESH
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="market-scanner", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._pool.shutdown(wait=False)
+
+
+def start_background_scanner(**options):
+    return MarketScanner(**options).start()
+
+
+# ------------------------------
+# MAIN
+# ------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Continuous market scanner")
+    parser.add_argument("--quote", default=QUOTE)
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL)
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL)
+    parser.add_argument("--weight-budget", type=float, default=WEIGHT_PER_MINUTE * BUDGET_SHARE,
+                        help="request weight per minute the scanner may spend")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--ring", help="read candles from this shared-memory ring (src/ringbuffer.py)")
+    parser.add_argument("--ring-max-age", type=float, default=RING_MAX_AGE,
+                        help="seconds before a ring symbol counts as stale and is fetched directly")
+    args = parser.parse_args()
+
+    ring = None
+    if args.ring:
+        from src.ringbuffer import CandleRing
+        ring = CandleRing.attach(args.ring)
+
+    scanner = MarketScanner(
+        quote=args.quote,
+        min_interval=args.min_interval,
+        max_interval=args.max_interval,
+        budget=RateBudget(args.weight_budget),
+        ring=ring,
+        ring_max_age=args.ring_max_age,
+    ).start()
+
+    try:
+        while True:
+            time.sleep(30)
+            snap = SHARED_TABLE.snapshot()
+            print(snap.head(args.top)[["symbol", "signal", "confidence", "atr_pct", "priority"]])
+    except KeyboardInterrupt:
+        scanner.stop()
+        print("\n[SCANNER] Stopped.")
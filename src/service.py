@@ -0,0 +1,376 @@
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from src import metrics
+from src.predict import load_assets, get_live_data, predict_batch, normalize_symbol, binance_symbols
+
+
+# ------------------------------
+# SERVICE SETTINGS
+# ------------------------------
+HOST = "127.0.0.1"
+PORT = 8080
+
+BATCH_WINDOW = 0.02      # seconds to wait for more symbols before one model call
+MAX_BATCH = 64           # symbols per model call
+QUEUE_SIZE = 256         # pending symbols before we answer 503
+MAX_BATCHES = 4          # batches fetching/scoring at the same time
+FETCH_WORKERS = 16       # threads for Binance kline requests
+RESULT_TTL = 0.0         # reuse a finished prediction for this many seconds
+SYMBOL_CACHE = 1024      # resolved client inputs kept (LRU)
+
+RESULT_FIELDS = ["signal", "confidence", "price", "entry", "sl", "tp", "rr", "description"]
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+# ------------------------------
+# COALESCING + MICRO-BATCHING CORE
+# ------------------------------
+class PredictionService:
+    """
+    Async front-end for predict_batch.
+
+    Concurrent requests for the same symbol share one in-flight future.
+    Distinct symbols queued within `batch_window` are fetched in parallel
+    and scored with a single model call. When the bounded queue is full,
+    new symbols are rejected with ServiceBusy instead of piling up.
+    """
+
+    def __init__(self, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH,
+                 queue_size=QUEUE_SIZE, max_batches=MAX_BATCHES,
+                 fetch_workers=FETCH_WORKERS, result_ttl=RESULT_TTL):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.result_ttl = result_ttl
+
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._slots = asyncio.Semaphore(max_batches)
+        self._inflight = {}
+        self._recent = {}
+        self._symbols = OrderedDict()
+        self._tasks = set()
+
+        self._fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers)
+        self._model_pool = ThreadPoolExecutor(max_workers=1)
+        self._assets = None
+        self._batcher = None
+
+        self.stats = {"requests": 0, "coalesced": 0, "rejected": 0,
+                      "batches": 0, "scored": 0}
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self._assets = await loop.run_in_executor(self._model_pool, load_assets)
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def stop(self):
+        if self._batcher:
+            self._batcher.cancel()
+        for task in list(self._tasks):
+            task.cancel()
+        self._fetch_pool.shutdown(wait=False)
+        self._model_pool.shutdown(wait=False)
+
+    async def resolve(self, symbol):
+        # normalize_symbol does fuzzy matching (and may fetch exchangeInfo),
+        # so it runs off the event loop and its answers are remembered
+        key = symbol.strip().upper()
+        hit = self._symbols.get(key)
+        if hit is not None:
+            self._symbols.move_to_end(key)
+            return hit
+
+        loop = asyncio.get_running_loop()
+        hit, cacheable = await loop.run_in_executor(self._fetch_pool, _resolve, key)
+        if cacheable:
+            self._symbols[key] = hit
+            if len(self._symbols) > SYMBOL_CACHE:
+                self._symbols.popitem(last=False)
+        return hit
+
+    async def predict(self, symbol):
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+
+        cached = self._recent.get(symbol)
+        if cached and loop.time() - cached[0] < self.result_ttl:
+            self.stats["coalesced"] += 1
+            return cached[1]
+
+        fut = self._inflight.get(symbol)
+        if fut is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(fut)
+
+        fut = loop.create_future()
+        try:
+            self._queue.put_nowait((symbol, fut))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise ServiceBusy(f"queue full ({self._queue.maxsize} pending)")
+
+        self._inflight[symbol] = fut
+        return await asyncio.shield(fut)
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Waiting here (not in the task) is what turns a slow exchange
+            # into a full queue and 503s rather than unbounded tasks.
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        # Holding the task keeps it from being garbage-collected mid-flight
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[SERVICE] Batch failed: {task.exception()!r}")
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        try:
+            fetched = await asyncio.gather(
+                *[loop.run_in_executor(self._fetch_pool, get_live_data, sym) for sym, _ in batch],
+                return_exceptions=True
+            )
+
+            ready = []
+            for (sym, fut), df in zip(batch, fetched):
+                if isinstance(df, Exception):
+                    self._finish(sym, fut, error=df)
+                else:
+                    ready.append((sym, fut, df))
+
+            if not ready:
+                return
+
+            try:
+                results = await loop.run_in_executor(
+                    self._model_pool, predict_batch, [df for _, _, df in ready], self._assets
+                )
+            except Exception as e:
+                for sym, fut, _ in ready:
+                    self._finish(sym, fut, error=e)
+                return
+
+            self.stats["batches"] += 1
+            self.stats["scored"] += len(ready)
+            for (sym, fut, _), res in zip(ready, results):
+                self._finish(sym, fut, result=dict(zip(RESULT_FIELDS, res)))
+        except Exception as e:
+            # Nobody waiting on this batch should hang; _finish skips answered futures
+            for sym, fut in batch:
+                self._finish(sym, fut, error=e)
+            raise
+        finally:
+            self._slots.release()
+
+    def _finish(self, symbol, fut, result=None, error=None):
+        self._inflight.pop(symbol, None)
+        if fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            self._recent[symbol] = (asyncio.get_running_loop().time(), result)
+            fut.set_result(result)
+
+
+def _resolve(key):
+    """normalize_symbol's answer, and whether it may be cached."""
+    symbol, note = normalize_symbol(key)
+    # "Invalid" while exchangeInfo is unavailable is not an answer to keep
+    return (symbol, note), symbol is not None or bool(binance_symbols())
+
+
+# ------------------------------
+# MINIMAL HTTP/JSON FRONT-END
+# ------------------------------
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+async def _read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        k, _, v = h.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+
+    body = b""
+    if int(headers.get("content-length", 0)):
+        body = await reader.readexactly(int(headers["content-length"]))
+
+    return method.upper(), target, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive, extra_headers=None):
+    if isinstance(payload, str):
+        body, ctype = payload.encode(), "text/plain; version=0.0.4"
+    else:
+        body, ctype = json.dumps(payload).encode(), "application/json"
+    head = [
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+        f"Content-Type: {ctype}",
+        f"Content-Length: {len(body)}",
+        "Connection: " + ("keep-alive" if keep_alive else "close"),
+    ]
+    head += extra_headers or []
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+
+
+async def _predict_one(service, raw_symbol):
+    symbol, note = await service.resolve(raw_symbol)
+    if symbol is None:
+        return {"symbol": raw_symbol, "error": note}
+
+    result = await service.predict(symbol)
+    out = {"symbol": symbol, **result}
+    if note:
+        out["note"] = note
+    return out
+
+
+async def handle_request(service, method, target, body):
+    url = urlsplit(target)
+
+    if url.path == "/health":
+        return 200, {"status": "ok", "queued": service._queue.qsize(),
+                     "inflight": len(service._inflight), **service.stats}
+
+    if url.path == "/metrics":
+        return 200, metrics.render_prometheus()
+
+    if url.path != "/predict":
+        return 404, {"error": f"unknown path {url.path}"}
+
+    if method == "GET":
+        symbols = parse_qs(url.query).get("symbol", [])
+    elif method == "POST":
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            return 400, {"error": "body is not valid JSON"}
+        symbols = data.get("symbols") or ([data["symbol"]] if "symbol" in data else [])
+    else:
+        return 400, {"error": f"unsupported method {method}"}
+
+    if not symbols:
+        return 400, {"error": "missing symbol"}
+
+    results = await asyncio.gather(*[_predict_one(service, s) for s in symbols],
+                                   return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors and len(errors) == len(results) and all(isinstance(e, ServiceBusy) for e in errors):
+        raise errors[0]
+    if len(results) == 1 and method == "GET":
+        if errors:
+            raise errors[0]
+        return 200, results[0]
+
+    # One symbol's failure is reported in its own entry, not as a 500 for all
+    return 200, {"results": [
+        {"symbol": s, "error": str(r) or type(r).__name__} if isinstance(r, Exception) else r
+        for s, r in zip(symbols, results)
+    ]}
+
+
+async def _serve_client(service, reader, writer):
+    try:
+        while True:
+            req = await _read_request(reader)
+            if req is None:
+                break
+            method, target, headers, body = req
+            keep_alive = headers.get("connection", "").lower() != "close"
+
+            extra = []
+            try:
+                status, payload = await handle_request(service, method, target, body)
+            except ServiceBusy as e:
+                status, payload = 503, {"error": str(e)}
+                extra = ["Retry-After: 1"]
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+
+            _write_response(writer, status, payload, keep_alive, extra)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=HOST, port=PORT, **options):
+    service = PredictionService(**options)
+    await service.start()
+
+    server = await asyncio.start_server(
+        lambda r, w: _serve_client(service, r, w), host, port
+    )
+    print(f"[SERVICE] Listening on http://{host}:{port}  (GET /predict?symbol=BTCUSDT)")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+# ------------------------------
+# MAIN
+# ------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON prediction service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1000)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--max-batches", type=int, default=MAX_BATCHES)
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS)
+    parser.add_argument("--result-ttl", type=float, default=RESULT_TTL)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port,
+            batch_window=args.batch_window_ms / 1000,
+            max_batch=args.max_batch,
+            queue_size=args.queue_size,
+            max_batches=args.max_batches,
+            fetch_workers=args.fetch_workers,
+            result_ttl=args.result_ttl,
+        ))
+    except KeyboardInterrupt:
+        print("\n[SERVICE] Stopped.")
@@ -0,0 +1,142 @@
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from src import metrics
+from src.backtester import (
+    INITIAL_BALANCE, SL_ATR_MULT, TP_ATR_MULT, NONE, SL, TP, next_candle_inputs
+)
+
+
+# ----------------------------------------------
+# DEFAULT GRID
+# ----------------------------------------------
+SL_MULTS = (1.0, 1.25, 1.5, 2.0, 2.5, 3.0)
+TP_MULTS = (1.0, 1.5, 2.0, 2.5, 3.0, 4.0)
+POSITION_SIZES = (0.25, 0.5, 1.0)   # fraction of balance per trade
+FEES = (0.0, 0.0004, 0.001)         # per side, as a fraction of notional
+
+MAX_CELLS = 4_000_000   # configs x trades held in memory at once
+
+
+# ----------------------------------------------
+# OUTCOMES FOR EVERY SL/TP PAIR AT ONCE
+# ----------------------------------------------
+def grid_outcomes(entry, atr, buy, low_f, high_f, sl_mults, tp_mults):
+    """
+    Outcome codes with shape (len(sl_mults), len(tp_mults), trades).
+    Same rule as the backtester: SL is checked before TP on the next candle.
+    """
+    sl_d = np.asarray(sl_mults, dtype=float)[:, None] * atr[None, :]
+    tp_d = np.asarray(tp_mults, dtype=float)[:, None] * atr[None, :]
+
+    sl_hit = np.where(buy, low_f <= entry - sl_d, high_f >= entry + sl_d)
+    tp_hit = np.where(buy, high_f >= entry + tp_d, low_f <= entry - tp_d)
+
+    outcome = np.where(sl_hit[:, None, :], SL, np.where(tp_hit[None, :, :], TP, NONE))
+    return outcome.astype(np.int8), sl_d / entry, tp_d / entry
+
+
+# ----------------------------------------------
+# SWEEP ONE COIN
+# ----------------------------------------------
+def sweep(source, sl_mults=SL_MULTS, tp_mults=TP_MULTS,
+          position_sizes=POSITION_SIZES, fees=FEES,
+          rank_by="Return %", initial_balance=INITIAL_BALANCE):
+    """
+    Evaluate every (sl_mult, tp_mult, position_size, fee) combination for one
+    labeled file (path or DataFrame) and return a ranked table.
+
+    Unlike the fixed 0.985/1.02 factors of backtest_coin, a trade here moves
+    the balance by position_size * (+tp_mult*atr/entry on TP, -sl_mult*atr/entry
+    on SL, 0 on NONE) minus fees for entry and exit.
+    """
+    df = pd.read_csv(source).dropna() if isinstance(source, str) else source
+
+    with metrics.throughput("sweep.sweep", len(df)):
+        _, entry, atr, buy, low_f, high_f = next_candle_inputs(df)
+        outcome, sl_ret, tp_ret = grid_outcomes(entry, atr, buy, low_f, high_f, sl_mults, tp_mults)
+
+        n_sl, n_tp, n_trades = outcome.shape
+        levels = list(itertools.product(range(n_sl), range(n_tp)))
+        sizing = list(itertools.product(position_sizes, fees))
+
+        size = np.array([s for s, _ in sizing])[:, None]
+        cost = np.array([2 * f for _, f in sizing])[:, None]
+
+        # Trade return per SL/TP pair, shape (levels, trades)
+        ret = np.empty((len(levels), n_trades))
+        for k, (i, j) in enumerate(levels):
+            o = outcome[i, j]
+            ret[k] = np.where(o == TP, tp_ret[j], np.where(o == SL, -sl_ret[i], 0.0))
+
+        wins = (outcome == TP).sum(axis=2).reshape(-1)
+        losses = (outcome == SL).sum(axis=2).reshape(-1)
+
+        # Broadcast returns over the sizing grid in memory-bounded slabs
+        per_slab = max(1, MAX_CELLS // max(1, n_trades * len(sizing)))
+        final = np.empty((len(levels), len(sizing)))
+        low_eq = np.empty((len(levels), len(sizing)))
+        for start in range(0, len(levels), per_slab):
+            r = ret[start:start + per_slab, None, :]
+            factors = 1.0 + size[None] * (r - cost[None])
+            curve = initial_balance * np.cumprod(factors, axis=2)
+            if n_trades:
+                final[start:start + per_slab] = curve[..., -1]
+                low_eq[start:start + per_slab] = np.minimum(curve.min(axis=2), initial_balance)
+            else:
+                final[start:start + per_slab] = initial_balance
+                low_eq[start:start + per_slab] = initial_balance
+
+    rows = []
+    for k, (i, j) in enumerate(levels):
+        w, l = int(wins[k]), int(losses[k])
+        for g, (pos, fee) in enumerate(sizing):
+            bal = float(final[k, g])
+            rows.append({
+                "SL Mult": float(sl_mults[i]),
+                "TP Mult": float(tp_mults[j]),
+                "Position Size": float(pos),
+                "Fee": float(fee),
+                "Total Trades": n_trades,
+                "Wins": w,
+                "Losses": l,
+                "Accuracy %": (w / n_trades) * 100 if n_trades > 0 else 0,
+                "Profit Factor": w / l if l > 0 else w,
+                "Max Drawdown %": (initial_balance - float(low_eq[k, g])) / initial_balance * 100,
+                "Final Balance": bal,
+                "Return %": (bal - initial_balance) / initial_balance * 100,
+            })
+
+    ascending = rank_by == "Max Drawdown %"
+    table = pd.DataFrame(rows).sort_values(rank_by, ascending=ascending).reset_index(drop=True)
+    table.index.name = "Rank"
+    return table
+
+
+# ----------------------------------------------
+# MAIN
+# ----------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SL/TP/size/fee grid sweep for one labeled file")
+    parser.add_argument("file")
+    parser.add_argument("--sl", type=float, nargs="+", default=SL_MULTS)
+    parser.add_argument("--tp", type=float, nargs="+", default=TP_MULTS)
+    parser.add_argument("--size", type=float, nargs="+", default=POSITION_SIZES)
+    parser.add_argument("--fee", type=float, nargs="+", default=FEES)
+    parser.add_argument("--rank-by", default="Return %")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--out", help="write the full ranked table to this CSV")
+    args = parser.parse_args()
+
+    table = sweep(args.file, args.sl, args.tp, args.size, args.fee, rank_by=args.rank_by)
+
+    print(f"[SWEEP] {len(table)} configurations "
+          f"(default levels: SL {SL_ATR_MULT}x / TP {TP_ATR_MULT}x ATR)\n")
+    print(table.head(args.top).to_string())
+
+    if args.out:
+        table.to_csv(args.out)
+        print(f"\n[✔] Saved → {args.out}")
@@ -0,0 +1,171 @@
+import os
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from src import metrics
+
+
+# ------------------------------
+# TRANSPORT SETTINGS
+# ------------------------------
+# Every exchange / news call goes through one pooled session per process:
+# keep-alive connections, compressed bodies, a cap on in-flight requests per
+# host, and jittered exponential backoff on transient failures.
+TIMEOUT = 10              # seconds, connect + read
+MAX_RETRIES = 5           # retries after the first attempt
+BACKOFF_BASE = 0.5        # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 30.0        # cap for one wait, including Retry-After
+HOST_CONCURRENCY = int(os.environ.get("CRYPTOPRE_HOST_CONCURRENCY", "8"))
+
+# 418 / 429 are Binance's ban / rate-limit answers; both send Retry-After
+RETRY_STATUS = frozenset({418, 429, 500, 502, 503, 504})
+HEADERS = {"Accept-Encoding": "gzip, deflate", "User-Agent": "CryptoPre/1.0"}
+
+# Counts per process: requests, retries, failures, throttled
+STATS = Counter()
+
+_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_session = None
+_session_pid = None
+_host_slots = {}
+_host_blocked = {}
+
+
+# ------------------------------
+# SESSION + HOST LIMITS
+# ------------------------------
+def session():
+    """
+    The process-wide requests.Session. Rebuilt after a fork so pipeline
+    workers never share a parent's sockets.
+    """
+    global _session, _session_pid
+    if _session is not None and _session_pid == os.getpid():
+        return _session
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    with _lock:
+        if _session is None or _session_pid != os.getpid():
+            s = requests.Session()
+            s.headers.update(HEADERS)
+            # Retries are done here, not by urllib3, so they share the backoff
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HOST_CONCURRENCY, max_retries=0)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _session, _session_pid = s, os.getpid()
+            _host_slots.clear()
+            _host_blocked.clear()
+    return _session
+
+
+def _slot(host):
+    with _lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(HOST_CONCURRENCY)
+        return slot
+
+
+def _count(key):
+    with _stats_lock:
+        STATS[key] += 1
+
+
+def _fits(end, wait):
+    return end is None or time.monotonic() + wait < end
+
+
+def _wait_until_unblocked(host, end=None):
+    # A 418/429 pauses the whole host, not just the thread that saw it
+    now = time.monotonic()
+    delay = _host_blocked.get(host, 0) - now
+    if end is not None:
+        delay = min(delay, end - now)
+    if delay > 0:
+        time.sleep(delay)
+
+
+def backoff(attempt, retry_after=None):
+    """Seconds to wait before retry `attempt` (0-based): Retry-After, else full jitter."""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# ------------------------------
+# REQUESTS
+# ------------------------------
+def request(method, url, params=None, timeout=TIMEOUT, retries=MAX_RETRIES, deadline=None,
+            before_attempt=None, **kwargs):
+    """
+    One HTTP call with retries. Connection errors, timeouts and RETRY_STATUS
+    answers are retried; the last response is returned as-is (callers keep
+    their own status / error-body handling), the last exception re-raised.
+
+    `deadline` caps the whole call in seconds, waits included: no retry is
+    started that would end past it. `before_attempt(n)` runs before every
+    attempt, e.g. to charge a request-weight budget per request actually
+    sent; whatever it raises propagates.
+    """
+    import requests
+
+    s = session()
+    host = urlsplit(url).netloc
+    slot = _slot(host)
+    end = time.monotonic() + deadline if deadline is not None else None
+
+    for attempt in range(retries + 1):
+        _wait_until_unblocked(host, end)
+        if before_attempt is not None:
+            before_attempt(attempt)
+        _count("requests")
+        limit = timeout if end is None else max(min(timeout, end - time.monotonic()), 0.1)
+        try:
+            with slot, metrics.timer("transport.request"):
+                r = s.request(method, url, params=params, timeout=limit, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            wait = backoff(attempt)
+            if attempt == retries or not _fits(end, wait):
+                _count("failures")
+                raise
+            _count("retries")
+            time.sleep(wait)
+            continue
+
+        if r.status_code not in RETRY_STATUS:
+            return r
+
+        retry_after = _retry_after(r)
+        if r.status_code in (418, 429):
+            _count("throttled")
+            if retry_after is not None:
+                _host_blocked[host] = time.monotonic() + min(retry_after, BACKOFF_MAX)
+        wait = backoff(attempt, retry_after)
+        if attempt == retries or not _fits(end, wait):
+            _count("failures")
+            return r
+        _count("retries")
+        r.close()
+        time.sleep(wait)
+
+
+def get(url, params=None, **kwargs):
+    return request("GET", url, params=params, **kwargs)
+
+
+def get_json(url, params=None, **kwargs):
+    return get(url, params=params, **kwargs).json()